@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import statistics
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# This script compares the abstractive summarizer backends (fp32 PyTorch, dynamic
+# int8 PyTorch and ONNX Runtime) on a fixed evaluation set. Each backend runs in a
+# fresh process so its memory footprint is measured in isolation.
+# The "onnx" backend needs a model exported beforehand with:
+#   python -m nlu_app.abstractive_summarizer.export
+
+BACKENDS = ["pytorch", "pytorch-int8", "onnx"]
+NUM_THREADS = int(os.environ.get("NLU_INFERENCE_THREADS", "4"))
+
+EVALUATION_SET = [
+    """Artificial intelligence has revolutionized numerous industries in recent years, transforming how businesses operate and people work.
+    Machine learning algorithms now power everything from recommendation systems on streaming platforms to autonomous vehicles navigating city streets.
+    Companies like Google, Microsoft, and OpenAI have invested billions of dollars in developing advanced AI systems that can understand and generate human language.
+    However, concerns about AI safety, job displacement, and ethical implications continue to grow among researchers and policymakers.""",
+    """The city council approved a new budget on Tuesday that increases spending on public transportation by fifteen percent.
+    The plan adds three new bus lines, extends the operating hours of the subway on weekends and funds the repair of several aging bridges.
+    Supporters said the investment would reduce traffic congestion and air pollution, while critics warned that property taxes could rise next year.
+    The mayor is expected to sign the budget into law by the end of the month.""",
+    """Scientists have discovered a new species of frog in the rainforests of Ecuador.
+    The tiny amphibian, which measures less than two centimeters, has a distinctive orange pattern on its back that may warn predators of its toxicity.
+    Researchers say the discovery highlights how much biodiversity remains undocumented in tropical forests that are threatened by logging and mining.
+    The team plans to return to the region next year to study the frog's behavior and population size.""",
+    """Global stock markets fell sharply on Monday after weaker than expected manufacturing data from several major economies.
+    Investors moved money into government bonds and gold, pushing yields to their lowest level in three months.
+    Analysts said fears of a slowdown had been building for weeks as central banks signaled that interest rates would stay high.
+    Oil prices also dropped as traders anticipated lower demand from factories and airlines.""",
+    """The national football team secured a place in the final after a dramatic penalty shootout on Wednesday night.
+    The match had ended level after extra time, with both goalkeepers making a series of remarkable saves.
+    The team's captain scored the decisive penalty, sending thousands of supporters in the stadium into celebration.
+    The final will be played on Sunday against the defending champions.""",
+]
+
+def _rss_megabytes():
+    """Current resident set size of this process in megabytes (Linux)."""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def _run_backend(backend, queue):
+    from nlu_app.abstractive_summarizer import load_abstractive_model, generate_abstractive_summary
+
+    baseline_rss = _rss_megabytes()
+    load_start = time.perf_counter()
+    load_abstractive_model(backend=backend, num_threads=NUM_THREADS)
+    load_time = time.perf_counter() - load_start
+    model_rss = _rss_megabytes() - baseline_rss
+
+    generate_abstractive_summary(EVALUATION_SET[0], max_length=60, min_length=20)  # warm-up
+    summaries, latencies = [], []
+    for text in EVALUATION_SET:
+        start = time.perf_counter()
+        summaries.append(generate_abstractive_summary(text, max_length=60, min_length=20)["summary"])
+        latencies.append(time.perf_counter() - start)
+
+    queue.put({
+        "load_time": load_time, "model_rss": model_rss, "peak_rss": _rss_megabytes(),
+        "latencies": latencies, "summaries": summaries,
+    })
+
+def _ngrams(tokens, n):
+    return [tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+
+def _f1(overlap, candidate_total, reference_total):
+    if overlap == 0 or candidate_total == 0 or reference_total == 0:
+        return 0.0
+    precision, recall = overlap / candidate_total, overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+def rouge_n(candidate, reference, n):
+    """ROUGE-N F1 between two summaries."""
+    candidate_ngrams, reference_ngrams = _ngrams(candidate.lower().split(), n), _ngrams(reference.lower().split(), n)
+    remaining = list(reference_ngrams)
+    overlap = 0
+    for ngram in candidate_ngrams:
+        if ngram in remaining:
+            remaining.remove(ngram)
+            overlap += 1
+    return _f1(overlap, len(candidate_ngrams), len(reference_ngrams))
+
+def rouge_l(candidate, reference):
+    """ROUGE-L F1 (longest common subsequence) between two summaries."""
+    a, b = candidate.lower().split(), reference.lower().split()
+    lcs = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a)):
+        for j in range(len(b)):
+            lcs[i + 1][j + 1] = lcs[i][j] + 1 if a[i] == b[j] else max(lcs[i][j + 1], lcs[i + 1][j])
+    return _f1(lcs[len(a)][len(b)], len(a), len(b))
+
+if __name__ == "__main__":
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for backend in BACKENDS:
+        queue = context.Queue()
+        process = context.Process(target=_run_backend, args=(backend, queue))
+        process.start()
+        process.join()
+        if process.exitcode != 0 or queue.empty():
+            print(f"Backend '{backend}' failed; skipping it.")
+            continue
+        results[backend] = queue.get()
+
+    if "pytorch" not in results:
+        sys.exit("The fp32 reference backend did not run; cannot compute ROUGE drift.")
+    reference_summaries = results["pytorch"]["summaries"]
+
+    print(f"\n--- Abstractive Backend Benchmark ({len(EVALUATION_SET)} texts, {NUM_THREADS} threads) ---")
+    print(f"{'backend':<14}{'load s':>8}{'mean s':>9}{'p50 s':>8}{'model MB':>10}{'peak MB':>9}"
+          f"{'ROUGE-1':>9}{'ROUGE-2':>9}{'ROUGE-L':>9}")
+    for backend, result in results.items():
+        pairs = list(zip(result["summaries"], reference_summaries))
+        print(f"{backend:<14}{result['load_time']:>8.1f}{statistics.mean(result['latencies']):>9.2f}"
+              f"{statistics.median(result['latencies']):>8.2f}{result['model_rss']:>10.0f}{result['peak_rss']:>9.0f}"
+              f"{statistics.mean(rouge_n(c, r, 1) for c, r in pairs):>9.3f}"
+              f"{statistics.mean(rouge_n(c, r, 2) for c, r in pairs):>9.3f}"
+              f"{statistics.mean(rouge_l(c, r) for c, r in pairs):>9.3f}")
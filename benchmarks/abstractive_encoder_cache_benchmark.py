@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from nlu_app.abstractive_summarizer import load_abstractive_model, generate_abstractive_summary, get_encoder_cache_info
+from nlu_app.abstractive_summarizer import logic as abstractive_logic
+
+# This script measures the encoder-state cache of the abstractive summarizer on
+# multi-length requests: the same text summarized at several lengths with one call
+# per length and an empty cache (the encoder runs every time), with one call asking
+# for all lengths (the encoder runs once), and with that call repeated (the encoder
+# does not run). It reports the time per request and the estimated encoder FLOPs saved.
+
+TEXT = """The city council approved a new budget on Tuesday that increases spending on public transportation by fifteen percent.
+The plan adds three new bus lines, extends the operating hours of the subway on weekends and funds the repair of several aging bridges.
+Supporters said the investment would reduce traffic congestion and air pollution, while critics warned that property taxes could rise next year.
+The mayor is expected to sign the budget into law by the end of the month, and construction on the first bus line could begin in the spring.
+Officials said they would publish quarterly reports on the progress of each project so that residents can follow how the money is spent."""
+LENGTHS = [(40, 10), (80, 30), (130, 60)]
+
+def _time(function, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = function()
+    return (time.perf_counter() - start) / rounds, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark encoder-state reuse for multi-length abstractive summaries.")
+    parser.add_argument("--model", default="facebook/bart-large-cnn", help="Model name or path.")
+    parser.add_argument("--mode", default="fast", choices=["fast", "balanced", "quality"], help="Latency tier.")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed runs of each scenario.")
+    args = parser.parse_args()
+
+    load_abstractive_model(model_name=args.model)
+    generate_abstractive_summary(TEXT, max_length=40, min_length=10, mode=args.mode)  # warm-up
+
+    def separate():
+        summaries = []
+        for max_length, min_length in LENGTHS:
+            abstractive_logic.encoder_cache.clear()
+            result = generate_abstractive_summary(TEXT, max_length=max_length, min_length=min_length, mode=args.mode)
+            summaries.append(result["summary"])
+        return summaries
+
+    def multi_length():
+        abstractive_logic.encoder_cache.clear()
+        return generate_abstractive_summary(TEXT, mode=args.mode, lengths=LENGTHS)
+
+    separate_time, separate_summaries = _time(separate, args.rounds)
+    multi_time, result = _time(multi_length, args.rounds)
+    repeated_time, repeated = _time(
+        lambda: generate_abstractive_summary(TEXT, mode=args.mode, lengths=LENGTHS), args.rounds
+    )
+
+    same = separate_summaries == result["summaries"] == repeated["summaries"]
+    print(f"\n--- {len(LENGTHS)} lengths, mode '{args.mode}', {args.rounds} rounds ---")
+    print(f"{'scenario':<34}{'time s':>9}{'encoder FLOPs saved':>22}")
+    print(f"{'one call per length, no cache':<34}{separate_time:>9.2f}{0:>22.3g}")
+    print(f"{'one multi-length call':<34}{multi_time:>9.2f}{result['encoder_flops_saved']:>22.3g}")
+    print(f"{'repeated multi-length call':<34}{repeated_time:>9.2f}{repeated['encoder_flops_saved']:>22.3g}")
+    print(f"Summaries identical across scenarios: {same}")
+    print(f"Encoder cache: {get_encoder_cache_info()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import msgpack
+import pyarrow
+import pyarrow.ipc
+from fastapi.testclient import TestClient
+
+import nlu_app.main as main
+
+# This script compares the throughput of the cheap endpoints over the different
+# transports: one JSON request per text (the single-item endpoints), and one batch
+# request as JSON, MessagePack or Arrow IPC. Client-side encoding and decoding are
+# included, since a pipeline pays for them too. Requires msgpack and pyarrow.
+# Run it from the repository root so that the models are found.
+
+NUM_TEXTS = 2000
+REPEATS = 3
+
+VOCABULARY = ("the movie was great terrible acting plot wonderful boring actors director music story "
+              "unhappiness rebuild disagreement quickly friendship readable").split()
+
+def _make_texts(count, seed=7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(8, 40))) for _ in range(count)]
+
+def _arrow_request(texts):
+    batch = pyarrow.record_batch([pyarrow.array(texts)], names=["text"])
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+def _single_json(client, path, texts):
+    for text in texts:
+        if path == "/analyze-morphology":
+            client.post(path, json={"words": [text]}).json()
+        else:
+            client.post(path, json={"text": text, "include_text": False}).json()
+
+def _batch_json(client, path, texts):
+    client.post("/batch" + path, content=json.dumps({"text": texts}), headers={"Content-Type": "application/json"}).json()
+
+def _batch_msgpack(client, path, texts):
+    response = client.post("/batch" + path, content=msgpack.packb({"text": texts}),
+                           headers={"Content-Type": "application/msgpack"})
+    msgpack.unpackb(response.content)
+
+def _batch_arrow(client, path, texts):
+    response = client.post("/batch" + path, content=_arrow_request(texts),
+                           headers={"Content-Type": "application/vnd.apache.arrow.stream"})
+    pyarrow.ipc.open_stream(response.content).read_all()
+
+TRANSPORTS = [
+    ("JSON, one request/text", _single_json),
+    ("batch JSON", _batch_json),
+    ("batch MessagePack", _batch_msgpack),
+    ("batch Arrow IPC", _batch_arrow),
+]
+
+if __name__ == "__main__":
+    texts = _make_texts(NUM_TEXTS)
+    words = [text.split()[0] for text in texts]
+    with TestClient(main.app) as client:
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.1)
+
+        print(f"\n--- Batch Transport Throughput ({NUM_TEXTS} inputs, best of {REPEATS}) ---")
+        print(f"{'endpoint':<22}" + "".join(f"{name:>26}" for name, _ in TRANSPORTS))
+        for path in ["/tokenize-text", "/analyze-sentiment", "/analyze-morphology"]:
+            inputs = words if path == "/analyze-morphology" else texts
+            cells = []
+            for _, transport in TRANSPORTS:
+                best = float("inf")
+                for _ in range(REPEATS):
+                    start = time.perf_counter()
+                    transport(client, path, inputs)
+                    best = min(best, time.perf_counter() - start)
+                cells.append(f"{len(inputs) / best:>20.0f} it/s")
+            print(f"{path:<22}" + "".join(f"{cell:>26}" for cell in cells))
@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import httpx
+import requests
+
+from nlu_app.client import AsyncNLUClient
+
+# This script measures what the client costs when many small sentiment requests are
+# sent: wall-clock throughput and client-side CPU time per text, for the previous
+# client (one 'requests.post' per text, new connection each time), the SDK sending
+# one request per text (sequentially and concurrently over pooled keep-alive
+# connections) and the SDK with automatic batching.
+# By default it starts a server with uvicorn; run it from the repository root so that
+# the models are found, or pass --url to use a server that is already running.
+
+NUM_TEXTS = 500
+PORT = 8123
+
+VOCABULARY = "the movie was great terrible acting plot wonderful boring actors director music story".split()
+
+def _make_texts(count, seed=7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(8, 40))) for _ in range(count)]
+
+def _start_server(port):
+    src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+    env = {**os.environ, "PYTHONPATH": src_dir, "NLU_WARMUP_ROUNDS": "0"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "nlu_app.main:app", "--port", str(port), "--log-level", "warning"], env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+    while True:
+        if server.poll() is not None:
+            raise RuntimeError("The server exited during startup.")
+        try:
+            if httpx.get(f"{url}/ready").status_code == 200:
+                return server, url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+
+def _previous_client(url, texts):
+    for text in texts:
+        requests.post(f"{url}/analyze-sentiment", json={"text": text}).json()
+
+async def _sdk_sequential(url, texts):
+    async with AsyncNLUClient(url, auto_batch=False) as client:
+        for text in texts:
+            await client.analyze_sentiment(text)
+
+async def _sdk_concurrent(url, texts):
+    async with AsyncNLUClient(url, auto_batch=False) as client:
+        await asyncio.gather(*(client.analyze_sentiment(text) for text in texts))
+
+async def _sdk_auto_batched(url, texts):
+    async with AsyncNLUClient(url) as client:
+        await client.analyze_sentiment_many(texts)
+
+CLIENTS = [
+    ("previous client (requests)", _previous_client),
+    ("SDK, sequential", _sdk_sequential),
+    ("SDK, 16 concurrent", _sdk_concurrent),
+    ("SDK, automatic batching", _sdk_auto_batched),
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure client-side overhead of the NLU client SDK.")
+    parser.add_argument("--url", help="URL of a running server (default: start one).")
+    parser.add_argument("--num-texts", type=int, default=NUM_TEXTS)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = _start_server(PORT)
+    try:
+        texts = _make_texts(args.num_texts)
+        print(f"\n--- Sentiment Requests from the Client ({len(texts)} texts) ---")
+        print(f"{'client':<30}{'texts/s':>10}{'client CPU us/text':>22}")
+        for name, run in CLIENTS:
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            result = run(url, texts)
+            if asyncio.iscoroutine(result):
+                asyncio.run(result)
+            wall_time, cpu_time = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            print(f"{name:<30}{len(texts) / wall_time:>10.0f}{cpu_time / len(texts) * 1e6:>22.0f}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
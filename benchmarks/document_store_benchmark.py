@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# This script runs the same analyses on one large document twice through the API:
+# once sending the text with every request (and getting it echoed back), once
+# uploading it to the document store and sending only its doc_id. It reports the
+# time and the bytes sent and received per analysis.
+# Requires the models of the analyzed endpoints (NLTK data, spaCy model, saved_model/).
+
+ANALYSES = [
+    ("/summarize-text/extractive", {"num_sentences": 5}),
+    ("/summarize-text/textrank", {"num_sentences": 5}),
+    ("/analyze-sentiment", {}),
+    ("/extract-entities", {}),
+    ("/tokenize-text", {}),
+]
+
+WORDS = ["market", "company", "engineer", "report", "growth", "city", "plan", "quarter", "product", "customer",
+         "investment", "research", "team", "result", "policy", "energy", "price", "service", "network", "model"]
+NAMES = ["Apple", "Berlin", "Tim Cook", "Europe", "Microsoft", "London", "Angela Merkel", "Google"]
+
+def make_document(num_characters: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    sentences, length = [], 0
+    while length < num_characters:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+        words.insert(rng.randrange(len(words)), rng.choice(NAMES))
+        sentence = " ".join(words).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+def _run(client, body_for, rounds):
+    timings = {endpoint: 0.0 for endpoint, _ in ANALYSES}
+    sent = received = 0
+    for _ in range(rounds):
+        for endpoint, params in ANALYSES:
+            body = body_for(params)
+            start = time.perf_counter()
+            response = client.post(endpoint, json=body)
+            timings[endpoint] += time.perf_counter() - start
+            response.raise_for_status()
+            sent += len(response.request.content)
+            received += len(response.content)
+    return timings, sent, received
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analyses of a stored document against resending its text.")
+    parser.add_argument("--characters", type=int, default=500_000, help="Document size (spaCy accepts up to 1,000,000).")
+    parser.add_argument("--rounds", type=int, default=3, help="Times each analysis runs.")
+    args = parser.parse_args()
+
+    store_dir = tempfile.mkdtemp(prefix="document_store_")
+    os.environ["NLU_DOCUMENT_STORE_DIR"] = store_dir
+    os.environ.setdefault("NLU_WARMUP_ROUNDS", "0")
+    from fastapi.testclient import TestClient
+    import nlu_app.main as app_module
+
+    document = make_document(args.characters)
+    with TestClient(app_module.app) as client:
+        text_timings, text_sent, text_received = _run(client, lambda params: {"text": document, **params}, args.rounds)
+
+        start = time.perf_counter()
+        response = client.post("/documents", content=document.encode("utf-8"), headers={"Content-Type": "text/plain"})
+        response.raise_for_status()
+        upload_time = time.perf_counter() - start
+        doc_id = response.json()["doc_id"]
+        doc_timings, doc_sent, doc_received = _run(client, lambda params: {"doc_id": doc_id, **params}, args.rounds)
+        doc_sent += len(document.encode("utf-8"))
+
+    print(f"\n--- {len(document)} characters, {args.rounds} rounds of {len(ANALYSES)} analyses ---")
+    print(f"{'endpoint':<30}{'text per request':>20}{'doc_id':>14}")
+    for endpoint, _ in ANALYSES:
+        print(f"{endpoint:<30}{text_timings[endpoint] / args.rounds * 1000:>17.1f} ms"
+              f"{doc_timings[endpoint] / args.rounds * 1000:>11.1f} ms")
+    print(f"{'upload (once)':<30}{'':>20}{upload_time * 1000:>11.1f} ms")
+    print(f"{'total time':<30}{sum(text_timings.values()):>18.2f} s{sum(doc_timings.values()) + upload_time:>12.2f} s")
+    print(f"{'bytes sent':<30}{text_sent:>20}{doc_sent:>14}")
+    print(f"{'bytes received':<30}{text_received:>20}{doc_received:>14}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import nlu_app.extractive_summarizer.logic as extractive
+from nlu_app.extractive_summarizer.build_idf import build_idf_table
+
+# This script shows that TF-IDF scoring with the memory-mapped IDF table costs the
+# same per request whatever the corpus and table size: it builds tables from growing
+# synthetic corpora, then times summaries with frequency and TF-IDF weighting.
+# Requires NLTK's punkt, stopwords and wordnet data.
+
+VOCABULARY_SIZE = 50000
+
+def _word(rank):
+    # Letters only: the summarizer's preprocessing drops digits.
+    letters = []
+    while True:
+        rank, digit = divmod(rank, 26)
+        letters.append(chr(ord("a") + digit))
+        if not rank:
+            return "w" + "".join(letters)
+
+def _make_document(rng, num_sentences):
+    # Zipf-like word choice, so that a few words are frequent in every document.
+    sentences = []
+    for _ in range(num_sentences):
+        words = [_word(min(int(rng.paretovariate(1.1)), VOCABULARY_SIZE)) for _ in range(rng.randint(8, 25))]
+        sentences.append(" ".join(words).capitalize() + ".")
+    return " ".join(sentences)
+
+def _time_summaries(documents, weighting, repeats):
+    # One untimed pass, so that the table pages are mapped in.
+    for document in documents:
+        extractive.generate_extractive_summary(document, 3, weighting)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for document in documents:
+            extractive.generate_extractive_summary(document, 3, weighting)
+    return (time.perf_counter() - start) / (repeats * len(documents)) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extractive summaries with a corpus IDF table.")
+    parser.add_argument("--corpus-sizes", default="1000,10000,100000", help="Comma-separated corpus sizes.")
+    parser.add_argument("--hash-bits", default="16,20,24", help="Comma-separated table sizes (log2 of slots).")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    extractive.load_summarizer_tools()
+    requests = [_make_document(rng, 40) for _ in range(50)]
+    print(f"\n--- Summary latency, 40-sentence documents ---")
+    print(f"{'frequency weighting':<42}{_time_summaries(requests, 'frequency', args.repeats):>8.2f} ms/request")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for hash_bits in [int(bits) for bits in args.hash_bits.split(",")]:
+            for corpus_size in [int(size) for size in args.corpus_sizes.split(",")]:
+                corpus_rng = random.Random(corpus_size)
+                path = os.path.join(directory, f"idf_{hash_bits}_{corpus_size}.npy")
+                start = time.perf_counter()
+                build_idf_table((_make_document(corpus_rng, 5) for _ in range(corpus_size)), path, hash_bits)
+                build_seconds = time.perf_counter() - start
+                extractive.load_summarizer_tools(idf_table_path=path)
+                latency = _time_summaries(requests, "tfidf", args.repeats)
+                label = f"tfidf, {corpus_size} docs, 2**{hash_bits} slots"
+                print(f"{label:<42}{latency:>8.2f} ms/request   (table built in {build_seconds:.1f}s, "
+                      f"{os.path.getsize(path) / 2**20:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
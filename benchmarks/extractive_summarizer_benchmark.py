@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from nltk.tokenize import sent_tokenize
+from nlu_app.extractive_summarizer import logic
+from nlu_app.extractive_summarizer import load_summarizer_tools, generate_extractive_summary
+
+# This script compares the single-pass sparse-matrix extractive summarizer
+# against the previous implementation, which preprocessed every word twice
+# and fully sorted all sentence scores.
+
+VOCABULARY = (
+    "artificial intelligence machine learning model data system network language "
+    "research company industry market policy government people work city vehicle "
+    "platform algorithm training energy health science economy future risk safety"
+).split()
+FILLER = "the a of to and in is was for on with that by as".split()
+
+def legacy_extractive_summary(text, num_sentences=3):
+    """The original implementation, kept here as the reference for correctness and speed."""
+    original_sentences = sent_tokenize(text)
+    if len(original_sentences) <= num_sentences:
+        return text
+
+    word_frequencies = Counter(logic._preprocess_text(text))
+    sentence_scores = {}
+    for i, sentence in enumerate(original_sentences):
+        processed_sentence_words = logic._preprocess_text(sentence)
+        if not processed_sentence_words:
+            continue
+        score = sum(word_frequencies.get(word, 0) for word in processed_sentence_words)
+        sentence_scores[i] = score / len(processed_sentence_words)
+
+    sorted_sentence_indices = sorted(sentence_scores, key=sentence_scores.get, reverse=True)
+    top_sentence_indices = sorted(sorted_sentence_indices[:num_sentences])
+    return ' '.join(original_sentences[i] for i in top_sentence_indices)
+
+def make_document(num_sentences, seed):
+    """Builds a synthetic document with the given number of sentences."""
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(num_sentences):
+        words = [rng.choice(VOCABULARY if rng.random() < 0.6 else FILLER) for _ in range(rng.randint(6, 24))]
+        sentences.append(" ".join(words).capitalize() + ".")
+    return " ".join(sentences)
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+if __name__ == "__main__":
+    load_summarizer_tools()
+
+    print("\n--- Extractive Summarizer Benchmark (10k-sentence documents) ---")
+    for seed in range(3):
+        document = make_document(10_000, seed)
+        legacy_summary, legacy_time = time_call(legacy_extractive_summary, document, 5)
+        new_summary, new_time = time_call(generate_extractive_summary, document, 5)
+
+        assert legacy_summary == new_summary, "Summaries differ from the previous implementation!"
+        print(f"Document {seed + 1}: legacy {legacy_time:.3f}s | single-pass {new_time:.3f}s | "
+              f"speedup x{legacy_time / new_time:.2f} | summaries identical")
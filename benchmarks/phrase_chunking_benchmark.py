@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import nltk
+
+from nlu_app.phrase_chunker import DEFAULT_GRAMMAR, compile_chunk_grammar, load_phrase_chunker, chunk_phrases_batch
+
+# This script compares the phrase chunker with the per-sentence approach of
+# tests/Syntactic_Parsing.py: word_tokenize + pos_tag + nltk.RegexpParser, one sentence
+# at a time. It also times the grammar matching alone on already tagged sentences.
+# Requires NLTK's punkt and averaged_perceptron_tagger data.
+
+# Words by Penn Treebank tag; sentences are built from the templates below.
+WORDS = {
+    "DT": ["the", "a", "this", "every"], "JJ": ["quick", "lazy", "new", "old", "small", "expensive"],
+    "NN": ["fox", "dog", "company", "market", "report", "engineer", "city", "plan"],
+    "NNS": ["dogs", "companies", "markets", "reports", "engineers", "plans"],
+    "NNP": ["Apple", "Berlin", "Monday", "Europe"], "VBD": ["jumped", "announced", "said", "reported"],
+    "VBZ": ["jumps", "expects", "says"], "MD": ["will", "could", "should"], "VB": ["visit", "build", "grow"],
+    "RB": ["quickly", "very", "also", "soon"], "IN": ["over", "in", "about", "with", "on"],
+    "PRP": ["she", "they", "it"], "CC": ["and", "but"],
+}
+TEMPLATES = [
+    "DT JJ NN VBD IN DT JJ NN",
+    "NNP VBD IN NNP IN DT NN MD VB DT JJ NN",
+    "PRP RB VBD DT NNS CC DT NN VBZ RB JJ",
+    "DT NNS IN NNP MD RB VB IN DT JJ JJ NN",
+    "NNP VBZ DT NN IN DT NNS VBD JJ",
+]
+
+def make_texts(num_sentences: int, sentences_per_text: int = 5, seed: int = 7):
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(num_sentences):
+        words = [rng.choice(WORDS[tag]) for tag in rng.choice(TEMPLATES).split()]
+        words[0] = words[0].capitalize()
+        sentences.append(" ".join(words) + ".")
+    return [" ".join(sentences[i:i + sentences_per_text]) for i in range(0, num_sentences, sentences_per_text)], sentences
+
+def _rate(count, seconds):
+    return f"{count / seconds:>10.0f} sentences/s"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched phrase chunker.")
+    parser.add_argument("--num-sentences", type=int, default=100000)
+    parser.add_argument("--baseline-sentences", type=int, default=10000,
+                        help="The per-sentence baseline is slow; it runs on this many sentences.")
+    parser.add_argument("--batch-texts", type=int, default=1000, help="Texts per chunk_phrases_batch call.")
+    args = parser.parse_args()
+
+    load_phrase_chunker()
+    texts, sentences = make_texts(args.num_sentences)
+    regexp_parser = nltk.RegexpParser(DEFAULT_GRAMMAR)
+    grammar = compile_chunk_grammar(DEFAULT_GRAMMAR)
+
+    print(f"\n--- End to end ({args.num_sentences} sentences in {len(texts)} texts) ---")
+    baseline = sentences[:args.baseline_sentences]
+    start = time.perf_counter()
+    for sentence in baseline:
+        regexp_parser.parse(nltk.pos_tag(nltk.word_tokenize(sentence)))
+    print(f"{'per sentence: tokenize, pos_tag, RegexpParser':<48}{_rate(len(baseline), time.perf_counter() - start)}")
+
+    start = time.perf_counter()
+    num_phrases = 0
+    for i in range(0, len(texts), args.batch_texts):
+        num_phrases += len(chunk_phrases_batch(texts[i:i + args.batch_texts])["label"])
+    elapsed = time.perf_counter() - start
+    print(f"{'chunk_phrases_batch':<48}{_rate(len(sentences), elapsed)}   {num_phrases} phrases, with offsets")
+
+    print(f"\n--- Grammar matching only (pre-tagged sentences) ---")
+    tagged = nltk.pos_tag_sents([sentence.split() for sentence in sentences])
+    tag_sequences = [[tag for _, tag in sentence] for sentence in tagged]
+    baseline = tagged[:args.baseline_sentences]
+    start = time.perf_counter()
+    for sentence in baseline:
+        regexp_parser.parse(sentence)
+    print(f"{'RegexpParser, per sentence':<48}{_rate(len(baseline), time.perf_counter() - start)}")
+    start = time.perf_counter()
+    for _ in grammar.find_chunks(tag_sequences):
+        pass
+    print(f"{'compiled grammar, one scan':<48}{_rate(len(tag_sequences), time.perf_counter() - start)}")
+
+if __name__ == "__main__":
+    main()
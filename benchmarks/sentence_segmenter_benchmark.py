@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from nltk.tokenize import sent_tokenize
+from nlu_app.sentence_segmenter import load_sentence_segmenter, split_sentences, clear_sentence_cache
+from nlu_app.textrank_summarizer import load_textrank_tools
+from nlu_app.textrank_summarizer import logic as textrank_logic
+
+# This script compares the shared sentence segmenter with the segmentations the
+# summarizers used before: NLTK's sent_tokenize (extractive and abstractive) and
+# sumy's tokenizer (TextRank). It reports the time per document, cold and from the
+# cache, and how often the segmenter's sentences differ from punkt's.
+# Requires NLTK's punkt data.
+
+WORDS = ["market", "company", "engineer", "report", "growth", "city", "plan", "quarter", "product", "customer",
+         "investment", "research", "team", "result", "policy", "energy", "price", "service", "network", "model"]
+# Words that make a period ambiguous, so that some regions go to punkt.
+TRICKY = ["Mr. Smith", "Dr. Jones", "the U.S. market", "e.g. prices", "J. Doe", "3.5 percent", "wait...", "(see Fig. 2)"]
+
+def make_document(num_sentences: int, tricky_rate: float, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(num_sentences):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 18))]
+        if rng.random() < tricky_rate:
+            words.insert(rng.randrange(1, len(words)), rng.choice(TRICKY))
+        sentences.append(" ".join(words).capitalize() + rng.choice([".", ".", ".", "!", "?", '."']))
+    paragraphs = [" ".join(sentences[i:i + 8]) for i in range(0, len(sentences), 8)]
+    return "\n\n".join(paragraphs)
+
+def _time(function, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = function()
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared sentence segmenter.")
+    parser.add_argument("--num-sentences", type=int, default=5000, help="Sentences per document.")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed runs of each segmentation.")
+    args = parser.parse_args()
+
+    load_sentence_segmenter()
+    load_textrank_tools()
+    print(f"\n--- {args.num_sentences} sentences, {args.rounds} rounds ---")
+    print(f"{'ambiguous sentences':<22}{'sent_tokenize':>16}{'sumy':>12}{'segmenter':>14}{'cached':>12}{'differ':>10}")
+    for tricky_rate in (0.0, 0.1, 0.5):
+        document = make_document(args.num_sentences, tricky_rate)
+        punkt_time, punkt_sentences = _time(lambda: sent_tokenize(document), args.rounds)
+        sumy_time, _ = _time(lambda: textrank_logic.sumy_tokenizer.to_sentences(document), args.rounds)
+
+        def cold():
+            clear_sentence_cache()
+            return split_sentences(document)
+        cold_time, sentences = _time(cold, args.rounds)
+        split_sentences(document)
+        cached_time, _ = _time(lambda: split_sentences(document), args.rounds)
+
+        # Paragraph breaks end a sentence for the segmenter but not for punkt, so
+        # compare paragraph by paragraph.
+        punkt_sentences = [s for paragraph in document.split("\n\n") for s in sent_tokenize(paragraph)]
+        differ = len(set(sentences) ^ set(punkt_sentences))
+        print(f"{tricky_rate:<22.0%}{punkt_time:>13.1f} ms{sumy_time:>9.1f} ms{cold_time:>11.1f} ms"
+              f"{cached_time:>9.2f} ms{differ:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import gzip
+import json
+import time
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fastapi.testclient import TestClient
+
+import nlu_app.main as main
+from nlu_app.serialization import FastJSONResponse
+
+# This script reports, for each list-returning endpoint, how much of the request time
+# is spent serializing the response. It compares the previous path (response model
+# construction and validation + model_dump + json.dumps) with the fast path (plain dict +
+# orjson), and shows how response size changes with include_text=false, the columnar
+# format and gzip. Run it from the repository root so that the models are found.
+
+REPEATS = 20
+
+PARAGRAPH = (
+    "Apple and Microsoft reported strong quarterly earnings on Thursday, while Amazon said its cloud business in Europe "
+    "grew faster than expected. Tim Cook told analysts in New York that demand in China and India remained healthy. "
+)
+LARGE_TEXT = PARAGRAPH * 200
+WORDS = main.tokenize_text(LARGE_TEXT)[:5000]
+
+def _tokenizer_output(body):
+    tokens = main.tokenize_text(body["text"])
+    return main.TokenizerOutput(original_text=body["text"], tokens=tokens, token_count=len(tokens))
+
+# (path, request body, function returning the previous response model for the same result)
+CASES = [
+    ("/tokenize-text", {"text": LARGE_TEXT}, _tokenizer_output),
+    ("/analyze-sentiment", {"text": LARGE_TEXT},
+     lambda body: main.SentimentOutput(original_text=body["text"], predicted_sentiment=main.predict_sentiment(body["text"]))),
+    ("/extract-entities", {"text": LARGE_TEXT},
+     lambda body: main.NerOutput(original_text=body["text"], entities=main.extract_named_entities(body["text"]))),
+    ("/process-words", {"words": WORDS},
+     lambda body: main.WordProcessingOutput(results=main.process_word_list(body["words"]))),
+    ("/analyze-morphology", {"words": WORDS},
+     lambda body: main.MorphologyOutput(results=main.analyze_morphology_list(body["words"]))),
+]
+
+def _median_time(function, repeats=REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+if __name__ == "__main__":
+    with TestClient(main.app) as client:
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.1)
+
+        print(f"\n--- Serialization Share of Request Time (median of {REPEATS}) ---")
+        # The requests run the fast path; the old request time is estimated by swapping
+        # the fast serialization time for the old one.
+        print(f"{'endpoint':<22}{'old req. ms':>12}{'old ser. ms':>13}{'old share':>11}"
+              f"{'fast req. ms':>14}{'fast ser. ms':>14}{'fast share':>12}")
+        for path, body, build_model in CASES:
+            request_time = _median_time(lambda: client.post(path, json=body))
+            model_output = build_model(body)
+            content = model_output.model_dump()
+            old_time = _median_time(
+                lambda: json.dumps(type(model_output)(**content).model_dump(mode="json"), ensure_ascii=False).encode("utf-8")
+            )
+            fast_time = _median_time(lambda: FastJSONResponse(content).body)
+            old_request_time = request_time - fast_time + old_time
+            print(f"{path:<22}{old_request_time * 1000:>12.1f}{old_time * 1000:>13.2f}{old_time / old_request_time:>11.1%}"
+                  f"{request_time * 1000:>14.1f}{fast_time * 1000:>14.2f}{fast_time / request_time:>12.1%}")
+
+        print("\n--- Response Size (bytes) ---")
+        print(f"{'endpoint':<22}{'default':>10}{'no text':>10}{'columnar':>10}{'gzip':>10}")
+        for path, body, _ in CASES:
+            default_size = len(client.post(path, json=body, headers={"Accept-Encoding": "identity"}).content)
+            no_text_size = len(client.post(path, json={**body, "include_text": False},
+                                           headers={"Accept-Encoding": "identity"}).content) if "text" in body else default_size
+            columnar_body = {**body, "format": "columnar"}
+            columnar_size = len(client.post(path, json=columnar_body, headers={"Accept-Encoding": "identity"}).content) \
+                if path in ("/extract-entities", "/process-words", "/analyze-morphology") else default_size
+            gzip_size = len(gzip.compress(client.post(path, json=body, headers={"Accept-Encoding": "identity"}).content))
+            print(f"{path:<22}{default_size:>10}{no_text_size:>10}{columnar_size:>10}{gzip_size:>10}")
@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+import httpx
+
+from nlu_app.prefork_server import read_memory_usage
+
+# This script sends the same concurrent load of summarization requests to the API
+# served by one uvicorn process and by the sharding router with several worker
+# processes per task. It reports the throughput, latency percentiles and the
+# memory of the processes that serve the load.
+# Run it from the repository root so that the 'saved_model' and 'nltk_data' directories are found.
+
+ENDPOINTS = ["/summarize-text/extractive", "/summarize-text/textrank"]
+
+WORDS = ["market", "company", "engineer", "report", "growth", "city", "plan", "quarter", "product", "customer",
+         "investment", "research", "team", "result", "policy", "energy", "price", "service", "network", "model"]
+
+def make_documents(count: int, num_sentences: int, seed: int = 7):
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+                     for _ in range(num_sentences)]
+        documents.append(" ".join(sentences))
+    return documents
+
+def _start_server(command, port):
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")])))
+    environment.setdefault("NLU_WARMUP_ROUNDS", "0")
+    process = subprocess.Popen(command, env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}: {' '.join(command)}")
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=2).status_code == 200:
+                return process, base_url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+
+async def _load(base_url, documents, concurrency):
+    latencies = []
+    queue = asyncio.Queue()
+    for index, document in enumerate(documents):
+        queue.put_nowait((ENDPOINTS[index % len(ENDPOINTS)], document))
+
+    async def client_loop(client):
+        while not queue.empty():
+            endpoint, document = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.post(endpoint, json={"text": document, "num_sentences": 3})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies
+
+def _memory_mb(base_url, process):
+    """Returns the total (RSS, PSS) in MB of the processes serving the summarization endpoints."""
+    response = httpx.get(f"{base_url}/router/workers", timeout=5)
+    if response.status_code == 200:
+        workers = [worker for worker in response.json()["workers"] if worker["task"] in ("extractive", "textrank")]
+        return sum(worker["rss_mb"] or 0 for worker in workers), sum(worker["pss_mb"] or 0 for worker in workers)
+    usage = read_memory_usage(process.pid) or {}
+    return usage.get("rss", 0) / 1024, usage.get("pss", 0) / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sharding router against a single server process.")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Worker processes each for the extractive and textrank tasks.")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per configuration.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once.")
+    parser.add_argument("--sentences", type=int, default=60, help="Sentences per document.")
+    parser.add_argument("--port", type=int, default=8765, help="Port the servers bind.")
+    args = parser.parse_args()
+
+    documents = make_documents(args.requests, args.sentences)
+    worker_spec = (f"extractive={args.workers},textrank={args.workers},"
+                   "sentiment=0,ner=0,abstractive=0,sessions=0,similarity=0")
+    configurations = [
+        ("single process", [sys.executable, "-m", "uvicorn", "nlu_app.main:app", "--port", str(args.port),
+                            "--log-level", "warning"]),
+        (f"router, {args.workers}+{args.workers} workers",
+         [sys.executable, "-m", "nlu_app.sharding_router", "--port", str(args.port), "--workers", worker_spec,
+          "--log-level", "warning"]),
+    ]
+
+    print(f"\n--- {args.requests} requests ({', '.join(ENDPOINTS)}), concurrency {args.concurrency} ---")
+    print(f"{'configuration':<28}{'req/s':>10}{'p50':>11}{'p95':>11}{'RSS':>12}{'PSS':>12}")
+    for label, command in configurations:
+        process, base_url = _start_server(command, args.port)
+        try:
+            asyncio.run(_load(base_url, documents[:args.concurrency], args.concurrency))
+            elapsed, latencies = asyncio.run(_load(base_url, documents, args.concurrency))
+            rss, pss = _memory_mb(base_url, process)
+        finally:
+            process.terminate()
+            process.wait()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000
+        print(f"{label:<28}{len(latencies) / elapsed:>10.1f}{p50:>8.1f} ms{p95:>8.1f} ms"
+              f"{rss:>9.0f} MB{pss:>9.0f} MB")
+
+if __name__ == "__main__":
+    main()
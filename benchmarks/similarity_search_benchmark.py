@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from nlu_app.similarity_search import TfidfIndex
+
+# This script measures the TF-IDF similarity index on a synthetic corpus whose word
+# frequencies follow Zipf's law, like natural text:
+#   1. build throughput (one segment) and incremental add throughput (many flushes);
+#   2. query throughput of single queries with early termination, against scoring every
+#      posting of the query terms (the batch path with one query at a time), and of
+#      batch queries, with the share of postings early termination skipped;
+#   3. size of the index on disk.
+
+NUM_DOCUMENTS = 200000
+VOCABULARY_SIZE = 50000
+NUM_QUERIES = 500
+TOP_K = 10
+
+def _make_corpus(num_documents, vocabulary_size, seed=7):
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"term{i}" for i in range(vocabulary_size)])
+    probabilities = 1.0 / np.arange(1, vocabulary_size + 1)
+    probabilities /= probabilities.sum()
+    lengths = rng.integers(20, 200, size=num_documents)
+    words = vocabulary[rng.choice(vocabulary_size, size=int(lengths.sum()), p=probabilities)]
+    boundaries = np.concatenate([[0], np.cumsum(lengths)])
+    return [" ".join(words[boundaries[i]:boundaries[i + 1]]) for i in range(num_documents)], vocabulary
+
+def _make_queries(vocabulary, num_queries, seed=11):
+    rng = random.Random(seed)
+    # Queries mix common and rare terms, like real keyword queries.
+    return [" ".join(rng.choice(vocabulary[:rng.choice([200, 5000, len(vocabulary)])]) for _ in range(rng.randint(2, 8)))
+            for _ in range(num_queries)]
+
+def _directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def _throughput(count, function):
+    start = time.perf_counter()
+    function()
+    return count / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the TF-IDF similarity index.")
+    parser.add_argument("--num-documents", type=int, default=NUM_DOCUMENTS)
+    parser.add_argument("--num-queries", type=int, default=NUM_QUERIES)
+    args = parser.parse_args()
+
+    print(f"Generating {args.num_documents} documents...")
+    texts, vocabulary = _make_corpus(args.num_documents, VOCABULARY_SIZE)
+    queries = _make_queries(vocabulary, args.num_queries)
+    work_dir = tempfile.mkdtemp(prefix="similarity_benchmark_")
+    try:
+        print("\n--- Indexing ---")
+        build_dir = os.path.join(work_dir, "built")
+        index = TfidfIndex(build_dir, flush_threshold=args.num_documents + 1)
+        os.makedirs(build_dir)
+        rate = _throughput(len(texts), lambda: (index.add_documents(texts), index.flush()))
+        print(f"{'build (one segment)':<36}{rate:>10.0f} docs/s   {_directory_size(build_dir) / 2**20:>8.1f} MB on disk")
+
+        incremental_dir = os.path.join(work_dir, "incremental")
+        os.makedirs(incremental_dir)
+        incremental = TfidfIndex(incremental_dir, flush_threshold=max(1, args.num_documents // 20))
+        batch_size = 1000
+
+        def add_incrementally():
+            for start in range(0, len(texts), batch_size):
+                incremental.add_documents(texts[start:start + batch_size])
+            incremental.flush()
+        rate = _throughput(len(texts), add_incrementally)
+        print(f"{'incremental adds (1000 docs/call)':<36}{rate:>10.0f} docs/s   "
+              f"{len(incremental.stats()['segments'])} segments after merges")
+
+        print(f"\n--- Queries (top {TOP_K}, {len(queries)} queries, memory-mapped index) ---")
+        index = TfidfIndex(build_dir)
+        index.search_batch(queries[:10], TOP_K)
+        for query in queries[:10]:
+            index.search(query, TOP_K)
+
+        rate = _throughput(len(queries), lambda: [index._search_vectors(index._snapshot(), [index._query_vector(q)], TOP_K)
+                                                  for q in queries])
+        print(f"{'exhaustive scoring, one at a time':<36}{rate:>10.0f} queries/s")
+        postings_read, postings_total = 0, 0
+        segment = index._snapshot()[0]
+        for query in queries:
+            term_ids, weights = index._query_vector(query)
+            postings_total += int((segment.offsets[term_ids + 1] - segment.offsets[term_ids]).sum())
+            postings_read += segment.search(term_ids, weights, TOP_K, 0.0)[2]
+        rate = _throughput(len(queries), lambda: [index.search(query, TOP_K) for query in queries])
+        print(f"{'early termination, one at a time':<36}{rate:>10.0f} queries/s   "
+              f"{1 - postings_read / max(postings_total, 1):.0%} of postings skipped")
+        rate = _throughput(len(queries), lambda: index.search_batch(queries, TOP_K))
+        print(f"{'batch (sparse product)':<36}{rate:>10.0f} queries/s")
+
+        mismatches = sum(
+            [r["doc_id"] for r in single] != [r["doc_id"] for r in batch]
+            for single, batch in zip((index.search(q, TOP_K) for q in queries), index.search_batch(queries, TOP_K))
+        )
+        print(f"\nqueries whose single and batch results differ: {mismatches} (ties aside, expected 0)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# This script measures the two costs paid before the API answers quickly:
+#   1. import time of nlu_app.main (and of a tokenizer-only process), and which heavy
+#      libraries each import pulls in;
+#   2. time until the service is ready and latency of the first request to each
+#      endpoint, with and without the startup warm-up stage.
+# Every measurement runs in a fresh process so that nothing is cached between runs.
+# Run it from the repository root so that the 'saved_model' and 'nltk_data' directories are found.
+
+HEAVY_MODULES = ["torch", "transformers", "spacy", "sumy", "nltk", "scipy.stats", "sklearn"]
+
+SAMPLE_TEXT = (
+    "The city council approved a new budget on Tuesday that increases spending on public transportation by fifteen percent. "
+    "The plan adds three new bus lines, extends the operating hours of the subway on weekends and funds the repair of several aging bridges. "
+    "Supporters said the investment would reduce traffic congestion and air pollution, while critics warned that property taxes could rise next year. "
+    "The mayor is expected to sign the budget into law by the end of the month."
+)
+
+REQUESTS = [
+    ("/analyze-sentiment", {"text": SAMPLE_TEXT}),
+    ("/extract-entities", {"text": SAMPLE_TEXT}),
+    ("/process-words", {"words": ["running", "better", "studies", "cities"]}),
+    ("/summarize-text/extractive", {"text": SAMPLE_TEXT, "num_sentences": 2}),
+    ("/summarize-text/textrank", {"text": SAMPLE_TEXT, "num_sentences": 2}),
+    ("/summarize-text/abstractive", {"text": SAMPLE_TEXT, "max_length": 60, "min_length": 10}),
+]
+
+def _measure_import(module_name, queue):
+    start = time.perf_counter()
+    __import__(module_name)
+    import_time = time.perf_counter() - start
+    queue.put({"import_time": import_time, "heavy": [name for name in HEAVY_MODULES if name in sys.modules]})
+
+def _measure_first_requests(warmup_rounds, queue):
+    os.environ["NLU_WARMUP_ROUNDS"] = str(warmup_rounds)
+    from fastapi.testclient import TestClient
+    from nlu_app.main import app
+
+    start = time.perf_counter()
+    with TestClient(app) as client:
+        startup_time = time.perf_counter() - start
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.05)
+        ready_time = time.perf_counter() - start
+
+        latencies = {}
+        for path, body in REQUESTS:
+            timings = []
+            for _ in range(2):
+                request_start = time.perf_counter()
+                client.post(path, json=body)
+                timings.append(time.perf_counter() - request_start)
+            latencies[path] = timings
+    queue.put({"startup_time": startup_time, "ready_time": ready_time, "latencies": latencies})
+
+def _run_in_fresh_process(target, *args):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=target, args=(*args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+if __name__ == "__main__":
+    print("\n--- Import Time (fresh process) ---")
+    for module_name in ["nlu_app.tokenizer", "nlu_app.main"]:
+        result = _run_in_fresh_process(_measure_import, module_name)
+        print(f"{module_name:<20} {result['import_time']:>6.2f}s  imports: {', '.join(result['heavy']) or '-'}")
+
+    runs = {}
+    for label, rounds in [("no warm-up", 0), ("warm-up", 2)]:
+        runs[label] = _run_in_fresh_process(_measure_first_requests, rounds)
+
+    print("\n--- Time to First Fast Request ---")
+    print(f"{'':<32}" + "".join(f"{label:>24}" for label in runs))
+    print(f"{'startup event (s)':<32}" + "".join(f"{run['startup_time']:>24.2f}" for run in runs.values()))
+    print(f"{'ready (s)':<32}" + "".join(f"{run['ready_time']:>24.2f}" for run in runs.values()))
+    print(f"{'endpoint: first / second (ms)':<32}")
+    for path, _ in REQUESTS:
+        cells = []
+        for run in runs.values():
+            first, second = run["latencies"][path]
+            cells.append(f"{first * 1000:>11.1f} / {second * 1000:>9.1f}")
+        print(f"{path:<32}" + "".join(f"{cell:>24}" for cell in cells))
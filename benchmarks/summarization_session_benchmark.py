@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from nlu_app.extractive_summarizer import load_summarizer_tools, generate_extractive_summary
+from nlu_app.textrank_summarizer import load_textrank_tools, generate_textrank_summary
+from nlu_app.summarization_sessions import SummarizationSession
+
+# This script simulates a live transcript that grows by a few sentences per update
+# and asks for a summary after every update. It compares resending the whole text
+# to the stateless summarizers with appending only the new text to a session.
+# Requires NLTK's punkt, stopwords and wordnet data.
+
+def _make_sentences(count, seed=7):
+    rng = random.Random(seed)
+    vocabulary = [f"{a}{b}{c}" for a in "bcdfgklmnprstvz" for b in ["ax", "ex", "ox", "ump", "ing", "ers", "il"]
+                  for c in "bdgkmnprst"]
+    sentences = []
+    for _ in range(count):
+        # Zipf-like word choice, so that a few words recur across sentences.
+        words = [vocabulary[min(int(rng.paretovariate(1.0)), len(vocabulary) - 1)] for _ in range(rng.randint(6, 18))]
+        sentences.append(" ".join(words).capitalize() + ".")
+    return sentences
+
+def _run(sentences, per_update, num_sentences, stateless, session):
+    checkpoints = {}
+    stateless_total = session_total = 0.0
+    for end in range(per_update, len(sentences) + 1, per_update):
+        new_text = " ".join(sentences[end - per_update:end]) + " "
+        start = time.perf_counter()
+        stateless(" ".join(sentences[:end]), num_sentences)
+        middle = time.perf_counter()
+        session.append(new_text, flush=True)
+        session.summary(num_sentences)
+        stateless_total += middle - start
+        session_total += time.perf_counter() - middle
+        checkpoints[end] = ((middle - start) * 1000, (time.perf_counter() - middle) * 1000)
+    return checkpoints, stateless_total, session_total
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental summarization sessions.")
+    parser.add_argument("--num-sentences", type=int, default=2000, help="Final document length in sentences.")
+    parser.add_argument("--per-update", type=int, default=5, help="Sentences appended per update.")
+    args = parser.parse_args()
+
+    load_summarizer_tools()
+    load_textrank_tools()
+    sentences = _make_sentences(args.num_sentences)
+    engines = [
+        ("extractive", lambda text, n: generate_extractive_summary(text, n), SummarizationSession("extractive")),
+        ("textrank", lambda text, n: generate_textrank_summary(text, n, method="fast"), SummarizationSession("textrank")),
+    ]
+    for name, stateless, session in engines:
+        checkpoints, stateless_total, session_total = _run(sentences, args.per_update, 3, stateless, session)
+        print(f"\n--- {name}: +{args.per_update} sentences and a summary per update ---")
+        print(f"{'document length':>16}{'resend whole text':>22}{'session append':>20}")
+        lengths = sorted(checkpoints)
+        for length in dict.fromkeys(lengths[::max(1, len(lengths) // 5)] + [lengths[-1]]):
+            resend, append = checkpoints[length]
+            print(f"{length:>16}{resend:>19.2f} ms{append:>17.2f} ms")
+        print(f"{'total':>16}{stateless_total:>20.2f} s{session_total:>18.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from nlu_app.textrank_summarizer import load_textrank_tools, generate_textrank_summary, evaluate_approximate_ranking
+
+# This script compares sumy's pure-Python LexRank with the vectorized NumPy engine
+# on documents with thousands of sentences, times the LSH-based approximate engine
+# on very long documents and reports how far its ranking deviates from exact LexRank.
+
+def _make_vocabulary(size):
+    """Builds `size` distinct alphabetic pseudo-words (the word tokenizer drops digits)."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(letters[(i // 26 ** k) % 26] for k in range(3)) + "x" for i in range(size)]
+
+VOCABULARY = _make_vocabulary(8000)
+# Zipf-like word weights, so a few words are very common and most are rare, as in real text.
+WORD_WEIGHTS = [1.0 / (rank + 1) ** 1.1 for rank in range(len(VOCABULARY))]
+
+def make_document(num_sentences, seed):
+    """Builds a synthetic document with the given number of sentences."""
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(num_sentences):
+        words = rng.choices(VOCABULARY, weights=WORD_WEIGHTS, k=rng.randint(6, 24))
+        sentences.append(" ".join(words).capitalize() + ".")
+    return " ".join(sentences)
+
+def time_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+if __name__ == "__main__":
+    load_textrank_tools()
+
+    print("\n--- TextRank Summarizer Benchmark ---")
+    for num_sentences in (500, 1_000, 2_000):
+        document = make_document(num_sentences, seed=num_sentences)
+        _, sumy_time = time_call(generate_textrank_summary, document, 5, method="sumy")
+        _, fast_time = time_call(generate_textrank_summary, document, 5, method="fast")
+        print(f"{num_sentences} sentences: sumy {sumy_time:.2f}s | fast {fast_time:.3f}s | "
+              f"speedup x{sumy_time / fast_time:.1f}")
+
+    print("\n--- Approximate (LSH) Engine on Very Long Documents ---")
+    for num_sentences in (10_000, 50_000):
+        document = make_document(num_sentences, seed=num_sentences)
+        _, approximate_time = time_call(generate_textrank_summary, document, 5, method="approximate")
+        print(f"{num_sentences} sentences: approximate {approximate_time:.2f}s")
+
+    print("\n--- Ranking Deviation from Exact LexRank (test set: 5 x 3000 sentences) ---")
+    test_set = [make_document(3_000, seed=100 + i) for i in range(5)]
+    report = evaluate_approximate_ranking(test_set, num_sentences=10)
+    print(f"Mean top-10 overlap: {report['mean_top_n_overlap']:.2f}")
+    print(f"Mean Spearman correlation of sentence scores: {report['mean_spearman_correlation']:.3f}")
+    print(f"Exact time: {report['exact_time']:.2f}s | approximate time: {report['approximate_time']:.2f}s")
@@ -1,7 +1,28 @@
-from .logic import load_abstractive_model, generate_abstractive_summary
+from .logic import (
+    load_abstractive_model,
+    unload_abstractive_model,
+    generate_abstractive_summary,
+    generate_long_abstractive_summary,
+    needs_long_document_mode,
+    stream_abstractive_summary,
+    get_encoder_cache_info,
+    get_abstractive_model_version,
+    EncoderCache,
+    DeadlineExceededError,
+    GENERATION_MODES
+)
 
 
 __all__ = [
     "load_abstractive_model",
-    "generate_abstractive_summary"
+    "unload_abstractive_model",
+    "generate_abstractive_summary",
+    "generate_long_abstractive_summary",
+    "needs_long_document_mode",
+    "stream_abstractive_summary",
+    "get_encoder_cache_info",
+    "get_abstractive_model_version",
+    "EncoderCache",
+    "DeadlineExceededError",
+    "GENERATION_MODES"
 ]
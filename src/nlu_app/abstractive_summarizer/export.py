@@ -0,0 +1,68 @@
+from transformers import AutoTokenizer
+from typing import Optional
+import argparse
+import tempfile
+import shutil
+import glob
+import os
+
+from .logic import default_onnx_dir
+
+# One-off command that exports the abstractive model to ONNX (optionally with
+# dynamically quantized int8 weights) for the "onnx" backend:
+#
+#   python -m nlu_app.abstractive_summarizer.export --model facebook/bart-large-cnn [--quantize]
+
+def export_onnx_model(model_name: str, output_dir: Optional[str] = None, quantize: bool = False) -> str:
+    """
+    Exports a seq2seq model to ONNX Runtime graphs and saves them with the tokenizer.
+
+    Args:
+        model_name (str): The Hugging Face model name.
+        output_dir (Optional[str]): Target directory. Defaults to 'onnx_models/<model>'.
+        quantize (bool): If True, the saved graphs use dynamic int8 quantization.
+
+    Returns:
+        str: The directory the model was written to.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError:
+        raise ImportError(
+            "Exporting to ONNX requires Optimum and ONNX Runtime. "
+            "Please install them by command 'pip install optimum[onnxruntime]'."
+        )
+
+    output_dir = output_dir or default_onnx_dir(model_name)
+    export_dir = tempfile.mkdtemp(prefix="onnx_export_") if quantize else output_dir
+
+    print(f"--- Exporting '{model_name}' to ONNX ---")
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+    model.save_pretrained(export_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+
+    if quantize:
+        print("--- Quantizing ONNX graphs (dynamic int8) ---")
+        quantization_config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        os.makedirs(output_dir, exist_ok=True)
+        for onnx_path in sorted(glob.glob(os.path.join(export_dir, "*.onnx"))):
+            quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=os.path.basename(onnx_path))
+            # An empty suffix keeps the original file names, so the loader finds them.
+            quantizer.quantize(save_dir=output_dir, quantization_config=quantization_config, file_suffix="")
+        # Copy the configuration and tokenizer files next to the quantized graphs.
+        for path in glob.glob(os.path.join(export_dir, "*")):
+            if os.path.isfile(path) and not path.endswith((".onnx", ".onnx_data")):
+                shutil.copy(path, output_dir)
+        shutil.rmtree(export_dir, ignore_errors=True)
+
+    print(f"ONNX model saved to '{output_dir}'.")
+    return output_dir
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the abstractive summarizer to ONNX Runtime.")
+    parser.add_argument("--model", default="facebook/bart-large-cnn", help="Hugging Face model name.")
+    parser.add_argument("--output", default=None, help="Output directory (default: onnx_models/<model>).")
+    parser.add_argument("--quantize", action="store_true", help="Apply dynamic int8 quantization to the graphs.")
+    args = parser.parse_args()
+    export_onnx_model(args.model, args.output, args.quantize)
@@ -1,36 +1,705 @@
-from transformers import pipeline
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import threading
+import hashlib
+import time
+import os
+
+from ..metrics import increment
+from ..sentence_segmenter import load_sentence_segmenter, sentence_spans, split_sentences
+from ..tracing import trace_span
+
+# transformers and torch take seconds to import, so they are imported inside the
+# functions that need them; processes that never load this model do not pay for them.
 
 summarizer_pipeline = None
+summarizer_backend = None
+encoder_cache = None
+
+# --- Module-Level Constants ---
+# "pytorch": fp32 eager PyTorch, "pytorch-int8": PyTorch with dynamically quantized
+# int8 linear layers, "onnx": a graph exported beforehand with the export command.
+BACKENDS = ("pytorch", "pytorch-int8", "onnx")
+# Where the export command writes ONNX graphs unless told otherwise.
+DEFAULT_ONNX_DIR = "onnx_models"
+# Maximum number of chunks summarized together in one batched generation call.
+CHUNK_BATCH_SIZE = 8
+# Safety limit on recursive reduce passes over the partial summaries.
+MAX_REDUCE_PASSES = 4
+# Generation settings for each latency tier, from cheapest to best quality.
+GENERATION_MODES = {
+    "fast": {"num_beams": 1, "do_sample": False},
+    "balanced": {"num_beams": 2, "do_sample": False, "early_stopping": True},
+    "quality": {"num_beams": 4, "do_sample": False, "early_stopping": True},
+}
+DEFAULT_MODE = "quality"
+# Memory for the encoder outputs kept for reuse (see EncoderCache). It fills up after
+# loading, so it is not part of the size the model manager measures for the model.
+DEFAULT_ENCODER_CACHE_BYTES = 64 * 1024 * 1024
+
+class DeadlineExceededError(Exception):
+    """Raised when a request's deadline has passed before any work was started."""
+
+class EncoderCache:
+    """
+    A bounded LRU cache of encoder outputs (the last hidden states of one input),
+    keyed by a hash of the input token ids. The decoder only reads these states, so
+    summaries of the same input with other length settings, in the same request or
+    a later one, start from the cached states and skip the encoder.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_ENCODER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._bytes = 0
+        self.hits = self.misses = 0
+        self.flops_saved = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token_ids: Sequence[int]) -> bytes:
+        return hashlib.blake2b(np.asarray(token_ids, dtype=np.int64).tobytes(), digest_size=16).digest()
+
+    def get(self, key: bytes):
+        with self._lock:
+            hidden_state = self._entries.get(key)
+            if hidden_state is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return hidden_state
+
+    def put(self, key: bytes, hidden_state):
+        size = hidden_state.element_size() * hidden_state.nelement()
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.element_size() * previous.nelement()
+            self._entries[key] = hidden_state
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.element_size() * evicted.nelement()
+
+    def record_saving(self, flops: float):
+        with self._lock:
+            self.flops_saved += flops
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "encoder_flops_saved": self.flops_saved,
+            }
+
+def default_onnx_dir(model_name: str) -> str:
+    """
+    Returns the directory the export command uses for the given model by default.
+    """
+    return os.path.join(DEFAULT_ONNX_DIR, model_name.rstrip("/").split("/")[-1])
 
-def load_abstractive_model(model_name: str = "facebook/bart-large-cnn"):
-    global summarizer_pipeline
-    print(f"--- Loading Abstractive Summarizer Model ({model_name}) ---")
+def _import_onnx_runtime():
     try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        import onnxruntime
+    except ImportError:
+        raise ImportError(
+            "The 'onnx' backend requires ONNX Runtime and Optimum. "
+            "Please install them by command 'pip install optimum[onnxruntime]'."
+        )
+    return ORTModelForSeq2SeqLM, onnxruntime
+
+def _build_pipeline(model_name: str, backend: str, num_threads: Optional[int], onnx_dir: Optional[str]):
+    """
+    Internal helper that creates the summarization pipeline for the selected backend.
+    """
+    from transformers import pipeline, AutoModelForSeq2SeqLM, AutoTokenizer
+    import torch
+
+    if backend == "pytorch":
+        return pipeline("summarization", model=model_name)
+
+    if backend == "pytorch-int8":
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        model.eval()
+        # Dynamic quantization: int8 weights for every nn.Linear, activations quantized on the fly.
+        quantized_model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        return pipeline("summarization", model=quantized_model, tokenizer=tokenizer)
+
+    ORTModelForSeq2SeqLM, onnxruntime = _import_onnx_runtime()
+    onnx_dir = onnx_dir or default_onnx_dir(model_name)
+    if not os.path.isdir(onnx_dir):
+        raise FileNotFoundError(
+            f"ONNX model directory '{onnx_dir}' not found. Please run "
+            f"'python -m nlu_app.abstractive_summarizer.export --model {model_name}' first."
+        )
+    session_options = onnxruntime.SessionOptions()
+    if num_threads:
+        session_options.intra_op_num_threads = num_threads
+        session_options.inter_op_num_threads = 1
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        onnx_dir, provider="CPUExecutionProvider", session_options=session_options
+    )
+    tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+def load_abstractive_model(
+    model_name: str = "facebook/bart-large-cnn",
+    backend: str = "pytorch",
+    num_threads: Optional[int] = None,
+    onnx_dir: Optional[str] = None,
+    encoder_cache_bytes: int = DEFAULT_ENCODER_CACHE_BYTES
+):
+    """
+    Loads the abstractive summarization model with the selected inference backend.
+    This should be called once when the application starts.
+
+    Args:
+        model_name (str): The Hugging Face model name.
+        backend (str): One of "pytorch", "pytorch-int8" or "onnx".
+        num_threads (Optional[int]): Intra-op threads used for inference. If None,
+                                     the runtime default (all cores) is kept.
+        onnx_dir (Optional[str]): Directory of the exported ONNX model for the "onnx" backend.
+        encoder_cache_bytes (int): Memory for cached encoder outputs; 0 disables the cache.
+                                   The "onnx" backend runs the pipeline and has no cache.
+    """
+    global summarizer_pipeline, summarizer_backend, encoder_cache
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown abstractive backend '{backend}'. Expected one of: {', '.join(BACKENDS)}.")
+
+    print(f"--- Loading Abstractive Summarizer Model ({model_name}, backend: {backend}) ---")
+    try:
+        # Long documents are chunked at sentence boundaries.
+        load_sentence_segmenter()
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
         # Initialize the pipeline for summarization
-        summarizer_pipeline = pipeline("summarization", model=model_name)
+        summarizer_pipeline = _build_pipeline(model_name, backend, num_threads, onnx_dir)
+        summarizer_backend = backend
+        encoder_cache = EncoderCache(encoder_cache_bytes) if encoder_cache_bytes > 0 and _reuses_encoder() else None
         print("Abstractive summarizer model loaded successfully.")
     except Exception as e:
         print(f"Error loading Hugging Face model '{model_name}': {e}")
         # Re-raise the exception to stop the server from starting incorrectly.
         raise e
 
+def unload_abstractive_model():
+    """
+    Releases the abstractive summarization pipeline and its encoder cache. It can be
+    loaded again with 'load_abstractive_model'.
+    """
+    global summarizer_pipeline, summarizer_backend, encoder_cache
+    summarizer_pipeline = summarizer_backend = encoder_cache = None
+    print("Abstractive summarizer model unloaded.")
+
+def _reuses_encoder() -> bool:
+    """
+    Internal helper telling whether generation runs the encoder separately and reuses
+    its outputs. The ONNX model's encoder and decoder are separate sessions that only
+    the pipeline drives, so the "onnx" backend keeps the pipeline path.
+    """
+    return summarizer_backend != "onnx"
+
+def _ensure_model_loaded():
+    if summarizer_pipeline is None:
+        raise RuntimeError("Abstractive summarizer model is not loaded. Please run 'load_abstractive_model' at startup.")
+
+def _token_budget() -> int:
+    """
+    Internal helper returning how many input tokens fit in the model's context,
+    leaving room for the special tokens the tokenizer adds.
+    """
+    tokenizer = summarizer_pipeline.tokenizer
+    context_size = min(
+        tokenizer.model_max_length,
+        getattr(summarizer_pipeline.model.config, "max_position_embeddings", tokenizer.model_max_length)
+    )
+    return context_size - tokenizer.num_special_tokens_to_add()
+
+def _split_into_chunks(text: str, token_budget: int) -> List[str]:
+    """
+    Internal helper that packs consecutive sentences into chunks of at most
+    `token_budget` tokens. A single sentence longer than the budget is cut into
+    budget-sized token windows.
+    """
+    tokenizer = summarizer_pipeline.tokenizer
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+    sentence_token_ids = tokenizer(sentences, add_special_tokens=False)["input_ids"]
+
+    chunks, current_sentences, current_length = [], [], 0
+    for sentence, token_ids in zip(sentences, sentence_token_ids):
+        if len(token_ids) > token_budget:
+            if current_sentences:
+                chunks.append(" ".join(current_sentences))
+                current_sentences, current_length = [], 0
+            for start in range(0, len(token_ids), token_budget):
+                chunks.append(tokenizer.decode(token_ids[start:start + token_budget]))
+            continue
+
+        # The joining space may add a token, so count one extra per sentence.
+        if current_sentences and current_length + len(token_ids) + 1 > token_budget:
+            chunks.append(" ".join(current_sentences))
+            current_sentences, current_length = [], 0
+        current_sentences.append(sentence)
+        current_length += len(token_ids) + 1
+
+    if current_sentences:
+        chunks.append(" ".join(current_sentences))
+    return chunks
+
+def _truncate_at_sentence(text: str, token_budget: int) -> str:
+    """
+    Internal helper that shortens a text longer than the model's context to the
+    whole sentences that fit, instead of letting the tokenizer's truncation cut the
+    last one off. A text whose first sentence alone does not fit is left to it.
+    """
+    tokenizer = summarizer_pipeline.tokenizer
+    # A token covers at least one character, so a shorter text always fits.
+    if len(text) <= token_budget or not getattr(tokenizer, "is_fast", False):
+        return text
+    offsets = tokenizer(
+        text, add_special_tokens=False, truncation=True, max_length=token_budget, return_offsets_mapping=True
+    )["offset_mapping"]
+    if len(offsets) < token_budget:
+        return text
+    spans = sentence_spans(text)
+    fitting = spans[spans[:, 1] <= offsets[-1][1]]
+    return text[:fitting[-1, 1]] if len(fitting) else text
+
+class _DeadlineCriteria:
+    """
+    Stops generation once the wall-clock deadline (a Unix timestamp) is reached and
+    remembers that it did, so the caller can flag the summary as truncated.
+    """
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.triggered = False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        if time.time() >= self.deadline:
+            self.triggered = True
+        return input_ids.new_full((input_ids.shape[0],), self.triggered).bool()
+
+def _generation_kwargs(mode: str, deadline: Optional[float]):
+    """
+    Internal helper that maps a latency tier and an optional deadline to generate()
+    keyword arguments. Returns the kwargs and the deadline criteria (or None).
+    Raises DeadlineExceededError if the deadline has already passed.
+    """
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"Unknown generation mode '{mode}'. Expected one of: {', '.join(GENERATION_MODES)}.")
+    generation_kwargs = dict(GENERATION_MODES[mode])
+    deadline_criteria = None
+    if deadline is not None:
+        if time.time() >= deadline:
+            raise DeadlineExceededError("The request deadline passed before generation started.")
+        from transformers import StoppingCriteriaList
+        deadline_criteria = _DeadlineCriteria(deadline)
+        generation_kwargs["stopping_criteria"] = StoppingCriteriaList([deadline_criteria])
+    return generation_kwargs, deadline_criteria
+
+def _encoder_flops(num_tokens: int) -> float:
+    """
+    Internal helper estimating the FLOPs of one encoder pass over `num_tokens` tokens
+    from the model configuration: per layer, the attention projections and the
+    feed-forward network (two FLOPs per multiply-add and token) plus the attention
+    scores and the weighted values.
+    """
+    config = summarizer_pipeline.model.config
+    num_layers = getattr(config, "encoder_layers", None) or config.num_hidden_layers
+    d_model = getattr(config, "d_model", None) or config.hidden_size
+    ffn_dim = getattr(config, "encoder_ffn_dim", None) or getattr(config, "intermediate_size", 4 * d_model)
+    projections = 2 * num_tokens * (4 * d_model * d_model + 2 * d_model * ffn_dim)
+    attention = 4 * num_tokens * num_tokens * d_model
+    return float(num_layers * (projections + attention))
+
+def _tokenize(texts: List[str]) -> List[List[int]]:
+    """
+    Internal helper that tokenizes the inputs, truncated to the model's context.
+    """
+    tokenizer = summarizer_pipeline.tokenizer
+    context_size = _token_budget() + tokenizer.num_special_tokens_to_add()
+    return tokenizer(texts, truncation=True, max_length=context_size)["input_ids"]
+
+def _pad(token_ids: List[List[int]]):
+    """
+    Internal helper that right-pads token id lists into an input id tensor and its attention mask.
+    """
+    import torch
+    num_tokens = max(len(ids) for ids in token_ids)
+    input_ids = torch.full((len(token_ids), num_tokens), summarizer_pipeline.tokenizer.pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(token_ids), num_tokens), dtype=torch.long)
+    for row, ids in enumerate(token_ids):
+        input_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+        attention_mask[row, :len(ids)] = 1
+    return input_ids, attention_mask
+
+def _encode(token_ids: List[List[int]]) -> Tuple[List[Any], List[bool]]:
+    """
+    Internal helper that returns the encoder's last hidden states of every input (one
+    (num_tokens, d_model) tensor each), from the encoder cache where possible. The
+    other inputs go through the encoder in padded batches.
+    Returns the hidden states and whether each one came from the cache.
+    """
+    import torch
+    model = summarizer_pipeline.model
+    cache = encoder_cache
+    keys = [EncoderCache.key(ids) for ids in token_ids] if cache is not None else [None] * len(token_ids)
+    hidden_states = [cache.get(key) if cache is not None else None for key in keys]
+    cached = [hidden_state is not None for hidden_state in hidden_states]
+
+    missing = [index for index, hidden_state in enumerate(hidden_states) if hidden_state is None]
+    for batch_start in range(0, len(missing), CHUNK_BATCH_SIZE):
+        batch_indices = missing[batch_start:batch_start + CHUNK_BATCH_SIZE]
+        input_ids, attention_mask = _pad([token_ids[index] for index in batch_indices])
+        with torch.no_grad(), trace_span("abstractive.encode", num_texts=len(batch_indices)):
+            outputs = model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask, return_dict=True)
+        for row, index in enumerate(batch_indices):
+            # Copy the row, so the cache does not keep the whole padded batch alive.
+            hidden_state = outputs.last_hidden_state[row, :len(token_ids[index])].clone()
+            hidden_states[index] = hidden_state
+            if cache is not None:
+                cache.put(keys[index], hidden_state)
+    return hidden_states, cached
+
+def _summarize_batch_with_pipeline(texts: List[str], lengths: Sequence[Tuple[int, int]],
+                                   generation_kwargs: Dict[str, Any]) -> List[List[str]]:
+    """
+    Internal helper that summarizes several texts with one batched pipeline call per
+    (max_length, min_length) setting; the encoder runs again for every setting.
+    """
+    summaries = []
+    for max_length, min_length in lengths:
+        with trace_span("abstractive.generate", num_texts=len(texts), max_length=max_length):
+            summary_results = summarizer_pipeline(
+                texts, max_length=max_length, min_length=min_length, truncation=True,
+                batch_size=min(len(texts), CHUNK_BATCH_SIZE), **generation_kwargs
+            )
+        summaries.append([result['summary_text'] for result in summary_results])
+    return summaries
+
+def _summarize_batch(texts: List[str], lengths: Sequence[Tuple[int, int]],
+                     generation_kwargs: Dict[str, Any]) -> Tuple[List[List[str]], float]:
+    """
+    Internal helper that summarizes several texts with every (max_length, min_length)
+    setting in `lengths`. The encoder runs at most once per text; each setting runs
+    the decoder from the same encoder states in batches of CHUNK_BATCH_SIZE texts.
+    Returns the summaries of each setting (in the order of `lengths`) and the
+    estimated encoder FLOPs that the reuse saved.
+    """
+    if not _reuses_encoder():
+        return _summarize_batch_with_pipeline(texts, lengths, generation_kwargs), 0.0
+
+    from transformers.modeling_outputs import BaseModelOutput
+    tokenizer, model = summarizer_pipeline.tokenizer, summarizer_pipeline.model
+    cache = encoder_cache
+    token_ids = _tokenize(texts)
+    hidden_states, cached = _encode(token_ids)
+
+    summaries = [[] for _ in lengths]
+    for batch_start in range(0, len(texts), CHUNK_BATCH_SIZE):
+        batch_ids = token_ids[batch_start:batch_start + CHUNK_BATCH_SIZE]
+        batch_states = hidden_states[batch_start:batch_start + CHUNK_BATCH_SIZE]
+        input_ids, attention_mask = _pad(batch_ids)
+        encoder_states = batch_states[0].new_zeros((*input_ids.shape, batch_states[0].shape[-1]))
+        for row, hidden_state in enumerate(batch_states):
+            encoder_states[row, :len(hidden_state)] = hidden_state
+
+        for length_index, (max_length, min_length) in enumerate(lengths):
+            with trace_span("abstractive.generate", num_texts=len(batch_ids), max_length=max_length):
+                # generate() expands and replaces the encoder outputs it gets for beam
+                # search, so every call gets its own wrapper around the shared states.
+                output_ids = model.generate(
+                    input_ids=input_ids, attention_mask=attention_mask,
+                    encoder_outputs=BaseModelOutput(last_hidden_state=encoder_states),
+                    max_length=max_length, min_length=min_length, **generation_kwargs
+                )
+            summaries[length_index].extend(
+                tokenizer.batch_decode(output_ids, skip_special_tokens=True, clean_up_tokenization_spaces=True)
+            )
+
+    # Every setting after the first reused the states; a cached text saved the first pass too.
+    flops_saved = sum(
+        (len(lengths) - (0 if from_cache else 1)) * _encoder_flops(len(ids))
+        for ids, from_cache in zip(token_ids, cached)
+    )
+    if flops_saved:
+        increment("abstractive.encoder_flops_saved", flops_saved)
+        if cache is not None:
+            cache.record_saving(flops_saved)
+    return summaries, flops_saved
+
+def needs_long_document_mode(text: str) -> bool:
+    """
+    Tells whether the text is longer than the model's context and would be truncated
+    by a single generation call.
+
+    Args:
+        text (str): The input text.
+
+    Returns:
+        bool: True if the text should be summarized with 'generate_long_abstractive_summary'.
+    """
+    _ensure_model_loaded()
+    with trace_span("abstractive.count_tokens", text_length=len(text)):
+        token_count = len(summarizer_pipeline.tokenizer(text, add_special_tokens=False)["input_ids"])
+    return token_count > _token_budget()
+
 def generate_abstractive_summary(
-    text: str, 
-    max_length: int = 130, 
-    min_length: int = 30
-) -> str:
+    text: str,
+    max_length: int = 130,
+    min_length: int = 30,
+    mode: str = DEFAULT_MODE,
+    deadline: Optional[float] = None,
+    lengths: Optional[Sequence[Tuple[int, int]]] = None
+) -> Dict[str, Any]:
     """
     Args:
         text (str): The input text to be summarized.
         max_length (int): The maximum length of the summary.
         min_length (int): The minimum length of the summary.
+        mode (str): Latency tier: "fast" (greedy), "balanced" or "quality" (beam search).
+        deadline (Optional[float]): Unix timestamp at which generation is stopped and
+                                    the best partial summary is returned.
+        lengths (Optional[Sequence[Tuple[int, int]]]): Several (max_length, min_length)
+                                                       settings to summarize the text with,
+                                                       instead of `max_length` and `min_length`.
+                                                       The encoder runs once for all of them.
 
     Returns:
-        str: The generated summary text.
+        Dict[str, Any]: The summary of every length setting ('summaries', the first one
+                        also as 'summary'), whether they were truncated by the deadline
+                        and the estimated encoder FLOPs saved by reusing encoder outputs.
     """
-    if summarizer_pipeline is None:
-        raise RuntimeError("Abstractive summarizer model is not loaded. Please run 'load_abstractive_model' at startup.")
+    _ensure_model_loaded()
+    generation_kwargs, deadline_criteria = _generation_kwargs(mode, deadline)
+    lengths = list(lengths) if lengths else [(max_length, min_length)]
+
+    with trace_span("abstractive.summarize", text_length=len(text), num_lengths=len(lengths), mode=mode):
+        text = _truncate_at_sentence(text, _token_budget())
+        summaries, flops_saved = _summarize_batch([text], lengths, generation_kwargs)
+    summaries = [length_summaries[0] for length_summaries in summaries]
+    return {
+        "summary": summaries[0],
+        "summaries": summaries,
+        "truncated": deadline_criteria is not None and deadline_criteria.triggered,
+        "encoder_flops_saved": flops_saved,
+    }
+
+def _map_reduce(chunks: List[str], max_length: int, min_length: int, token_budget: int,
+                generation_kwargs: Dict[str, Any], deadline_criteria, stage_timings: Dict[str, float]):
+    """
+    Internal helper running the map and reduce stages for one length setting. Adds
+    the duration of every stage to `stage_timings`.
+    Returns the summary and the encoder FLOPs saved.
+    """
+    flops_saved = 0.0
+    stage_name, current_texts = "map", chunks
+    for reduce_pass in range(1, MAX_REDUCE_PASSES + 2):
+        stage_start = time.perf_counter()
+        with trace_span(f"abstractive.{stage_name}"):
+            (partial_summaries,), saved = _summarize_batch(current_texts, [(max_length, min_length)], generation_kwargs)
+        flops_saved += saved
+        stage_timings[stage_name] = stage_timings.get(stage_name, 0.0) + time.perf_counter() - stage_start
+        if len(partial_summaries) == 1:
+            break
+        if deadline_criteria is not None and (deadline_criteria.triggered or time.time() >= deadline_criteria.deadline):
+            # No time left for another pass; the partial summaries are the best we have.
+            deadline_criteria.triggered = True
+            partial_summaries = [" ".join(partial_summaries)]
+            break
+
+        stage_name = f"reduce_{reduce_pass}"
+        combined = " ".join(partial_summaries)
+        if reduce_pass >= MAX_REDUCE_PASSES:
+            # The partial summaries are not shrinking; summarize what fits in one pass.
+            current_texts = [combined]
+        else:
+            current_texts = _split_into_chunks(combined, token_budget)
+    return partial_summaries[0], flops_saved
+
+def generate_long_abstractive_summary(
+    text: str,
+    max_length: int = 130,
+    min_length: int = 30,
+    mode: str = DEFAULT_MODE,
+    deadline: Optional[float] = None,
+    lengths: Optional[Sequence[Tuple[int, int]]] = None
+) -> Dict[str, Any]:
+    """
+    Summarizes a text longer than the model's context with a map-reduce strategy.
+    The text is split into token-budgeted chunks at sentence boundaries, the chunks
+    are summarized in one batched generation call (map), and the concatenated partial
+    summaries are summarized again (reduce), recursively while they still do not fit.
+
+    Args:
+        text (str): The input text to be summarized.
+        max_length (int): The maximum length of the final and partial summaries.
+        min_length (int): The minimum length of the final and partial summaries.
+        mode (str): Latency tier: "fast" (greedy), "balanced" or "quality" (beam search).
+        deadline (Optional[float]): Unix timestamp at which generation is stopped. The
+                                    partial summaries produced so far are then returned.
+        lengths (Optional[Sequence[Tuple[int, int]]]): Several (max_length, min_length)
+                                                       settings, instead of `max_length` and
+                                                       `min_length`. The chunks are chunked and
+                                                       encoded once for all of them.
+
+    Returns:
+        Dict[str, Any]: The summary of every length setting ('summaries', the first one
+                        also as 'summary'), whether they were truncated by the deadline,
+                        the number of chunks of the input, the total generation time, the
+                        duration of every stage in seconds (summed over the settings) and
+                        the estimated encoder FLOPs saved by reusing encoder outputs.
+    """
+    _ensure_model_loaded()
+    generation_kwargs, deadline_criteria = _generation_kwargs(mode, deadline)
+    lengths = list(lengths) if lengths else [(max_length, min_length)]
+    start_time = time.perf_counter()
+    token_budget = _token_budget()
+
+    stage_start = time.perf_counter()
+    with trace_span("abstractive.chunking", text_length=len(text)):
+        chunks = _split_into_chunks(text, token_budget)
+    stage_timings = {"chunking": time.perf_counter() - stage_start}
+    chunk_count = len(chunks)
+    if not chunks:
+        return {"summary": "", "summaries": ["" for _ in lengths], "truncated": False, "chunk_count": 0,
+                "generation_time": 0.0, "stage_timings": stage_timings, "encoder_flops_saved": 0.0}
+
+    summaries, flops_saved = [], 0.0
+    for length_max, length_min in lengths:
+        # The map stage of every setting after the first finds the chunks in the encoder cache.
+        summary, saved = _map_reduce(
+            chunks, length_max, length_min, token_budget, generation_kwargs, deadline_criteria, stage_timings
+        )
+        summaries.append(summary)
+        flops_saved += saved
+
+    return {
+        "summary": summaries[0],
+        "summaries": summaries,
+        "truncated": deadline_criteria is not None and deadline_criteria.triggered,
+        "chunk_count": chunk_count,
+        "generation_time": time.perf_counter() - start_time,
+        "stage_timings": stage_timings,
+        "encoder_flops_saved": flops_saved,
+    }
+
+def get_abstractive_model_version() -> str:
+    """
+    Returns the name (and revision, when known) of the loaded model, e.g.
+    'facebook/bart-large-cnn@<commit>', which identifies its tokenizer and context size.
+    """
+    _ensure_model_loaded()
+    config = summarizer_pipeline.model.config
+    revision = getattr(config, "_commit_hash", None)
+    return f"{config.name_or_path}@{revision}" if revision else config.name_or_path
+
+def get_encoder_cache_info() -> Optional[Dict[str, Any]]:
+    """Returns the size, hit counts and saved encoder FLOPs of the encoder cache, or None if there is none."""
+    return encoder_cache.info() if encoder_cache is not None else None
+
+class _CancellationCriteria:
+    """
+    Stops generation as soon as the given event is set, e.g. when the client
+    of a streaming request disconnects.
+    """
+    def __init__(self, cancel_event: threading.Event):
+        self.cancel_event = cancel_event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return input_ids.new_full((input_ids.shape[0],), self.cancel_event.is_set()).bool()
+
+def stream_abstractive_summary(
+    text: str,
+    max_length: int = 130,
+    min_length: int = 30,
+    cancel_event: Optional[threading.Event] = None,
+    deadline: Optional[float] = None
+) -> Iterator[str]:
+    """
+    Starts generating a summary in a background thread and returns an iterator over
+    the decoded text pieces as soon as the model produces them. Streaming requires
+    greedy decoding, so beam search is disabled for this variant.
+
+    Args:
+        text (str): The input text to be summarized.
+        max_length (int): The maximum length of the summary.
+        min_length (int): The minimum length of the summary.
+        cancel_event (Optional[threading.Event]): Setting this event stops generation
+                                                  at the next decoding step.
+        deadline (Optional[float]): Unix timestamp at which generation stops, ending
+                                    the stream with the pieces produced so far.
+
+    Returns:
+        Iterator[str]: The decoded text pieces, in order.
+
+    Raises:
+        DeadlineExceededError: If the deadline has already passed.
+    """
+    if deadline is not None and time.time() >= deadline:
+        raise DeadlineExceededError("The request deadline passed before generation started.")
+    _ensure_model_loaded()
+    from transformers import StoppingCriteriaList, TextIteratorStreamer
+    # Keep our own references so that unloading the model mid-stream cannot break generation.
+    tokenizer, model = summarizer_pipeline.tokenizer, summarizer_pipeline.model
+    cancel_event = cancel_event or threading.Event()
+
+    text = _truncate_at_sentence(text, _token_budget())
+    if _reuses_encoder():
+        from transformers.modeling_outputs import BaseModelOutput
+        # The cache may be unloaded with the model while this request runs.
+        cache = encoder_cache
+        token_ids = _tokenize([text])
+        (hidden_state,), (from_cache,) = _encode(token_ids)
+        if from_cache:
+            flops_saved = _encoder_flops(len(token_ids[0]))
+            increment("abstractive.encoder_flops_saved", flops_saved)
+            if cache is not None:
+                cache.record_saving(flops_saved)
+        input_ids, attention_mask = _pad(token_ids)
+        inputs = {
+            "input_ids": input_ids, "attention_mask": attention_mask,
+            "encoder_outputs": BaseModelOutput(last_hidden_state=hidden_state.unsqueeze(0)),
+        }
+    else:
+        inputs = tokenizer(text, return_tensors="pt", truncation=True)
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    stopping_criteria = [_CancellationCriteria(cancel_event)]
+    if deadline is not None:
+        stopping_criteria.append(_DeadlineCriteria(deadline))
+    generation_errors = []
+
+    def _generate():
+        try:
+            model.generate(
+                **inputs, max_length=max_length, min_length=min_length, num_beams=1, do_sample=False,
+                streamer=streamer, stopping_criteria=StoppingCriteriaList(stopping_criteria)
+            )
+        except Exception as e:
+            generation_errors.append(e)
+            # Unblock the consumer; generate() only ends the stream on success.
+            streamer.end()
+
+    threading.Thread(target=_generate, daemon=True).start()
 
+    def _iterate():
+        for text_piece in streamer:
+            if text_piece:
+                yield text_piece
+        if generation_errors:
+            raise generation_errors[0]
 
-    summary_result = summarizer_pipeline(text, max_length=max_length, min_length=min_length, do_sample=False)
-    return summary_result[0]['summary_text']
+    return _iterate()
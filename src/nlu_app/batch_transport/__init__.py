@@ -0,0 +1,20 @@
+from .logic import (
+    ListColumn,
+    UnsupportedFormatError,
+    request_format,
+    response_format,
+    decode_texts,
+    encode_columns,
+    FORMAT_MEDIA_TYPES
+)
+
+
+__all__ = [
+    "ListColumn",
+    "UnsupportedFormatError",
+    "request_format",
+    "response_format",
+    "decode_texts",
+    "encode_columns",
+    "FORMAT_MEDIA_TYPES"
+]
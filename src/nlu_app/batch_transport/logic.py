@@ -0,0 +1,194 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# --- Module-Level Constants ---
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+# Accepted spellings of each format's media type.
+MEDIA_TYPES = {
+    JSON_MEDIA_TYPE: "json",
+    MSGPACK_MEDIA_TYPE: "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.msgpack": "msgpack",
+    ARROW_MEDIA_TYPE: "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+}
+FORMAT_MEDIA_TYPES = {"json": JSON_MEDIA_TYPE, "msgpack": MSGPACK_MEDIA_TYPE, "arrow": ARROW_MEDIA_TYPE}
+# Name of the input column of Arrow requests and of the list in JSON/MessagePack requests.
+TEXT_COLUMN = "text"
+
+class UnsupportedFormatError(Exception):
+    """Raised when a request or response format is unknown or its optional library is missing."""
+
+class ListColumn:
+    """
+    A column holding a list per row, stored flat: the items of row i are
+    values[offsets[i]:offsets[i + 1]]. `values` is either a list of scalars or, for a
+    list of structs, a dict mapping each struct field to its flat list of values.
+    """
+    def __init__(self, offsets: Sequence[int], values: Union[List[Any], Dict[str, List[Any]]]):
+        self.offsets = offsets
+        self.values = values
+
+    def to_rows(self) -> List[List[Any]]:
+        """Returns one Python list per row (a list of dicts for struct values)."""
+        rows = []
+        for start, end in zip(self.offsets[:-1], self.offsets[1:]):
+            if isinstance(self.values, dict):
+                fields = list(self.values)
+                rows.append([dict(zip(fields, item)) for item in zip(*(self.values[f][start:end] for f in fields))])
+            else:
+                rows.append(self.values[start:end])
+        return rows
+
+Column = Union[List[Any], ListColumn]
+
+def _import_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedFormatError(
+            "MessagePack requires the 'msgpack' package. Please install it by command 'pip install msgpack'."
+        )
+    return msgpack
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise UnsupportedFormatError(
+            "Arrow IPC requires the 'pyarrow' package. Please install it by command 'pip install pyarrow'."
+        )
+    return pyarrow
+
+def _media_type(value: str) -> str:
+    return value.split(";", 1)[0].strip().lower()
+
+def request_format(content_type: Optional[str]) -> str:
+    """
+    Maps a Content-Type header to "json", "msgpack" or "arrow" (JSON if missing).
+    """
+    if not content_type:
+        return "json"
+    media_type = _media_type(content_type)
+    if media_type not in MEDIA_TYPES:
+        raise UnsupportedFormatError(
+            f"Unsupported request Content-Type '{media_type}'. Expected one of: {', '.join(FORMAT_MEDIA_TYPES.values())}."
+        )
+    return MEDIA_TYPES[media_type]
+
+def response_format(accept: Optional[str], default: str) -> str:
+    """
+    Picks the response format from an Accept header, preferring higher q-values and
+    then the listed order. Wildcards (or no header) select `default`, the request format.
+    """
+    if not accept:
+        return default
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        candidates.append((-quality, position, media_type.strip().lower()))
+    for negative_quality, _, media_type in sorted(candidates):
+        if negative_quality == 0:
+            break
+        if media_type in ("*/*", "application/*"):
+            return default
+        if media_type in MEDIA_TYPES:
+            return MEDIA_TYPES[media_type]
+    raise UnsupportedFormatError(
+        f"None of the accepted media types is supported. Expected one of: {', '.join(FORMAT_MEDIA_TYPES.values())}."
+    )
+
+def decode_texts(body: bytes, fmt: str, column: str = TEXT_COLUMN) -> List[str]:
+    """
+    Reads the batch of input texts from a request body.
+    JSON and MessagePack bodies are {"text": [...]} (or a bare list); Arrow bodies are
+    an IPC stream whose record batches have a string column named `column`.
+
+    Args:
+        body (bytes): The raw request body.
+        fmt (str): "json", "msgpack" or "arrow".
+        column (str): The input column / key name.
+
+    Returns:
+        List[str]: The input texts.
+    """
+    if fmt == "arrow":
+        pyarrow = _import_pyarrow()
+        try:
+            table = pyarrow.ipc.open_stream(body).read_all()
+        except pyarrow.ArrowInvalid:
+            table = pyarrow.ipc.open_file(pyarrow.BufferReader(body)).read_all()
+        if column not in table.column_names:
+            raise ValueError(f"The Arrow record batch has no '{column}' column.")
+        texts = table.column(column).to_pylist()
+    else:
+        payload = _import_msgpack().unpackb(body) if fmt == "msgpack" else json.loads(body)
+        texts = payload.get(column) if isinstance(payload, dict) else payload
+        if not isinstance(texts, list):
+            raise ValueError(f"The request body must be a list of strings or an object with a '{column}' list.")
+    if not all(isinstance(text, str) for text in texts):
+        raise ValueError("Every input must be a string.")
+    return texts
+
+def _scalar_array(pyarrow, values: List[Any]):
+    array = pyarrow.array(values)
+    # A column without any value (e.g. no word had a prefix) is typed as string, not null.
+    if pyarrow.types.is_null(array.type):
+        array = array.cast(pyarrow.string())
+    return array
+
+def _to_arrow_array(pyarrow, values: Column):
+    if not isinstance(values, ListColumn):
+        return _scalar_array(pyarrow, values)
+    offsets = pyarrow.array(values.offsets, type=pyarrow.int32())
+    if isinstance(values.values, dict):
+        items = pyarrow.StructArray.from_arrays(
+            [_scalar_array(pyarrow, field_values) for field_values in values.values.values()], names=list(values.values)
+        )
+    else:
+        items = _scalar_array(pyarrow, values.values)
+    return pyarrow.ListArray.from_arrays(offsets, items)
+
+def encode_columns(columns: Dict[str, Column], fmt: str) -> Tuple[bytes, str]:
+    """
+    Serializes batch results given column by column (one value per input row).
+    Arrow responses are a single record batch built straight from the columns;
+    JSON and MessagePack responses are {"results": {column: [value per row]}}.
+
+    Args:
+        columns (Dict[str, Column]): Result columns; ListColumn for per-row lists.
+        fmt (str): "json", "msgpack" or "arrow".
+
+    Returns:
+        Tuple[bytes, str]: The body and its media type.
+    """
+    if fmt == "arrow":
+        pyarrow = _import_pyarrow()
+        batch = pyarrow.record_batch([_to_arrow_array(pyarrow, values) for values in columns.values()], names=list(columns))
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes(), ARROW_MEDIA_TYPE
+
+    results = {name: values.to_rows() if isinstance(values, ListColumn) else values for name, values in columns.items()}
+    if fmt == "msgpack":
+        return _import_msgpack().packb({"results": results}), MSGPACK_MEDIA_TYPE
+    if orjson is not None:
+        return orjson.dumps({"results": results}), JSON_MEDIA_TYPE
+    return json.dumps({"results": results}, ensure_ascii=False).encode("utf-8"), JSON_MEDIA_TYPE
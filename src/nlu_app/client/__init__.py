@@ -0,0 +1,8 @@
+from .logic import AsyncNLUClient, NLUClient, NLUClientError
+
+
+__all__ = [
+    "AsyncNLUClient",
+    "NLUClient",
+    "NLUClientError"
+]
@@ -0,0 +1,354 @@
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+import threading
+import asyncio
+import inspect
+import random
+import time
+
+try:
+    import httpx
+except ImportError:
+    raise ImportError("The NLU client requires httpx. Please install it by command 'pip install httpx'.")
+
+# --- Module-Level Constants ---
+DEFAULT_BASE_URL = "http://127.0.0.1:8000"
+# Status codes that mean "try again later".
+RETRY_STATUS_CODES = (429, 503)
+# Methods retried when the connection drops after the request was sent; others may have taken effect already.
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+# Batch endpoint, result column and the key of the single-item response for each auto-batched call.
+BATCHED_CALLS = {
+    "analyze_sentiment": ("/batch/analyze-sentiment", "predicted_sentiment"),
+    "tokenize": ("/batch/tokenize-text", "tokens"),
+    "extract_entities": ("/batch/extract-entities", "entities"),
+}
+# Fields of an entity returned by /extract-entities; the batch endpoint adds character offsets.
+ENTITY_FIELDS = ("text", "label", "explanation")
+
+class NLUClientError(Exception):
+    """Raised when the API answers with an error status (after any retries)."""
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(f"HTTP {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Internal helper parsing a Retry-After header given in seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class _AutoBatcher:
+    """
+    Collects single-item calls for one batch endpoint and sends them together, once
+    `max_batch_size` items are waiting or `max_delay` seconds after the first one.
+    """
+    def __init__(self, client: "AsyncNLUClient", path: str, column: str, max_batch_size: int, max_delay: float):
+        self.client = client
+        self.path = path
+        self.column = column
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: List[tuple] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._send_tasks: Set["asyncio.Task"] = set()
+
+    def submit(self, text: str) -> "asyncio.Future":
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush)
+        return future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._send(batch))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    async def drain(self):
+        """Sends the waiting calls and waits until every batch in flight is answered."""
+        self._flush()
+        if self._send_tasks:
+            await asyncio.gather(*self._send_tasks, return_exceptions=True)
+
+    async def _send(self, batch: List[tuple]):
+        try:
+            response = await self.client._request("POST", self.path, json={"text": [text for text, _ in batch]})
+            results = response.json()["results"][self.column]
+        except BaseException as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+class AsyncNLUClient:
+    """
+    Asynchronous client for the NLU API. One instance keeps a pool of keep-alive
+    connections, limits the number of requests in flight, retries 429/503 answers
+    (honouring Retry-After) and connection errors with exponential backoff, and merges
+    concurrent analyze_sentiment / tokenize / extract_entities calls into batch requests.
+
+    Use it as an async context manager, or call 'aclose' when done.
+    """
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = 60.0,
+        max_connections: int = 16,
+        max_concurrency: int = 16,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        auto_batch: bool = True,
+        max_batch_size: int = 64,
+        max_batch_delay: float = 0.005,
+        http2: bool = False,
+        transport: Optional[Any] = None
+    ):
+        """
+        Args:
+            base_url (str): The server URL.
+            timeout (float): Seconds before a request is abandoned.
+            max_connections (int): Size of the connection pool.
+            max_concurrency (int): Maximum requests in flight at once.
+            max_retries (int): Retries of a request answered with 429/503 or failing to connect.
+            backoff_base (float): First backoff delay in seconds; doubled on each retry (with jitter).
+            backoff_max (float): Upper bound of a backoff delay (and of an honoured Retry-After).
+            auto_batch (bool): Merge concurrent single-item calls into batch requests.
+            max_batch_size (int): Largest automatic batch.
+            max_batch_delay (float): Longest time a call waits for others to join its batch.
+            http2 (bool): Multiplex requests over HTTP/2 (requires the 'h2' package and a server that supports it).
+            transport: Optional httpx transport (e.g. httpx.ASGITransport for in-process use).
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.auto_batch = auto_batch
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            http2=http2,
+            transport=transport,
+        )
+        self._max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._batchers: Dict[str, _AutoBatcher] = {}
+
+    async def __aenter__(self) -> "AsyncNLUClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        # Batches still in flight need the connection pool, so they finish first.
+        await asyncio.gather(*(batcher.drain() for batcher in self._batchers.values()))
+        await self._http.aclose()
+
+    def _backoff_delay(self, attempt: int, response: Optional["httpx.Response"]) -> float:
+        retry_after = _retry_after_seconds(response.headers.get("retry-after")) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Exponential backoff with full jitter, so that many clients do not retry in lockstep.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _request(self, method: str, path: str, **kwargs) -> "httpx.Response":
+        """
+        Internal helper that sends a request within the concurrency limit, retrying
+        429/503 answers, failed connection attempts and, for idempotent methods only,
+        connections dropped mid-request. Raises NLUClientError on other errors.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        attempt = 0
+        while True:
+            response = None
+            try:
+                async with self._semaphore:
+                    response = await self._http.request(method, path, **kwargs)
+            except (httpx.ConnectError, httpx.PoolTimeout):
+                if attempt >= self.max_retries:
+                    raise
+            except httpx.RemoteProtocolError:
+                if method.upper() not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    break
+            await asyncio.sleep(self._backoff_delay(attempt, response))
+            attempt += 1
+
+        if response.is_error:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise NLUClientError(response.status_code, detail)
+        return response
+
+    async def _post_json(self, path: str, payload: Dict[str, Any]) -> Any:
+        return (await self._request("POST", path, json=payload)).json()
+
+    async def _batched(self, name: str, text: str) -> Any:
+        if name not in self._batchers:
+            path, column = BATCHED_CALLS[name]
+            self._batchers[name] = _AutoBatcher(self, path, column, self.max_batch_size, self.max_batch_delay)
+        return await self._batchers[name].submit(text)
+
+    # --- Health ---
+
+    async def health(self) -> Dict[str, Any]:
+        return (await self._request("GET", "/")).json()
+
+    async def is_ready(self) -> bool:
+        response = await self._http.get("/ready")
+        return response.status_code == 200
+
+    # --- Single-item calls (auto-batched where a batch endpoint exists) ---
+
+    async def analyze_sentiment(self, text: str) -> str:
+        """Returns the predicted sentiment label of a text."""
+        if self.auto_batch:
+            return await self._batched("analyze_sentiment", text)
+        return (await self._post_json("/analyze-sentiment", {"text": text, "include_text": False}))["predicted_sentiment"]
+
+    async def tokenize(self, text: str) -> List[str]:
+        """Returns the tokens of a text."""
+        if self.auto_batch:
+            return await self._batched("tokenize", text)
+        return (await self._post_json("/tokenize-text", {"text": text, "include_text": False}))["tokens"]
+
+    async def extract_entities(self, text: str) -> List[Dict[str, Any]]:
+        """Returns the named entities of a text."""
+        if self.auto_batch:
+            entities = await self._batched("extract_entities", text)
+            return [{field: entity.get(field) for field in ENTITY_FIELDS} for entity in entities]
+        return (await self._post_json("/extract-entities", {"text": text, "include_text": False}))["entities"]
+
+    async def analyze_sentiment_many(self, texts: List[str]) -> List[str]:
+        """Returns the sentiment of every text; concurrent calls are merged into batches."""
+        return list(await asyncio.gather(*(self.analyze_sentiment(text) for text in texts)))
+
+    async def visualize_entities(self, text: str) -> str:
+        """Returns the displaCy HTML page of the entities of a text."""
+        return (await self._request("POST", "/visualize-entities", json={"text": text})).text
+
+    async def process_words(self, words: List[str]) -> List[Dict[str, str]]:
+        return (await self._post_json("/process-words", {"words": words}))["results"]
+
+    async def analyze_morphology(self, words: List[str]) -> List[Dict[str, Any]]:
+        return (await self._post_json("/analyze-morphology", {"words": words}))["results"]
+
+    # --- Summarization ---
+
+    async def summarize_extractive(self, text: str, num_sentences: int = 3) -> Dict[str, Any]:
+        return await self._post_json("/summarize-text/extractive", {"text": text, "num_sentences": num_sentences})
+
+    async def summarize_textrank(self, text: str, num_sentences: int = 3, method: str = "auto") -> Dict[str, Any]:
+        return await self._post_json(
+            "/summarize-text/textrank", {"text": text, "num_sentences": num_sentences, "method": method}
+        )
+
+    async def summarize_abstractive(self, text: str, max_length: int = 130, min_length: int = 30,
+                                    mode: str = "quality", deadline: Optional[float] = None,
+                                    lengths: Optional[List[Tuple[int, int]]] = None) -> Dict[str, Any]:
+        """
+        Summarizes a text abstractively. With `lengths`, a list of (max_length, min_length)
+        pairs, one call returns a summary for each pair in 'summaries'.
+        """
+        headers = {"X-Request-Deadline": str(deadline)} if deadline is not None else None
+        payload = {"text": text, "max_length": max_length, "min_length": min_length, "mode": mode}
+        if lengths:
+            payload["lengths"] = [{"max_length": high, "min_length": low} for high, low in lengths]
+        return (await self._request("POST", "/summarize-text/abstractive", json=payload, headers=headers)).json()
+
+    # --- Jobs ---
+
+    async def submit_job(self, task: str, payload: Dict[str, Any], priority: str = "interactive",
+                         callback_url: Optional[str] = None) -> Dict[str, Any]:
+        return await self._post_json(
+            "/jobs", {"task": task, "payload": payload, "priority": priority, "callback_url": callback_url}
+        )
+
+    async def get_job(self, job_id: str) -> Dict[str, Any]:
+        return (await self._request("GET", f"/jobs/{job_id}")).json()
+
+    async def wait_for_job(self, job_id: str, poll_interval: float = 0.5, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Polls a job until it is done or failed and returns its result."""
+        start = time.monotonic()
+        while True:
+            job = await self.get_job(job_id)
+            if job["status"] in ("done", "failed"):
+                return (await self._request("GET", f"/jobs/{job_id}/result")).json()
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError(f"Job {job_id} did not finish within {timeout} seconds.")
+            await asyncio.sleep(poll_interval)
+
+class NLUClient:
+    """
+    Synchronous wrapper around AsyncNLUClient for scripts. It runs the async client on
+    a private event loop in a background thread, so connections are pooled across
+    calls. Every coroutine method of AsyncNLUClient is available as a blocking method.
+    """
+    def __init__(self, *args, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="nlu-client", daemon=True)
+        self._thread.start()
+        self._client: AsyncNLUClient = self._run(self._create(*args, **kwargs))
+
+    @staticmethod
+    async def _create(*args, **kwargs) -> AsyncNLUClient:
+        return AsyncNLUClient(*args, **kwargs)
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._client, name)
+        if name.startswith("_") or not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            return self._run(attribute(*args, **kwargs))
+        call.__doc__ = attribute.__doc__
+        return call
+
+    def __enter__(self) -> "NLUClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
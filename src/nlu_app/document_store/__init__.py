@@ -0,0 +1,14 @@
+from .logic import (
+    DocumentStore, DocumentUpload, DocumentNotFoundError, DocumentTooLargeError, ArtifactCodec, JSON_CODEC, TEXT_CODEC
+)
+
+
+__all__ = [
+    "DocumentStore",
+    "DocumentUpload",
+    "DocumentNotFoundError",
+    "DocumentTooLargeError",
+    "ArtifactCodec",
+    "JSON_CODEC",
+    "TEXT_CODEC"
+]
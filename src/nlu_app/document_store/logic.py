@@ -0,0 +1,374 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import threading
+import hashlib
+import codecs
+import shutil
+import json
+import time
+import uuid
+import os
+import re
+
+from ..metrics import increment
+from ..request_coalescing import Singleflight
+from ..tracing import trace_span
+
+# --- Module-Level Constants ---
+# Documents stored by other processes sharing the directory are picked up by a
+# rescan of the directory at most this often (in seconds).
+RESCAN_INTERVAL = 30.0
+# Unfinished uploads older than this (in seconds) are removed by the rescan.
+STALE_UPLOAD_AGE = 3600.0
+TEXT_FILE = "text.txt"
+META_FILE = "meta.json"
+ARTIFACT_SUFFIX = ".artifact"
+DOC_ID_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+# An artifact codec turns an artifact into bytes and back, so that it can be kept on disk.
+ArtifactCodec = Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]
+JSON_CODEC: ArtifactCodec = (lambda value: json.dumps(value).encode("utf-8"), lambda data: json.loads(data))
+TEXT_CODEC: ArtifactCodec = (lambda value: value.encode("utf-8"), lambda data: data.decode("utf-8"))
+
+class DocumentNotFoundError(Exception):
+    """Raised for an unknown, deleted or evicted document id."""
+
+class DocumentTooLargeError(ValueError):
+    """Raised for a document larger than the whole store."""
+
+class _CachedDocument:
+    """A document kept in memory with the artifacts computed from it."""
+    def __init__(self, text: str):
+        self.text = text
+        self.artifacts: Dict[str, Any] = {}
+
+class DocumentUpload:
+    """
+    A document streamed into the store chunk by chunk. The chunks are hashed, checked
+    to be UTF-8 and written to a temporary file, so the text is never held in memory
+    as a whole. 'commit' adds the document to the store; 'abort' drops it.
+    """
+    def __init__(self, store: "DocumentStore"):
+        self._store = store
+        self._hash = hashlib.sha256()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._path = os.path.join(store.directory, f".upload-{uuid.uuid4().hex}")
+        self._file = open(self._path, "wb")
+        self.size_bytes = 0
+        self.text_length = 0
+
+    def write(self, chunk: bytes):
+        """Adds the next chunk. Raises DocumentTooLargeError or ValueError (not UTF-8) and aborts the upload."""
+        self.size_bytes += len(chunk)
+        if self.size_bytes > self._store.max_bytes:
+            self.abort()
+            raise DocumentTooLargeError(f"The document is larger than the document store ({self._store.max_bytes} bytes).")
+        try:
+            self.text_length += len(self._decoder.decode(chunk))
+        except UnicodeDecodeError as e:
+            self.abort()
+            raise ValueError(f"The document is not valid UTF-8 text: {e}")
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def commit(self) -> Dict[str, Any]:
+        """Stores the uploaded document and returns its info (see DocumentStore.info)."""
+        try:
+            self._decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            self.abort()
+            raise ValueError(f"The document is not valid UTF-8 text: {e}")
+        self._file.close()
+        return self._store._add(self._hash.hexdigest(), self._path, self.size_bytes, self.text_length)
+
+    def abort(self):
+        """Drops the upload. Safe to call more than once."""
+        self._file.close()
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+class DocumentStore:
+    """
+    Keeps uploaded documents on local disk, addressed by the SHA-256 of their UTF-8
+    text, together with artifacts computed from them (sentence splits, parsed Docs),
+    so that several analyses of one large document upload and parse it only once.
+
+    The store holds at most `max_bytes` on disk (texts, metadata and artifacts); the
+    least recently used documents are evicted beyond that. The last `memory_documents`
+    used documents also stay in memory with all their artifacts, including those that
+    have no codec and are never written to disk.
+
+    Several processes may share the directory. Each keeps its own usage order and
+    picks up the documents of the others with a periodic rescan, so the size bound
+    holds within about one rescan interval of uploads.
+    """
+    def __init__(self, directory: str, max_bytes: int, memory_documents: int = 8,
+                 rescan_interval: float = RESCAN_INTERVAL, max_artifact_waiters: Optional[int] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_documents = memory_documents
+        self.rescan_interval = rescan_interval
+        # doc_id -> bytes on disk, least recently used first.
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._memory: "OrderedDict[str, _CachedDocument]" = OrderedDict()
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+        self._artifact_flights = Singleflight(
+            metric_name="documents.artifact_coalesced", max_waiters=max_artifact_waiters
+        )
+
+    def open(self):
+        """Creates the directory if needed and indexes the documents already in it."""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._scan()
+            self._evict()
+        print(f"Document store at '{self.directory}': {len(self._index)} documents, {self._total_bytes} bytes.")
+
+    def _doc_dir(self, doc_id: str) -> str:
+        return os.path.join(self.directory, doc_id)
+
+    def _scan(self):
+        """Internal helper that rebuilds the index from the directory, ordered by last use (text file mtime)."""
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.startswith(".upload-"):
+                    if now - os.path.getmtime(path) > STALE_UPLOAD_AGE:
+                        os.remove(path)
+                    continue
+                if not DOC_ID_PATTERN.fullmatch(name):
+                    continue
+                last_used = os.path.getmtime(os.path.join(path, TEXT_FILE))
+                size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            except OSError:
+                # Evicted or still being written by another process.
+                continue
+            entries.append((last_used, name, size))
+        entries.sort()
+        self._index = OrderedDict((name, size) for _, name, size in entries)
+        self._total_bytes = sum(self._index.values())
+        self._last_scan = now
+
+    def _evict(self, keep: Optional[str] = None):
+        """Internal helper that removes least recently used documents until the store fits its budget."""
+        while self._total_bytes > self.max_bytes and self._index:
+            doc_id, size = next(iter(self._index.items()))
+            if doc_id == keep:
+                if len(self._index) == 1:
+                    break
+                self._index.move_to_end(doc_id)
+                continue
+            del self._index[doc_id]
+            self._total_bytes -= size
+            self._memory.pop(doc_id, None)
+            shutil.rmtree(self._doc_dir(doc_id), ignore_errors=True)
+            increment("documents.evicted")
+
+    def _add(self, doc_id: str, upload_path: str, size_bytes: int, text_length: int) -> Dict[str, Any]:
+        """Internal helper that moves a finished upload into the store (see DocumentUpload.commit)."""
+        doc_dir = self._doc_dir(doc_id)
+        text_path = os.path.join(doc_dir, TEXT_FILE)
+        with self._lock:
+            if time.time() - self._last_scan > self.rescan_interval:
+                self._scan()
+            created = not os.path.exists(text_path)
+            if created:
+                os.makedirs(doc_dir, exist_ok=True)
+                meta = json.dumps({"size_bytes": size_bytes, "text_length": text_length, "created_at": time.time()})
+                with open(os.path.join(doc_dir, META_FILE), "w", encoding="utf-8") as f:
+                    f.write(meta)
+                # Renamed last: a document directory with a text file is complete.
+                os.replace(upload_path, text_path)
+                self._total_bytes -= self._index.pop(doc_id, 0)
+                self._index[doc_id] = size_bytes + len(meta)
+                self._total_bytes += self._index[doc_id]
+                increment("documents.stored")
+            else:
+                os.remove(upload_path)
+                self._touch(doc_id)
+                increment("documents.deduplicated")
+            self._evict(keep=doc_id)
+        info = self.info(doc_id)
+        info["created"] = created
+        return info
+
+    def _touch(self, doc_id: str):
+        """Internal helper (called with the lock held) that marks a document as just used, on disk too."""
+        if doc_id in self._index:
+            self._index.move_to_end(doc_id)
+        text_path = os.path.join(self._doc_dir(doc_id), TEXT_FILE)
+        try:
+            os.utime(text_path)
+        except FileNotFoundError:
+            return
+        if doc_id not in self._index:
+            # Stored by another process since the last rescan.
+            self._index[doc_id] = sum(entry.stat().st_size for entry in os.scandir(self._doc_dir(doc_id)) if entry.is_file())
+            self._total_bytes += self._index[doc_id]
+
+    def open_upload(self) -> DocumentUpload:
+        """Starts a streamed upload (see DocumentUpload)."""
+        return DocumentUpload(self)
+
+    def put_text(self, text: str) -> Dict[str, Any]:
+        """
+        Stores a document. Storing the same text again returns the same id.
+
+        Args:
+            text (str): The document text.
+
+        Returns:
+            Dict[str, Any]: The document info (see 'info') and whether it was newly 'created'.
+        """
+        upload = self.open_upload()
+        try:
+            upload.write(text.encode("utf-8"))
+        except BaseException:
+            upload.abort()
+            raise
+        return upload.commit()
+
+    def _cached(self, doc_id: str) -> _CachedDocument:
+        """Internal helper that returns the in-memory entry of a document, reading its text from disk if needed."""
+        if not DOC_ID_PATTERN.fullmatch(doc_id):
+            raise DocumentNotFoundError(f"Document '{doc_id}' does not exist or has been evicted.")
+        with self._lock:
+            self._touch(doc_id)
+            cached = self._memory.get(doc_id)
+            if cached is not None:
+                self._memory.move_to_end(doc_id)
+                return cached
+        try:
+            with trace_span("documents.read_text"), \
+                    open(os.path.join(self._doc_dir(doc_id), TEXT_FILE), encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._total_bytes -= self._index.pop(doc_id, 0)
+            raise DocumentNotFoundError(f"Document '{doc_id}' does not exist or has been evicted.")
+        with self._lock:
+            # Another thread may have read it meanwhile; keep the first entry and its artifacts.
+            cached = self._memory.setdefault(doc_id, _CachedDocument(text))
+            self._memory.move_to_end(doc_id)
+            while len(self._memory) > self.memory_documents:
+                self._memory.popitem(last=False)
+        return cached
+
+    def get_text(self, doc_id: str) -> str:
+        """Returns the text of a document, or raises DocumentNotFoundError."""
+        return self._cached(doc_id).text
+
+    def artifact(self, doc_id: str, name: str, compute: Callable[[str], Any], codec: Optional[ArtifactCodec] = None) -> Any:
+        """
+        Returns an artifact of a document, computing it from the text only the first time.
+        Artifacts with a codec are also written next to the document, so they survive
+        the in-memory cache and restarts; the others are recomputed once the document
+        has left the in-memory cache. Concurrent requests for the same missing artifact
+        compute it once.
+
+        Args:
+            doc_id (str): The document id.
+            name (str): The artifact name, e.g. "ner.doc" (also its file name).
+            compute (Callable[[str], Any]): Computes the artifact from the document text.
+            codec (Optional[ArtifactCodec]): (dumps, loads) functions to keep the artifact on disk.
+
+        Returns:
+            Any: The artifact.
+        """
+        cached = self._cached(doc_id)
+        if name in cached.artifacts:
+            increment("documents.artifact_hits")
+            return cached.artifacts[name]
+
+        def load_or_compute():
+            if name in cached.artifacts:
+                return cached.artifacts[name]
+            path = os.path.join(self._doc_dir(doc_id), name + ARTIFACT_SUFFIX)
+            value = None
+            if codec is not None:
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                except FileNotFoundError:
+                    pass
+                else:
+                    increment("documents.artifact_disk_hits")
+                    value = codec[1](data)
+            if value is None:
+                increment("documents.artifact_misses")
+                with trace_span("documents.compute_artifact", artifact=name):
+                    value = compute(cached.text)
+                if codec is not None:
+                    self._write_artifact(doc_id, path, codec[0](value))
+            cached.artifacts[name] = value
+            return value
+
+        return self._artifact_flights.do((doc_id, name), load_or_compute)
+
+    def _write_artifact(self, doc_id: str, path: str, data: bytes):
+        """Internal helper that writes an artifact file atomically and accounts for its size."""
+        temp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            # Another computation of the same artifact may have written it already.
+            try:
+                replaced_bytes = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced_bytes = 0
+            os.replace(temp_path, path)
+        except FileNotFoundError:
+            # The document was evicted meanwhile; the artifact stays in memory only.
+            return
+        with self._lock:
+            if doc_id in self._index:
+                self._index[doc_id] += len(data) - replaced_bytes
+                self._total_bytes += len(data) - replaced_bytes
+                self._evict(keep=doc_id)
+
+    def info(self, doc_id: str) -> Dict[str, Any]:
+        """
+        Describes a stored document, or raises DocumentNotFoundError.
+
+        Returns:
+            Dict[str, Any]: doc_id, size_bytes, text_length, created_at and the names of
+                            its stored or in-memory 'artifacts'.
+        """
+        if not DOC_ID_PATTERN.fullmatch(doc_id):
+            raise DocumentNotFoundError(f"Document '{doc_id}' does not exist or has been evicted.")
+        doc_dir = self._doc_dir(doc_id)
+        try:
+            with open(os.path.join(doc_dir, META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+            artifacts = {name[:-len(ARTIFACT_SUFFIX)] for name in os.listdir(doc_dir) if name.endswith(ARTIFACT_SUFFIX)}
+        except FileNotFoundError:
+            raise DocumentNotFoundError(f"Document '{doc_id}' does not exist or has been evicted.")
+        with self._lock:
+            cached = self._memory.get(doc_id)
+            if cached is not None:
+                artifacts.update(cached.artifacts)
+        return {"doc_id": doc_id, **meta, "artifacts": sorted(artifacts)}
+
+    def delete(self, doc_id: str):
+        """Removes a document and its artifacts, or raises DocumentNotFoundError."""
+        if not DOC_ID_PATTERN.fullmatch(doc_id) or not os.path.isdir(self._doc_dir(doc_id)):
+            raise DocumentNotFoundError(f"Document '{doc_id}' does not exist or has been evicted.")
+        with self._lock:
+            self._total_bytes -= self._index.pop(doc_id, 0)
+            self._memory.pop(doc_id, None)
+            shutil.rmtree(self._doc_dir(doc_id), ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Reports the directory, the number of documents and bytes on disk, and the in-memory documents."""
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "num_documents": len(self._index),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "memory_documents": list(self._memory),
+            }
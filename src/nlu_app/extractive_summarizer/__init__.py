@@ -1,7 +1,16 @@
-from .logic import load_summarizer_tools, generate_extractive_summary
+from .logic import (
+    IdfTable, load_summarizer_tools, unload_summarizer_tools, generate_extractive_summary, preprocess_document,
+    resolve_weighting, get_idf_table_info, reload_idf_table
+)
 
 
 __all__ = [
+    "IdfTable",
     "load_summarizer_tools",
-    "generate_extractive_summary"
+    "unload_summarizer_tools",
+    "generate_extractive_summary",
+    "preprocess_document",
+    "resolve_weighting",
+    "get_idf_table_info",
+    "reload_idf_table"
 ]
@@ -0,0 +1,135 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+import numpy as np
+import argparse
+import json
+import time
+import os
+
+from . import logic
+from .logic import load_summarizer_tools, term_buckets
+
+# Offline command that builds the corpus IDF table of the extractive summarizer from
+# an archive of documents (.txt files, one document each, or .jsonl files, one
+# document per line) and atomically replaces the table file, so running servers
+# pick it up without a restart:
+#
+#   python -m nlu_app.extractive_summarizer.build_idf archive/ --output saved_model/extractive_idf.npy
+
+DEFAULT_HASH_BITS = 20
+
+def iter_documents(paths: Iterable[str], jsonl_field: str = "text") -> Iterator[str]:
+    """
+    Yields the documents of the given files and directories (searched recursively).
+    .jsonl records without a text in `jsonl_field` are skipped with a warning.
+
+    Args:
+        paths (Iterable[str]): .txt and .jsonl files, or directories containing them.
+        jsonl_field (str): The field holding the text in .jsonl records.
+
+    Raises:
+        ValueError: If a .jsonl line is not valid JSON (naming the file and line).
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(root, name) for root, _, names in os.walk(path) for name in names
+                if name.endswith((".txt", ".jsonl"))
+            )
+        else:
+            files = [path]
+        for file_path in files:
+            with open(file_path, encoding="utf-8", errors="replace") as f:
+                if file_path.endswith(".jsonl"):
+                    for line_number, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except ValueError as e:
+                            raise ValueError(f"{file_path}:{line_number}: not a JSON record ({e}).") from e
+                        text = record.get(jsonl_field) if isinstance(record, dict) else None
+                        if not isinstance(text, str):
+                            print(f"Warning: {file_path}:{line_number}: no string field '{jsonl_field}'; record skipped.")
+                            continue
+                        yield text
+                else:
+                    yield f.read()
+
+def _replace_files(files: List[Tuple[str, Callable]]):
+    """
+    Internal helper that writes every file next to its target first and only then renames
+    them over their targets, in the given order, so readers never see a partial file.
+    """
+    temp_paths = []
+    try:
+        for path, write in files:
+            temp_paths.append(f"{path}.tmp-{os.getpid()}")
+            with open(temp_paths[-1], "wb") as f:
+                write(f)
+    except BaseException:
+        for temp_path in temp_paths:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        raise
+    for (path, _), temp_path in zip(files, temp_paths):
+        os.replace(temp_path, path)
+
+def build_idf_table(documents: Iterable[str], output_path: str, hash_bits: int = DEFAULT_HASH_BITS) -> Dict[str, Any]:
+    """
+    Counts in how many documents each term occurs and writes the smoothed IDF weights,
+    log((1 + N) / (1 + df)) + 1, as a float32 array of 2**hash_bits slots. Terms are
+    preprocessed like the summarizer does (lowercased, lemmatized, stop words removed).
+    Terms sharing a slot share their document counts; with the default 2**20 slots
+    (4 MB) collisions are rare for a typical vocabulary.
+
+    Args:
+        documents (Iterable[str]): The corpus.
+        output_path (str): The .npy file to write; build metadata goes to a .json file next to it.
+        hash_bits (int): The table has 2**hash_bits slots.
+
+    Returns:
+        Dict[str, Any]: The build metadata.
+    """
+    if logic.stop_words is None:
+        load_summarizer_tools()
+    num_buckets = 1 << hash_bits
+    document_frequencies = np.zeros(num_buckets, dtype=np.int64)
+    num_documents = 0
+    start = time.perf_counter()
+    for document in documents:
+        terms = list(set(logic._preprocess_text(document)))
+        if terms:
+            # A document counts once per slot, even if several of its terms collide.
+            document_frequencies[np.unique(term_buckets(terms, num_buckets))] += 1
+        num_documents += 1
+        if num_documents % 10000 == 0:
+            print(f"{num_documents} documents processed.")
+
+    weights = (np.log((1 + num_documents) / (1 + document_frequencies)) + 1).astype(np.float32)
+    metadata = {
+        "num_documents": num_documents,
+        "hash_bits": hash_bits,
+        "slots_used": int(np.count_nonzero(document_frequencies)),
+        "built_at": time.time(),
+    }
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    # The weights are replaced before the metadata, so a reader that sees new metadata also sees the new
+    # weights, and a crash never leaves new metadata next to old weights.
+    _replace_files([
+        (output_path, lambda f: np.save(f, weights)),
+        (os.path.splitext(output_path)[0] + ".json", lambda f: f.write(json.dumps(metadata, indent=2).encode())),
+    ])
+    print(f"IDF table of {num_documents} documents written to '{output_path}' in {time.perf_counter() - start:.1f}s.")
+    return metadata
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the corpus IDF table of the extractive summarizer.")
+    parser.add_argument("paths", nargs="+", help=".txt/.jsonl files or directories of them.")
+    parser.add_argument("--output", default="saved_model/extractive_idf.npy", help="The .npy table file to write.")
+    parser.add_argument("--hash-bits", type=int, default=DEFAULT_HASH_BITS,
+                        help="The table has 2**hash_bits slots of 4 bytes (default: 20, 4 MB).")
+    parser.add_argument("--jsonl-field", default="text", help="Field holding the text in .jsonl records.")
+    args = parser.parse_args()
+    build_idf_table(iter_documents(args.paths, args.jsonl_field), args.output, args.hash_bits)
@@ -1,23 +1,130 @@
-from nltk.tokenize import sent_tokenize, word_tokenize
+from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 from nltk.corpus import stopwords
-from collections import Counter
-from typing import List
+from scipy.sparse import csr_matrix
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import threading
 import nltk
+import json
+import time
+import zlib
+import os
 import re
 
+from ..metrics import increment
+from ..sentence_segmenter import load_sentence_segmenter, split_sentences
+from ..tracing import trace_span
+
+
+# --- Module-Level Constants ---
+# Seconds between checks whether the IDF table file was replaced.
+IDF_RELOAD_CHECK_INTERVAL = 5.0
+WEIGHTINGS = ("auto", "frequency", "tfidf")
 
 # --- Module-Level Variables ---
 # These will be initialized by the load function.
 stop_words = None
 lemmatizer = None
+idf_table = None
+
+def term_buckets(terms: Sequence[str], num_buckets: int) -> np.ndarray:
+    """
+    Maps terms to IDF table slots. CRC32 is used instead of hash(), which differs
+    between processes, so the offline builder and every worker agree on the slots.
+
+    Args:
+        terms (Sequence[str]): The terms.
+        num_buckets (int): The table size, a power of two.
+
+    Returns:
+        np.ndarray: The slot of each term.
+    """
+    hashes = np.fromiter((zlib.crc32(term.encode("utf-8")) for term in terms), dtype=np.uint32, count=len(terms))
+    return hashes & np.uint32(num_buckets - 1)
+
+class IdfTable:
+    """
+    Corpus IDF weights stored as one float32 per hash slot in a memory-mapped .npy file
+    (see 'build_idf'). Looking up a term is one hash and one array read, whatever the
+    corpus size, and worker processes share the file's pages instead of copying them.
+    When the file is replaced, the new table is picked up by the next lookup after
+    IDF_RELOAD_CHECK_INTERVAL seconds; lookups in flight keep using the old mapping.
+    """
 
-def load_summarizer_tools():
+    def __init__(self, path: str, check_interval: float = IDF_RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._load()
+
+    def _file_id(self):
+        stat = os.stat(self.path)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        file_id = self._file_id()
+        weights = np.load(self.path, mmap_mode="r")
+        if weights.ndim != 1 or len(weights) == 0 or len(weights) & (len(weights) - 1):
+            raise ValueError(f"'{self.path}' is not an IDF table: expected a 1-D array with a power-of-two length.")
+        metadata_path = os.path.splitext(self.path)[0] + ".json"
+        metadata = {}
+        if os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+        # A plain ndarray view of the memory map: indexing np.memmap objects is slower.
+        self.weights = np.asarray(weights)
+        self.metadata = metadata
+        self._loaded_file_id = file_id
+        self._checked_at = time.monotonic()
+
+    def reload(self, force: bool = True) -> bool:
+        """
+        Maps the table file again if it was replaced (or always, if `force` is set).
+
+        Returns:
+            bool: True if the table was reloaded.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                if not force and self._file_id() == self._loaded_file_id:
+                    return False
+                self._load()
+            except (OSError, ValueError) as e:
+                # Keep serving the current table; the file may be mid-copy or removed.
+                print(f"Could not reload the IDF table '{self.path}': {e}")
+                return False
+        increment("extractive.idf_reloads")
+        print(f"IDF table '{self.path}' reloaded.")
+        return True
+
+    def lookup(self, terms: Sequence[str]) -> np.ndarray:
+        """
+        Returns the IDF weight of each term. Terms unseen in the corpus get the highest weight.
+        """
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload(force=False)
+        # Read the array once: a concurrent reload replaces it as a whole.
+        weights = self.weights
+        return weights[term_buckets(terms, len(weights))].astype(np.float64)
+
+    def info(self) -> Dict[str, Any]:
+        """Returns the table path, size and build metadata."""
+        return {
+            "path": self.path, "num_buckets": len(self.weights), "size_bytes": self.weights.nbytes, **self.metadata
+        }
+
+def load_summarizer_tools(idf_table_path: Optional[str] = None):
     """
     Downloads necessary NLTK resources and initializes tools for summarization.
     This should be called once at application startup.
+
+    Args:
+        idf_table_path (Optional[str]): An IDF table built by 'build_idf'. If given,
+                                        sentences are scored with TF-IDF weights.
     """
-    global stop_words, lemmatizer
+    global stop_words, lemmatizer, idf_table
     
     print("--- Loading Extractive Summarizer Tools ---")
     try:
@@ -30,10 +137,52 @@ def load_summarizer_tools():
         print(f"Error downloading NLTK data for summarizer: {e}")
         raise e
 
+    load_sentence_segmenter()
     stop_words = set(stopwords.words('english'))
     lemmatizer = WordNetLemmatizer()
     print("Summarizer tools (stopwords, lemmatizer) initialized.")
 
+    idf_table = IdfTable(idf_table_path) if idf_table_path else None
+    if idf_table is not None:
+        print(f"IDF table loaded from '{idf_table_path}' ({len(idf_table.weights)} slots).")
+
+def unload_summarizer_tools():
+    """
+    Releases the stop words, lemmatizer and IDF table. They can be loaded again with 'load_summarizer_tools'.
+    """
+    global stop_words, lemmatizer, idf_table
+    stop_words = lemmatizer = idf_table = None
+    print("Extractive summarizer tools unloaded.")
+
+def get_idf_table_info() -> Optional[Dict[str, Any]]:
+    """Returns the path, size and build metadata of the loaded IDF table, or None if there is none."""
+    return idf_table.info() if idf_table is not None else None
+
+def reload_idf_table() -> Optional[Dict[str, Any]]:
+    """Maps the IDF table file again (e.g. after a rebuild) and returns its info, or None if there is no table."""
+    if idf_table is None:
+        return None
+    idf_table.reload()
+    return idf_table.info()
+
+def resolve_weighting(weighting: str = "auto") -> str:
+    """
+    Resolves a weighting option to the one used for scoring.
+
+    Args:
+        weighting (str): 'tfidf', 'frequency' or 'auto' (TF-IDF if an IDF table is loaded).
+
+    Returns:
+        str: 'tfidf' or 'frequency'.
+    """
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"Unknown weighting '{weighting}'. Choose one of {', '.join(WEIGHTINGS)}.")
+    if weighting == "auto":
+        return "tfidf" if idf_table is not None else "frequency"
+    if weighting == "tfidf" and idf_table is None:
+        raise ValueError("TF-IDF weighting needs an IDF table, and none is loaded.")
+    return weighting
+
 def _preprocess_text(text: str) -> List[str]:
     """
     Internal helper function to clean, tokenize, and lemmatize text.
@@ -47,45 +196,104 @@ def _preprocess_text(text: str) -> List[str]:
     words = word_tokenize(text)
     return [lemmatizer.lemmatize(word) for word in words if word not in stop_words]
 
-def generate_extractive_summary(text: str, num_sentences: int = 3) -> str:
+def _select_top_indices(scores: np.ndarray, eligible: np.ndarray, num_sentences: int) -> List[int]:
+    """
+    Internal helper that picks the indices of the `num_sentences` highest scores
+    among the eligible sentences using a partial selection instead of a full sort.
+    Ties are broken by sentence position, matching a stable descending sort.
+    """
+    candidates = np.flatnonzero(eligible)
+    if len(candidates) <= num_sentences:
+        return candidates.tolist()
+
+    candidate_scores = scores[candidates]
+    # The score of the N-th best sentence; everything strictly above it is selected.
+    threshold = np.partition(candidate_scores, len(candidates) - num_sentences)[len(candidates) - num_sentences]
+    above = candidates[candidate_scores > threshold]
+    # Fill the remaining slots with the earliest sentences that tie at the threshold.
+    tied = candidates[candidate_scores == threshold][:num_sentences - len(above)]
+    return sorted(np.concatenate([above, tied]).tolist())
+
+def preprocess_document(text: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Splits a text into sentences and preprocesses the words of each sentence, the
+    part of 'generate_extractive_summary' that does not depend on its parameters.
+    The result only holds strings and lists, so it can be stored as JSON and passed
+    back to 'generate_extractive_summary' for later summaries of the same text.
+
+    Args:
+        text (str): The input text.
+
+    Returns:
+        Tuple[List[str], List[List[str]]]: The sentences and the processed words of each sentence.
+    """
+    with trace_span("extractive.sentence_split", text_length=len(text)):
+        original_sentences = split_sentences(text)
+    with trace_span("extractive.preprocess", num_sentences=len(original_sentences)):
+        sentence_words = [_preprocess_text(sentence) for sentence in original_sentences]
+    return original_sentences, sentence_words
+
+def generate_extractive_summary(text: str, num_sentences: int = 3, weighting: str = "auto",
+                                preprocessed: Optional[Sequence[Sequence]] = None) -> str:
     """
-    Generates an extractive summary of the given text based on word frequency.
+    Generates an extractive summary of the given text based on word frequency,
+    optionally weighted by the corpus IDF table.
 
     Args:
         text (str): The input text to be summarized.
         num_sentences (int): The desired number of sentences in the summary.
+        weighting (str): 'frequency' for in-document word frequency, 'tfidf' to multiply it
+                         by the corpus IDF, 'auto' for TF-IDF when an IDF table is loaded.
+        preprocessed (Optional[Sequence[Sequence]]): The result of 'preprocess_document' for
+                                                     this text, if it is already known.
 
     Returns:
         str: The generated summary.
     """
-    # Tokenize the original text into sentences
-    original_sentences = sent_tokenize(text)
+    weighting = resolve_weighting(weighting)
+
+    # Tokenize the original text into sentences and preprocess each sentence exactly once
+    if preprocessed is None:
+        preprocessed = preprocess_document(text)
+    original_sentences, sentence_words = preprocessed
 
     # If the text is already short enough, return it as is.
     if len(original_sentences) <= num_sentences:
         return text
 
-    # Calculate word frequencies for the entire document
-    all_processed_words = _preprocess_text(text)
-    word_frequencies = Counter(all_processed_words)
+    # Map the words of each sentence to term columns
+    vocabulary = {}
+    rows, cols = [], []
+    sentence_lengths = np.zeros(len(original_sentences), dtype=np.int64)
+    for i, processed_sentence_words in enumerate(sentence_words):
+        sentence_lengths[i] = len(processed_sentence_words)
+        for word in processed_sentence_words:
+            rows.append(i)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
 
-    # Score each sentence
-    sentence_scores = {}
-    for i, sentence in enumerate(original_sentences):
-        processed_sentence_words = _preprocess_text(sentence)
-        if not processed_sentence_words:
-            continue  # Skip empty or stopword-only sentences
+    # Build the sentence x term count matrix (duplicate entries are summed)
+    counts = csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+        shape=(len(original_sentences), len(vocabulary))
+    )
 
-        # Calculate score based on the sum of frequencies of its words
-        score = sum(word_frequencies.get(word, 0) for word in processed_sentence_words)
-        
-        # Normalize score by sentence length to avoid bias towards longer sentences
-        sentence_scores[i] = score / len(processed_sentence_words)
+    # Document word frequencies are the column sums of the sentence counts
+    word_frequencies = np.asarray(counts.sum(axis=0)).ravel()
+    if weighting == "tfidf":
+        # Down-weight words that are frequent across the corpus (boilerplate); the
+        # vocabulary keys are in column order.
+        with trace_span("extractive.idf_lookup", num_terms=len(vocabulary)):
+            word_frequencies = word_frequencies * idf_table.lookup(list(vocabulary))
+
+    # Score every sentence at once: the sum of its word weights,
+    # normalized by sentence length to avoid bias towards longer sentences.
+    # Empty or stopword-only sentences are not eligible for the summary.
+    eligible = sentence_lengths > 0
+    sentence_scores = np.zeros(len(original_sentences), dtype=np.float64)
+    sentence_scores[eligible] = (counts @ word_frequencies)[eligible] / sentence_lengths[eligible]
 
-    # Select the top N sentences
-    # Get the original indices of the sentences with the highest scores
-    sorted_sentence_indices = sorted(sentence_scores, key=sentence_scores.get, reverse=True)
-    top_sentence_indices = sorted(sorted_sentence_indices[:num_sentences])
+    # Select the top N sentences and keep their original order
+    top_sentence_indices = _select_top_indices(sentence_scores, eligible, num_sentences)
 
     # Build the summary by joining the top sentences in their original order
     summary = ' '.join(original_sentences[i] for i in top_sentence_indices)
@@ -0,0 +1,20 @@
+from .logic import (
+    register_job_handler,
+    start_job_queue,
+    requeue_interrupted_jobs,
+    stop_job_queue,
+    submit_job,
+    get_job,
+    get_job_result
+)
+
+
+__all__ = [
+    "register_job_handler",
+    "start_job_queue",
+    "requeue_interrupted_jobs",
+    "stop_job_queue",
+    "submit_job",
+    "get_job",
+    "get_job_result"
+]
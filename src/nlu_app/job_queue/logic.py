@@ -0,0 +1,261 @@
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+import urllib.request
+import threading
+import sqlite3
+import json
+import time
+import uuid
+
+# --- Module-Level Constants ---
+# Lower values are served first: interactive jobs go ahead of batch jobs.
+PRIORITIES = {"interactive": 0, "batch": 1}
+# Finished jobs (and their results) are deleted after this many seconds.
+RESULT_TTL_SECONDS = 3600
+# How often workers look for expired results, in seconds.
+PURGE_INTERVAL_SECONDS = 60
+# Webhooks may only call back to this machine.
+LOCAL_CALLBACK_HOSTS = ("localhost", "127.0.0.1", "::1")
+WEBHOOK_TIMEOUT_SECONDS = 5
+
+# --- Module-Level Variables ---
+# These will be initialized by the start function.
+_connection = None
+_result_ttl = RESULT_TTL_SECONDS
+_lock = threading.Lock()
+_job_available = threading.Condition(_lock)
+_stop_event = threading.Event()
+_workers: List[threading.Thread] = []
+_handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    callback_url TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at);
+"""
+
+def register_job_handler(task: str, handler: Callable[[Dict[str, Any]], Dict[str, Any]]):
+    """
+    Registers the function that executes jobs of the given task.
+
+    Args:
+        task (str): The task name used when submitting jobs (e.g. "abstractive").
+        handler (Callable): Takes the job payload and returns a JSON-serializable result.
+    """
+    _handlers[task] = handler
+
+def _open_connection(db_path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+def requeue_interrupted_jobs(db_path: str = "jobs.sqlite3") -> int:
+    """
+    Queues again the jobs that were running when the previous process stopped.
+    When several server processes share one database, this should run once before
+    they start, since any one of them cannot tell its own running jobs from the others'.
+
+    Args:
+        db_path (str): Path of the SQLite database holding the queue and the results.
+
+    Returns:
+        int: The number of re-queued jobs.
+    """
+    connection = _open_connection(db_path)
+    try:
+        recovered = connection.execute(
+            "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+        ).rowcount
+    finally:
+        connection.close()
+    if recovered:
+        print(f"Re-queued {recovered} job(s) interrupted by the previous shutdown.")
+    return recovered
+
+def start_job_queue(db_path: str = "jobs.sqlite3", num_workers: int = 1, result_ttl: int = RESULT_TTL_SECONDS,
+                    requeue_interrupted: bool = True):
+    """
+    Opens (or creates) the persistent job store and starts the worker threads.
+    Jobs that were running when the previous process stopped are queued again.
+    This should be called once at application startup.
+
+    Args:
+        db_path (str): Path of the SQLite database holding the queue and the results.
+        num_workers (int): Number of worker threads executing jobs.
+        result_ttl (int): Seconds finished results are kept before being deleted.
+        requeue_interrupted (bool): Whether to re-queue jobs left running. Disable this when
+                                    several processes share the database (see 'requeue_interrupted_jobs').
+    """
+    global _connection, _result_ttl
+
+    if requeue_interrupted:
+        requeue_interrupted_jobs(db_path)
+
+    print(f"--- Starting Job Queue ({db_path}, {num_workers} worker(s)) ---")
+    _connection = _open_connection(db_path)
+    _result_ttl = result_ttl
+
+    _stop_event.clear()
+    for i in range(num_workers):
+        worker = threading.Thread(target=_worker_loop, name=f"job-worker-{i}", daemon=True)
+        worker.start()
+        _workers.append(worker)
+    print("Job queue started.")
+
+def stop_job_queue(timeout: float = 5.0):
+    """
+    Stops the worker threads. Jobs still running are picked up again on the next start.
+    """
+    _stop_event.set()
+    with _job_available:
+        _job_available.notify_all()
+    for worker in _workers:
+        worker.join(timeout)
+    _workers.clear()
+
+def _validate_callback_url(callback_url: str):
+    parsed = urlparse(callback_url)
+    if parsed.scheme not in ("http", "https") or parsed.hostname not in LOCAL_CALLBACK_HOSTS:
+        raise ValueError(f"Callback URL must be an http(s) URL on one of: {', '.join(LOCAL_CALLBACK_HOSTS)}.")
+
+def submit_job(task: str, payload: Dict[str, Any], priority: str = "interactive",
+               callback_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Stores a new job in the queue and returns immediately.
+
+    Args:
+        task (str): A task with a registered handler.
+        payload (Dict[str, Any]): The input passed to the handler.
+        priority (str): "interactive" or "batch".
+        callback_url (Optional[str]): Local URL that receives the finished job as a POST.
+
+    Returns:
+        Dict[str, Any]: The status of the new job.
+    """
+    if _connection is None:
+        raise RuntimeError("Job queue is not started. Please run 'start_job_queue' at startup.")
+    if task not in _handlers:
+        raise ValueError(f"Unknown task '{task}'. Expected one of: {', '.join(_handlers)}.")
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{priority}'. Expected one of: {', '.join(PRIORITIES)}.")
+    if callback_url:
+        _validate_callback_url(callback_url)
+
+    job_id = uuid.uuid4().hex
+    with _job_available:
+        _connection.execute(
+            "INSERT INTO jobs (id, task, priority, payload, status, callback_url, created_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+            (job_id, task, PRIORITIES[priority], json.dumps(payload), callback_url, time.time())
+        )
+        _job_available.notify()
+    return get_job(job_id)
+
+def _row_to_status(row: sqlite3.Row) -> Dict[str, Any]:
+    priority_names = {value: name for name, value in PRIORITIES.items()}
+    return {
+        "job_id": row["id"],
+        "task": row["task"],
+        "priority": priority_names.get(row["priority"], str(row["priority"])),
+        "status": row["status"],
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+    }
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the status of a job, or None if it does not exist or has expired.
+    """
+    with _lock:
+        row = _connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _row_to_status(row) if row else None
+
+def get_job_result(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the status of a job together with its result (None until it is done),
+    or None if the job does not exist or has expired.
+    """
+    with _lock:
+        row = _connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = _row_to_status(row)
+    job["result"] = json.loads(row["result"]) if row["result"] else None
+    return job
+
+def _claim_next_job() -> Optional[sqlite3.Row]:
+    """
+    Internal helper that marks the most urgent queued job as running and returns it.
+    Must be called with the lock held. The status check in the UPDATE keeps the claim
+    atomic when other processes share the database.
+    """
+    while True:
+        row = _connection.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' ORDER BY priority, created_at LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        claimed = _connection.execute(
+            "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ? AND status = 'queued'",
+            (time.time(), row["id"])
+        ).rowcount
+        if claimed:
+            return _connection.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+
+def _purge_expired_results():
+    with _lock:
+        _connection.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+            (time.time() - _result_ttl,)
+        )
+
+def _send_callback(job_id: str, callback_url: str):
+    body = json.dumps(get_job_result(job_id)).encode("utf-8")
+    request = urllib.request.Request(callback_url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        urllib.request.urlopen(request, timeout=WEBHOOK_TIMEOUT_SECONDS).close()
+    except Exception as e:
+        print(f"Webhook for job {job_id} to '{callback_url}' failed: {e}")
+
+def _worker_loop():
+    last_purge = 0.0
+    while not _stop_event.is_set():
+        if time.time() - last_purge > PURGE_INTERVAL_SECONDS:
+            _purge_expired_results()
+            last_purge = time.time()
+
+        with _job_available:
+            row = _claim_next_job()
+            if row is None:
+                _job_available.wait(timeout=1.0)
+                continue
+
+        result, error = None, None
+        try:
+            result = _handlers[row["task"]](json.loads(row["payload"]))
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        with _lock:
+            _connection.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                ("failed" if error else "done", json.dumps(result) if error is None else None,
+                 error, time.time(), row["id"])
+            )
+        if row["callback_url"]:
+            _send_callback(row["id"], row["callback_url"])
@@ -1,46 +1,231 @@
-from fastapi import FastAPI, HTTPException, Response
-from pydantic import BaseModel, Field
-from typing import List, Optional
-
-from .named_entity_recognizer import load_ner_model, extract_named_entities, visualize_entities
-from .abstractive_summarizer import load_abstractive_model, generate_abstractive_summary
-from .extractive_summarizer import load_summarizer_tools, generate_extractive_summary
-from .morphological_analyzer import analyze_word_list as analyze_morphology_list
-from .word_processor import load_word_processing_tools, process_word_list
-from .sentiment_analyzer import load_sentiment_model, predict_sentiment
-from .textrank_summarizer import generate_textrank_summary
-from .tokenizer.logic import tokenize_text
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from pydantic import ValidationError
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Literal, Optional, Union
+from itertools import accumulate, chain
+import threading
+import hmac
+import json
+import time
+import re
+import os
+
+from .named_entity_recognizer import (
+    load_ner_model, unload_ner_model, extract_named_entities, extract_named_entities_batch, parse_text, parse_texts,
+    doc_to_bytes, doc_from_bytes, visualize_entities, get_ner_model_version
+)
+from .abstractive_summarizer import (
+    load_abstractive_model, unload_abstractive_model, generate_abstractive_summary,
+    generate_long_abstractive_summary, needs_long_document_mode, stream_abstractive_summary, get_encoder_cache_info,
+    get_abstractive_model_version, DeadlineExceededError
+)
+from .extractive_summarizer import (
+    load_summarizer_tools, unload_summarizer_tools, generate_extractive_summary, preprocess_document, resolve_weighting,
+    get_idf_table_info, reload_idf_table
+)
+from .morphological_analyzer import analyze_word_list as analyze_morphology_list, analyze_word_columns, MORPHOLOGY_FIELDS
+from .word_processor import load_word_processing_tools, unload_word_processing_tools, process_word_list
+from .sentiment_analyzer import (
+    load_sentiment_model, unload_sentiment_model, predict_sentiment, predict_sentiment_batch, preprocess_review
+)
+from .textrank_summarizer import (
+    load_textrank_tools, unload_textrank_tools, generate_textrank_summary, parse_document,
+    APPROXIMATE_SENTENCE_THRESHOLD, LSH_NUM_BANDS, LSH_BAND_BITS, LSH_WINDOW
+)
+from .tokenizer.logic import tokenize_text, tokenize_texts
+from .phrase_chunker import load_phrase_chunker, unload_phrase_chunker, chunk_phrases_batch, chunk_docs_batch
+from .metrics import increment, observe, get_metrics_snapshot
+from .model_manager import ModelManager
+from .batch_transport import (
+    ListColumn, UnsupportedFormatError, request_format, response_format, decode_texts, encode_columns, FORMAT_MEDIA_TYPES
+)
+from .serialization import FastJSONResponse, to_columnar, add_response_compression
+from .warmup import run_warmup, start_warmup, is_ready, get_warmup_report
+from .request_coalescing import Singleflight, make_request_key
+from .profiler import (
+    sample_stacks, to_collapsed_stacks, to_speedscope, StageProfileMiddleware, ProfiledRoute, ProfilerBusyError
+)
+from .tracing import trace_span, trace_function, RotatingFileExporter, TailSampler, TracingMiddleware, TracedRoute
+from .similarity_search import (
+    load_similarity_index, unload_similarity_index, build_similarity_index, add_to_similarity_index, search_similar,
+    search_similar_batch, compact_similarity_index, flush_similarity_index, get_similarity_index_stats
+)
+from .summarization_sessions import SessionStore, SessionNotFoundError, SessionFullError
+from .document_store import DocumentStore, DocumentNotFoundError, DocumentTooLargeError, JSON_CODEC, TEXT_CODEC
+from .job_queue import register_job_handler, start_job_queue, stop_job_queue, submit_job, get_job, get_job_result
+
+## Deployment Settings ##
+# Selected per deployment through environment variables.
+ABSTRACTIVE_BACKEND = os.environ.get("NLU_ABSTRACTIVE_BACKEND", "pytorch")  # pytorch | pytorch-int8 | onnx
+ABSTRACTIVE_ONNX_DIR = os.environ.get("NLU_ABSTRACTIVE_ONNX_DIR")  # defaults to onnx_models/<model>
+# Memory for encoder outputs reused when the same text is summarized again, e.g. with other lengths (0 = off).
+# It is not part of the model sizes checked against NLU_MODEL_MEMORY_BUDGET_MB.
+ENCODER_CACHE_MB = float(os.environ.get("NLU_ENCODER_CACHE_MB", "64"))
+# Most length settings one abstractive request may ask for.
+MAX_SUMMARY_LENGTHS = int(os.environ.get("NLU_MAX_SUMMARY_LENGTHS", "4"))
+INFERENCE_THREADS = int(os.environ["NLU_INFERENCE_THREADS"]) if os.environ.get("NLU_INFERENCE_THREADS") else None
+JOB_DB_PATH = os.environ.get("NLU_JOB_DB", "jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("NLU_JOB_WORKERS", "1"))
+# Models unused for this many seconds are unloaded (unset = never).
+MODEL_IDLE_TIMEOUT = float(os.environ["NLU_MODEL_IDLE_TIMEOUT"]) if os.environ.get("NLU_MODEL_IDLE_TIMEOUT") else None
+# Least recently used models are evicted while the loaded models exceed this many MB (unset = no limit).
+MODEL_MEMORY_BUDGET_MB = float(os.environ["NLU_MODEL_MEMORY_BUDGET_MB"]) if os.environ.get("NLU_MODEL_MEMORY_BUDGET_MB") else None
+# Comma-separated model names that are never evicted, e.g. "sentiment,ner".
+PINNED_MODELS = {name.strip() for name in os.environ.get("NLU_PINNED_MODELS", "").split(",") if name.strip()}
+# Responses larger than this many bytes are compressed (gzip, or Brotli if brotli-asgi is installed).
+COMPRESSION_MIN_SIZE = int(os.environ.get("NLU_COMPRESSION_MIN_SIZE", "1000"))
+# Largest number of inputs accepted by one batch request.
+BATCH_MAX_ITEMS = int(os.environ.get("NLU_BATCH_MAX_ITEMS", "10000"))
+# Each warm-up task runs this many times before the service reports ready (0 disables warm-up).
+WARMUP_ROUNDS = int(os.environ.get("NLU_WARMUP_ROUNDS", "2"))
+# Comma-separated model names to warm up (unset = all).
+WARMUP_MODELS = {name.strip() for name in os.environ.get("NLU_WARMUP_MODELS", "").split(",") if name.strip()}
+# Disabled by the pre-fork launcher and the sharding router, which re-queue interrupted jobs once for all workers.
+JOB_REQUEUE_INTERRUPTED = os.environ.get("NLU_JOB_REQUEUE_INTERRUPTED", "1") != "0"
+# Comma-separated models loaded and warmed up at startup (unset = all); the others load on first use.
+# Set per worker by the sharding router, so that each worker only holds the models of its tasks.
+WORKER_MODELS = [name.strip() for name in os.environ.get("NLU_WORKER_MODELS", "").split(",") if name.strip()]
+# Seconds a coalesced request waits for the identical in-flight computation (unset = no limit).
+COALESCE_WAIT_TIMEOUT = float(os.environ["NLU_COALESCE_TIMEOUT"]) if os.environ.get("NLU_COALESCE_TIMEOUT") else None
+# Most coalesced requests that wait at once, each holding a worker thread; the others compute their own result.
+COALESCE_MAX_WAITERS = int(os.environ.get("NLU_COALESCE_MAX_WAITERS", "16"))
+# Required in the X-Admin-Token header of /admin requests and ?profile=1 requests (unset = no check).
+ADMIN_TOKEN = os.environ.get("NLU_ADMIN_TOKEN")
+# Longest sampling profile /admin/profile accepts, in seconds.
+PROFILE_MAX_SECONDS = float(os.environ.get("NLU_PROFILE_MAX_SECONDS", "60"))
+# Per-request tracing (trace ids, stage spans, X-Trace-Id and Server-Timing headers); "1" enables it.
+# Off by default: the headers expose internal stage timings to every caller.
+TRACING_ENABLED = os.environ.get("NLU_TRACING", "0") == "1"
+# Kept traces are written here as OTLP/JSON lines (unset = not written).
+TRACE_FILE = os.environ.get("NLU_TRACE_FILE")
+TRACE_FILE_MAX_MB = float(os.environ.get("NLU_TRACE_FILE_MAX_MB", "50"))
+TRACE_FILE_BACKUPS = int(os.environ.get("NLU_TRACE_FILE_BACKUPS", "5"))
+# Traces of requests slower than this are always kept; faster ones with NLU_TRACE_SAMPLE_RATE probability.
+TRACE_SLOW_MS = float(os.environ.get("NLU_TRACE_SLOW_MS", "500"))
+TRACE_SAMPLE_RATE = float(os.environ.get("NLU_TRACE_SAMPLE_RATE", "0"))
+# Corpus IDF table of the extractive summarizer, built with nlu_app.extractive_summarizer.build_idf
+# (unset = sentences are scored by in-document word frequency only).
+EXTRACTIVE_IDF_TABLE = os.environ.get("NLU_EXTRACTIVE_IDF_TABLE")
+# Summarization sessions unused for this many seconds are closed; at most NLU_MAX_SESSIONS are kept per process.
+SESSION_TTL = float(os.environ.get("NLU_SESSION_TTL", "3600"))
+MAX_SESSIONS = int(os.environ.get("NLU_MAX_SESSIONS", "1000"))
+# Most characters one session accepts (appends beyond it get 413), and the longest held-back last sentence
+# before it is added as is.
+SESSION_MAX_CHARACTERS = int(os.environ.get("NLU_SESSION_MAX_CHARACTERS", "1000000"))
+SESSION_MAX_PENDING_CHARACTERS = int(os.environ.get("NLU_SESSION_MAX_PENDING_CHARACTERS", "10000"))
+# Sessions live in the memory of one process, so the follow-up calls of a session must reach the process that
+# created it; the pre-fork launcher turns them off (the sharding router pins them to one worker instead).
+SESSIONS_ENABLED = os.environ.get("NLU_SESSIONS_ENABLED", "1") != "0"
+# Directory of the TF-IDF similarity index, how many added documents are buffered before being written,
+# and how many similar-sized segments a flush merges into one.
+SIMILARITY_INDEX_DIR = os.environ.get("NLU_SIMILARITY_INDEX_DIR", "similarity_index")
+SIMILARITY_FLUSH_DOCS = int(os.environ.get("NLU_SIMILARITY_FLUSH_DOCS", "10000"))
+SIMILARITY_MERGE_FACTOR = int(os.environ.get("NLU_SIMILARITY_MERGE_FACTOR", "8"))
+# The similarity index keeps its buffered documents and segment list in one process, so it must not be served
+# by several processes sharing its directory; the pre-fork launcher turns it off (the sharding router pins it instead).
+SIMILARITY_ENABLED = os.environ.get("NLU_SIMILARITY_ENABLED", "1") != "0"
+# Documents uploaded to /documents are kept in this directory; the least recently used ones are evicted
+# beyond NLU_DOCUMENT_STORE_MB, and the last NLU_DOCUMENT_CACHE_DOCS used ones stay in memory with their artifacts.
+DOCUMENT_STORE_DIR = os.environ.get("NLU_DOCUMENT_STORE_DIR", "document_store")
+DOCUMENT_STORE_MB = float(os.environ.get("NLU_DOCUMENT_STORE_MB", "1024"))
+DOCUMENT_CACHE_DOCS = int(os.environ.get("NLU_DOCUMENT_CACHE_DOCS", "8"))
+# Sentence count above which TextRank's 'auto' method uses the LSH-based approximate engine, and that engine's
+# LSH bands, random-projection bits per band and same-bucket neighbours paired with each sentence.
+TEXTRANK_APPROXIMATE_THRESHOLD = int(
+    os.environ.get("NLU_TEXTRANK_APPROXIMATE_THRESHOLD", str(APPROXIMATE_SENTENCE_THRESHOLD))
+)
+TEXTRANK_LSH_BANDS = int(os.environ.get("NLU_TEXTRANK_LSH_BANDS", str(LSH_NUM_BANDS)))
+TEXTRANK_LSH_BAND_BITS = int(os.environ.get("NLU_TEXTRANK_LSH_BAND_BITS", str(LSH_BAND_BITS)))
+TEXTRANK_LSH_WINDOW = int(os.environ.get("NLU_TEXTRANK_LSH_WINDOW", str(LSH_WINDOW)))
 
 ## Pydantic Models ##
 
-class TextInput(BaseModel):
-    text: str
+class DocumentReference(BaseModel):
+    text: Optional[str] = Field(None, description="The input text. Give either 'text' or 'doc_id'.")
+    doc_id: Optional[str] = Field(
+        None, description="Id of a document stored with POST /documents, instead of sending its text again."
+    )
 
-class ExtractiveSummarizationInput(BaseModel):
-    text: str
+    @model_validator(mode="after")
+    def _check_text_or_doc_id(self):
+        if (self.text is None) == (self.doc_id is None):
+            raise ValueError("Give either 'text' or 'doc_id'.")
+        return self
+
+class TextInput(DocumentReference):
+    include_text: bool = Field(
+        True, description="Echo the input text back as 'original_text'. Disable it for large documents. "
+                          "Stored documents ('doc_id') are never echoed."
+    )
+
+ListFormat = Literal["records", "columnar"]
+
+class EntityInput(TextInput):
+    format: ListFormat = Field(
+        "records", description="'records' for one object per entity, 'columnar' for one list per field."
+    )
+
+class ExtractiveSummarizationInput(DocumentReference):
     num_sentences: int = Field(3, gt=0, description="Number of sentences for extractive methods.")
 
-class AbstractiveSummarizationInput(BaseModel):
-    text: str
+class FrequencySummarizationInput(ExtractiveSummarizationInput):
+    weighting: Literal["auto", "frequency", "tfidf"] = Field(
+        "auto", description="'frequency' scores words by in-document frequency, 'tfidf' also by the corpus IDF table, "
+                            "'auto' uses TF-IDF when the server has an IDF table."
+    )
+
+class TextRankSummarizationInput(ExtractiveSummarizationInput):
+    method: Literal["auto", "fast", "approximate", "sumy"] = Field(
+        "auto", description="'fast' for exact vectorized LexRank, 'approximate' for LSH-sparsified LexRank, "
+                            "'sumy' for sumy's LexRankSummarizer, 'auto' to go approximate on very long documents."
+    )
+
+class SummaryLength(BaseModel):
+    max_length: int = Field(..., gt=20, description="Max token length for abstractive summary.")
+    min_length: int = Field(..., gt=0, description="Min token length for abstractive summary.")
+
+class AbstractiveSummarizationInput(DocumentReference):
     max_length: int = Field(130, gt=20, description="Max token length for abstractive summary.")
     min_length: int = Field(30, gt=0, description="Min token length for abstractive summary.")
+    lengths: Optional[List[SummaryLength]] = Field(
+        None, min_length=1, max_length=MAX_SUMMARY_LENGTHS,
+        description="Several length settings, each returned in 'summaries' (replaces max_length and min_length). "
+                    "The text is encoded once for all of them."
+    )
+    mode: Literal["fast", "balanced", "quality"] = Field(
+        "quality", description="Latency tier: 'fast' (greedy), 'balanced' or 'quality' (beam search with early stopping)."
+    )
+    long_document: Optional[bool] = Field(
+        None, description="Use map-reduce summarization for texts longer than the model's context. "
+                          "If omitted, it is enabled automatically when the text does not fit."
+    )
 
 class WordListInput(BaseModel):
     words: List[str]
+    format: ListFormat = Field(
+        "records", description="'records' for one object per word, 'columnar' for one list per field."
+    )
 
 class SentimentOutput(BaseModel):
-    original_text: str
+    original_text: Optional[str] = None
     predicted_sentiment: str
 
 class NerEntity(BaseModel):
     text: str
     label: str
-    explanation: str
+    explanation: Optional[str] = None
 
 class NerOutput(BaseModel):
-    original_text: str
+    original_text: Optional[str] = None
     entities: List[NerEntity]
 
+class NerColumnarOutput(BaseModel):
+    original_text: Optional[str] = None
+    entities: Dict[str, List[Optional[str]]]
+
 class ProcessedWord(BaseModel):
     original: str
     stemmed: str
@@ -49,6 +234,9 @@ class ProcessedWord(BaseModel):
 class WordProcessingOutput(BaseModel):
     results: List[ProcessedWord]
 
+class WordProcessingColumnarOutput(BaseModel):
+    results: Dict[str, List[str]]
+
 class MorphologyResult(BaseModel):
     original_word: str
     prefix: Optional[str] = None
@@ -60,104 +248,1116 @@ class MorphologyResult(BaseModel):
 class MorphologyOutput(BaseModel):
     results: List[MorphologyResult]
 
+class MorphologyColumnarOutput(BaseModel):
+    results: Dict[str, List[Optional[str]]]
+
+class LengthSummary(BaseModel):
+    max_length: int
+    min_length: int
+    summary: str
+    summary_length: int
+
 class SummaryOutput(BaseModel):
     original_text_length: int
     summary: str
     summary_length: int
     method: str
+    summaries: Optional[List[LengthSummary]] = None
+    encoder_flops_saved: Optional[float] = None
+    chunk_count: Optional[int] = None
+    generation_time: Optional[float] = None
+    stage_timings: Optional[Dict[str, float]] = None
+    time_to_first_token: Optional[float] = None
+    truncated: Optional[bool] = None
 
 class TokenizerOutput(BaseModel):
-    original_text: str
+    original_text: Optional[str] = None
     tokens: List[str]
     token_count: int
 
+class DocumentTextInput(BaseModel):
+    text: str
+
+class DocumentInfo(BaseModel):
+    doc_id: str
+    size_bytes: int
+    text_length: int
+    created_at: float
+    artifacts: List[str]
+    created: Optional[bool] = None
+
+class SessionInput(BaseModel):
+    method: Literal["extractive", "textrank"] = Field(
+        "extractive", description="'extractive' for frequency-based (or TF-IDF) scoring, 'textrank' for LexRank."
+    )
+    weighting: Literal["auto", "frequency", "tfidf"] = Field(
+        "auto", description="Word weighting of the 'extractive' method (see /summarize-text/extractive)."
+    )
+
+class SessionTextInput(BaseModel):
+    text: str = Field(..., description="The next chunk of the document, joined to the previous text as is.")
+    flush: bool = Field(False, description="The document is complete so far: also add its last sentence, "
+                                           "which is otherwise held back until more text arrives.")
+
+class SessionInfo(BaseModel):
+    session_id: str
+    method: str
+    weighting: Optional[str] = None
+    num_sentences: int
+    num_characters: int
+    pending_characters: int
+    created_at: float
+    last_used: float
+    added_sentences: Optional[int] = None
+
+class SessionSummaryOutput(BaseModel):
+    session_id: str
+    summary: str
+    summary_length: int
+    num_sentences: int = Field(..., description="Sentences in the session's document so far (not in the summary).")
+    method: str = Field(..., description="The session's summarization method, 'extractive' or 'textrank'.")
+    weighting: Optional[str] = Field(None, description="Word weighting of the 'extractive' method.")
+
+class PhraseChunkInput(BaseModel):
+    texts: List[str]
+    grammar: Optional[str] = Field(
+        None, max_length=4096,
+        description="Chunk rules, one per line, e.g. 'NP: {<DT>?<JJ.*>*<NN.*>+}'. Rules must be unambiguous and "
+                    "cannot nest repetitions (see ChunkGrammar). Defaults to noun, verb, adjective and adverb phrase rules."
+    )
+    tagger: Literal["nltk", "spacy"] = Field(
+        "nltk", description="'nltk' tags with NLTK's perceptron tagger, 'spacy' reuses the tags of the spaCy pipeline."
+    )
+    split_sentences: bool = Field(True, description="Split the texts into sentences. Disable it for one sentence per text.")
+    format: ListFormat = Field(
+        "records", description="'records' for one object per phrase, 'columnar' for one list per field."
+    )
+
+class Phrase(BaseModel):
+    text: str
+    label: str
+    start_char: int
+    end_char: int
+
+class PhraseChunkOutput(BaseModel):
+    results: List[List[Phrase]]
+
+class PhraseChunkColumnarOutput(BaseModel):
+    results: List[Dict[str, List[Any]]]
+
+class SimilarityDocument(BaseModel):
+    id: Optional[str] = Field(None, description="Unique document id (default: its position in the index).")
+    text: str
+
+class SimilarityDocumentsInput(BaseModel):
+    documents: List[SimilarityDocument]
+    flush: bool = Field(False, description="Write the documents to disk now instead of with the next flush.")
+
+class SimilarityQueryInput(BaseModel):
+    query: str
+    k: int = Field(10, gt=0, le=1000, description="Number of most similar documents to return.")
+
+class SimilarityBatchQueryInput(BaseModel):
+    queries: List[str]
+    k: int = Field(10, gt=0, le=1000, description="Number of most similar documents to return per query.")
+
+class SimilarityMatch(BaseModel):
+    doc_id: str
+    score: float
+
+class SimilarityOutput(BaseModel):
+    results: List[SimilarityMatch]
+
+class SimilarityBatchOutput(BaseModel):
+    results: List[List[SimilarityMatch]]
+
+class SimilarityIndexStats(BaseModel):
+    directory: Optional[str] = None
+    num_documents: int
+    num_terms: int
+    buffered_documents: int
+    segments: List[Dict[str, Any]]
+
+class SimilarityAddOutput(BaseModel):
+    doc_ids: List[str]
+    num_documents: int
+
+class JobSubmission(BaseModel):
+    task: Literal["abstractive", "textrank"]
+    payload: Dict[str, Any] = Field(..., description="The request body of the matching summarization endpoint.")
+    priority: Literal["interactive", "batch"] = Field("interactive", description="Interactive jobs run ahead of batch jobs.")
+    callback_url: Optional[str] = Field(None, description="Local URL that receives the finished job as a POST.")
+
+class JobStatus(BaseModel):
+    job_id: str
+    task: str
+    priority: str
+    status: str
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+class JobResult(JobStatus):
+    result: Optional[Dict[str, Any]] = None
+
 ## FastAPI Application ##
 
 app = FastAPI(
     title="Ultimate NLU API",
     description="An API that performs NLU tasks such as sentiment analysis, named entity recognition, word processing, morphological analysis, tokenization, and text summarization using three different methods.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
+# Times the handler stage of ?profile=1 requests and, with tracing, records the thread pool wait of every
+# endpoint call; must be set before the routes are declared.
+app.router.route_class = TracedRoute if TRACING_ENABLED else ProfiledRoute
+add_response_compression(app, minimum_size=COMPRESSION_MIN_SIZE, excluded_paths=[r"^/summarize-text/abstractive/stream$"])
+
+def _is_admin(token: Optional[str]) -> bool:
+    if ADMIN_TOKEN is None:
+        return True
+    return token is not None and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+def require_admin(x_admin_token: Optional[str] = Header(None, description="Required when NLU_ADMIN_TOKEN is set.")):
+    if not _is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="A valid admin token is required.")
+
+trace_exporter = RotatingFileExporter(
+    TRACE_FILE, max_bytes=int(TRACE_FILE_MAX_MB * 1024 * 1024), backup_count=TRACE_FILE_BACKUPS
+) if TRACE_FILE else None
+if TRACING_ENABLED:
+    app.add_middleware(
+        TracingMiddleware, exporter=trace_exporter,
+        sampler=TailSampler(slow_threshold=TRACE_SLOW_MS / 1000, sample_rate=TRACE_SAMPLE_RATE)
+    )
+
+# Added last, so that it is the outermost middleware and its total includes the others.
+app.add_middleware(StageProfileMiddleware, authorize=lambda headers: _is_admin(headers.get("x-admin-token")))
 
 ## Server Startup ##
 
+model_manager = ModelManager(
+    idle_timeout=MODEL_IDLE_TIMEOUT,
+    memory_budget_bytes=int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024) if MODEL_MEMORY_BUDGET_MB else None
+)
+model_manager.register(
+    "sentiment", lambda: load_sentiment_model(model_dir='saved_model', nltk_data_dir='nltk_data'),
+    unload_sentiment_model, pinned="sentiment" in PINNED_MODELS
+)
+model_manager.register("ner", lambda: load_ner_model(), unload_ner_model, pinned="ner" in PINNED_MODELS)
+model_manager.register(
+    "word_processing", lambda: load_word_processing_tools(), unload_word_processing_tools,
+    pinned="word_processing" in PINNED_MODELS
+)
+model_manager.register(
+    "extractive", lambda: load_summarizer_tools(idf_table_path=EXTRACTIVE_IDF_TABLE), unload_summarizer_tools,
+    pinned="extractive" in PINNED_MODELS
+)
+model_manager.register(
+    "textrank", lambda: load_textrank_tools(), unload_textrank_tools, pinned="textrank" in PINNED_MODELS
+)
+model_manager.register(
+    "abstractive",
+    lambda: load_abstractive_model(
+        backend=ABSTRACTIVE_BACKEND, num_threads=INFERENCE_THREADS, onnx_dir=ABSTRACTIVE_ONNX_DIR,
+        encoder_cache_bytes=int(ENCODER_CACHE_MB * 1024 * 1024)
+    ),
+    unload_abstractive_model, pinned="abstractive" in PINNED_MODELS
+)
+model_manager.register(
+    "phrase_chunker", lambda: load_phrase_chunker(), unload_phrase_chunker, pinned="phrase_chunker" in PINNED_MODELS
+)
+model_manager.register(
+    "similarity",
+    lambda: load_similarity_index(
+        SIMILARITY_INDEX_DIR, flush_threshold=SIMILARITY_FLUSH_DOCS, merge_factor=SIMILARITY_MERGE_FACTOR
+    ),
+    unload_similarity_index, pinned="similarity" in PINNED_MODELS
+)
+
+_models_loaded = False
+
+def load_all_models():
+    """
+    Loads all models and tools once. Later calls do nothing, so a pre-fork master can
+    load everything before its workers run the startup event.
+    """
+    global _models_loaded
+    if _models_loaded:
+        return
+    for name in WORKER_MODELS or model_manager.names():
+        if name != "similarity" or SIMILARITY_ENABLED:
+            model_manager.ensure_loaded(name)
+    _models_loaded = True
+
+WARMUP_TEXT = (
+    "Apple announced on Monday that Tim Cook will visit the new research center in Berlin next month. "
+    "The company said the center would employ about two thousand engineers working on machine learning and chip design. "
+    "Analysts expect the investment to strengthen its position in Europe, although some critics worried about rising costs. "
+    "Local officials welcomed the decision and promised faster permits for future construction projects."
+)
+
+def build_warmup_tasks() -> Dict[str, Any]:
+    """
+    Returns one warm-up call per model, each running a representative input through
+    the same function the endpoints use.
+    """
+    tasks = {
+        "sentiment": lambda: predict_sentiment(WARMUP_TEXT),
+        "ner": lambda: (extract_named_entities(WARMUP_TEXT), visualize_entities(WARMUP_TEXT)),
+        "word_processing": lambda: process_word_list(tokenize_text(WARMUP_TEXT)[:20]),
+        "extractive": lambda: generate_extractive_summary(WARMUP_TEXT, 2),
+        "textrank": lambda: generate_textrank_summary(WARMUP_TEXT, 2),
+        "abstractive": lambda: generate_abstractive_summary(WARMUP_TEXT, max_length=60, min_length=10),
+        "phrase_chunker": lambda: chunk_phrases_batch([WARMUP_TEXT]),
+        "similarity": lambda: search_similar(WARMUP_TEXT, 10),
+    }
+
+    def with_model(name, task):
+        with model_manager.use(name):
+            return task()
+
+    return {
+        name: (lambda name=name, task=task: with_model(name, task))
+        for name, task in tasks.items()
+        if (not WARMUP_MODELS or name in WARMUP_MODELS) and (not WORKER_MODELS or name in WORKER_MODELS)
+        and (name != "similarity" or SIMILARITY_ENABLED)
+    }
+
+def warm_up_models():
+    """Runs the warm-up in the calling thread (used by the pre-fork master before forking)."""
+    run_warmup(build_warmup_tasks(), WARMUP_ROUNDS)
+
 @app.on_event("startup")
 def startup_event():
     """This function runs once when the server starts and loads all models/tools."""
     print("--- Starting Server: Loading All Models and Tools ---")
     try:
-        load_sentiment_model(model_dir='saved_model', nltk_data_dir='nltk_data')
-        load_ner_model()
-        load_word_processing_tools()
-        load_summarizer_tools()
-        load_abstractive_model() # Load the new abstractive model
+        if _models_loaded:
+            print("Models were loaded by the parent process and are shared with this worker.")
+        load_all_models()
+        document_store.open()
+        start_job_queue(db_path=JOB_DB_PATH, num_workers=JOB_WORKERS, requeue_interrupted=JOB_REQUEUE_INTERRUPTED)
+        model_manager.start_monitor()
+        # Readiness turns green once the warm-up is done (or at once if it already ran or is disabled).
+        if not is_ready():
+            start_warmup(build_warmup_tasks(), WARMUP_ROUNDS)
         print("\n--- All models and tools loaded successfully. Server is ready. ---")
     except (FileNotFoundError, OSError, Exception) as e:
         print(f"\nFATAL ERROR: An error occurred during loading. Server could not be started.")
         print(f"Error Detail: {e}")
         raise e
 
+@app.on_event("shutdown")
+def shutdown_event():
+    model_manager.stop_monitor()
+    stop_job_queue()
+    flush_similarity_index()
+    if trace_exporter is not None:
+        trace_exporter.shutdown()
+
+## Request Coalescing ##
+
+request_coalescer = Singleflight(metric_name="coalesced_requests", max_waiters=COALESCE_MAX_WAITERS)
+
+def _coalesced(endpoint: str, text: str, params: Dict[str, Any], func):
+    """
+    Runs `func` once for identical concurrent requests; followers share the leader's result.
+    A follower that gives up waiting gets a 504, while the leader's computation continues.
+    """
+    key = make_request_key(endpoint, text, params)
+    try:
+        return request_coalescer.do(key, trace_function(func, "compute"), timeout=COALESCE_WAIT_TIMEOUT, label=endpoint)
+    except FuturesTimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for an identical in-flight request.")
+
+## Document Store ##
+
+document_store = DocumentStore(
+    DOCUMENT_STORE_DIR, max_bytes=int(DOCUMENT_STORE_MB * 1024 * 1024), memory_documents=DOCUMENT_CACHE_DOCS,
+    max_artifact_waiters=COALESCE_MAX_WAITERS
+)
+NER_DOC_CODEC = (doc_to_bytes, doc_from_bytes)
+
+DOCUMENT_UPLOAD_DOC = {
+    "requestBody": {
+        "required": True,
+        "description": "The document as raw UTF-8 text (read as a stream, any size up to the store size) "
+                       "or as JSON {\"text\": ...}.",
+        "content": {
+            "text/plain": {"schema": {"type": "string"}},
+            "application/json": {"schema": {"type": "object", "properties": {"text": {"type": "string"}}}},
+        },
+    }
+}
+
+def _resolve_document(payload: DocumentReference) -> DocumentReference:
+    """
+    Fills in the text of a 'doc_id' request from the document store; a 404 if the
+    document is unknown or was evicted.
+    """
+    if payload.text is None:
+        try:
+            payload.text = document_store.get_text(payload.doc_id)
+        except DocumentNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    return payload
+
+def _document_artifact(payload: DocumentReference, name: str, compute, codec=None):
+    """
+    Computes `compute(text)` for the request text. For a stored document the result
+    is kept as one of its artifacts, so the next request on it skips the computation.
+    """
+    if payload.doc_id is None:
+        return compute(payload.text)
+    try:
+        return document_store.artifact(payload.doc_id, name, compute, codec)
+    except DocumentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+def _model_artifact(name: str, model_version: str) -> str:
+    """
+    Qualifies an artifact name with the version of the model that computes it, so that
+    artifacts stored on disk are recomputed, not reused, after the model changes.
+    """
+    return f"{name}@{re.sub(r'[^A-Za-z0-9._-]+', '_', model_version)}"
+
+@app.post("/documents", response_model=DocumentInfo, status_code=201, tags=["Documents"], openapi_extra=DOCUMENT_UPLOAD_DOC)
+async def api_store_document(request: Request):
+    """
+    Stores a document on the server and returns its id (the SHA-256 of its UTF-8 text).
+    Analysis endpoints accept the id as 'doc_id' instead of the text, and reuse what they
+    computed for the document before (sentence splits, parsed Docs). Storing the same
+    text again returns the same id.
+    """
+    media_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    upload = await run_in_threadpool(document_store.open_upload)
+    try:
+        if media_type == "application/json":
+            try:
+                text = DocumentTextInput(**await request.json()).text
+            except (ValueError, TypeError) as e:
+                raise HTTPException(status_code=422, detail=f"Expected a JSON object with a 'text' string: {e}")
+            await run_in_threadpool(upload.write, text.encode("utf-8"))
+        else:
+            # Disk writes run in the thread pool, so a large upload does not stall the event loop.
+            async for chunk in request.stream():
+                await run_in_threadpool(upload.write, chunk)
+        return await run_in_threadpool(upload.commit)
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        # Drops the temporary file of a failed or interrupted upload (no-op after a commit).
+        await run_in_threadpool(upload.abort)
+
+@app.get("/documents/{doc_id}", response_model=DocumentInfo, tags=["Documents"])
+def api_document_info(doc_id: str):
+    try:
+        return document_store.info(doc_id)
+    except DocumentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.delete("/documents/{doc_id}", status_code=204, tags=["Documents"], dependencies=[Depends(require_admin)])
+def api_delete_document(doc_id: str):
+    try:
+        document_store.delete(doc_id)
+    except DocumentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(status_code=204)
+
 ## API Endpoints ##
 
 @app.get("/", tags=["Health Check"])
 def read_root():
     return {"status": "ok", "message": "Welcome to the Ultimate NLU API!"}
 
+@app.get("/ready", tags=["Health Check"])
+def api_ready():
+    """Readiness check: 503 until the startup warm-up has finished, 200 afterwards."""
+    warmup_report = get_warmup_report()
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up", "warmup": warmup_report})
+    return {"status": "ready", "warmup": warmup_report}
+
 @app.post("/summarize-text/extractive", response_model=SummaryOutput, tags=["Summarization"])
-def api_summarize_text_extractive(payload: ExtractiveSummarizationInput):
-    summary_text = generate_extractive_summary(payload.text, payload.num_sentences)
+def api_summarize_text_extractive(payload: FrequencySummarizationInput):
+    _resolve_document(payload)
+    with model_manager.use("extractive"):
+        try:
+            weighting = resolve_weighting(payload.weighting)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        summary_text = _coalesced(
+            "extractive", payload.text, {"num_sentences": payload.num_sentences, "weighting": weighting},
+            lambda: generate_extractive_summary(
+                payload.text, payload.num_sentences, weighting,
+                preprocessed=_document_artifact(payload, "extractive.sentences", preprocess_document, JSON_CODEC)
+            )
+        )
+    method = "TF-IDF Extractive" if weighting == "tfidf" else "Frequency-Based Extractive"
     return SummaryOutput(
         original_text_length=len(payload.text), summary=summary_text,
-        summary_length=len(summary_text), method="Frequency-Based Extractive"
+        summary_length=len(summary_text), method=method
     )
 
-@app.post("/summarize-text/textrank", response_model=SummaryOutput, tags=["Summarization"])
-def api_summarize_text_textrank(payload: ExtractiveSummarizationInput):
-    summary_text = generate_textrank_summary(payload.text, payload.num_sentences)
+def _summarize_textrank(payload: TextRankSummarizationInput) -> SummaryOutput:
+    _resolve_document(payload)
+    with model_manager.use("textrank"):
+        document = _document_artifact(payload, "textrank.document", parse_document)
+        summary_text = generate_textrank_summary(
+            payload.text, payload.num_sentences, method=payload.method,
+            approximate_threshold=TEXTRANK_APPROXIMATE_THRESHOLD, document=document,
+            num_bands=TEXTRANK_LSH_BANDS, band_bits=TEXTRANK_LSH_BAND_BITS, window=TEXTRANK_LSH_WINDOW
+        )
     return SummaryOutput(
         original_text_length=len(payload.text), summary=summary_text,
         summary_length=len(summary_text), method="TextRank/LexRank (Graph-Based)"
     )
 
+@app.post("/summarize-text/textrank", response_model=SummaryOutput, tags=["Summarization"])
+def api_summarize_text_textrank(payload: TextRankSummarizationInput):
+    _resolve_document(payload)
+    return _coalesced(
+        "textrank", payload.text, {"num_sentences": payload.num_sentences, "method": payload.method},
+        lambda: _summarize_textrank(payload)
+    )
+
+def _summarize_abstractive(payload: AbstractiveSummarizationInput, deadline: Optional[float] = None) -> SummaryOutput:
+    # Reject requests that spent their whole budget waiting in the queue.
+    if deadline is not None and time.time() >= deadline:
+        increment("abstractive.deadline_rejected")
+        raise HTTPException(status_code=504, detail="The request deadline passed before processing started.")
+
+    _resolve_document(payload)
+    lengths = [(length.max_length, length.min_length) for length in payload.lengths] if payload.lengths else None
+    try:
+        with model_manager.use("abstractive"):
+            long_document = payload.long_document
+            if long_document is None:
+                long_document = _document_artifact(
+                    payload, _model_artifact("abstractive.long_document", get_abstractive_model_version()),
+                    needs_long_document_mode, JSON_CODEC
+                )
+
+            if long_document:
+                result = generate_long_abstractive_summary(
+                    payload.text, max_length=payload.max_length, min_length=payload.min_length,
+                    mode=payload.mode, deadline=deadline, lengths=lengths
+                )
+                method = "Abstractive Map-Reduce (Hugging Face BART)"
+            else:
+                result = generate_abstractive_summary(
+                    payload.text, max_length=payload.max_length, min_length=payload.min_length,
+                    mode=payload.mode, deadline=deadline, lengths=lengths
+                )
+                method = "Abstractive (Hugging Face BART)"
+    except DeadlineExceededError as e:
+        increment("abstractive.deadline_rejected")
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An internal error occurred: {str(e)}")
+
+    if result["truncated"]:
+        increment("abstractive.deadline_truncated")
+    summaries = None
+    if lengths:
+        summaries = [
+            LengthSummary(max_length=max_length, min_length=min_length, summary=summary, summary_length=len(summary))
+            for (max_length, min_length), summary in zip(lengths, result["summaries"])
+        ]
+    return SummaryOutput(
+        original_text_length=len(payload.text), summary=result["summary"],
+        summary_length=len(result["summary"]), method=method, truncated=result["truncated"],
+        chunk_count=result.get("chunk_count"), generation_time=result.get("generation_time"),
+        stage_timings=result.get("stage_timings"), summaries=summaries,
+        encoder_flops_saved=result.get("encoder_flops_saved")
+    )
+
 @app.post("/summarize-text/abstractive", response_model=SummaryOutput, tags=["Summarization"])
-def api_summarize_text_abstractive(payload: AbstractiveSummarizationInput):
+def api_summarize_text_abstractive(
+    payload: AbstractiveSummarizationInput,
+    x_request_deadline: Optional[float] = Header(
+        None, description="Unix timestamp (seconds) after which generation stops and a truncated summary is returned."
+    )
+):
+    _resolve_document(payload)
+    # Requests with their own deadline may return a truncated summary, so only
+    # deadline-free requests share results.
+    if x_request_deadline is not None:
+        return _summarize_abstractive(payload, deadline=x_request_deadline)
+    params = {
+        "max_length": payload.max_length, "min_length": payload.min_length,
+        "mode": payload.mode, "long_document": payload.long_document,
+        "lengths": tuple((length.max_length, length.min_length) for length in payload.lengths) if payload.lengths else None
+    }
+    return _coalesced("abstractive", payload.text, params, lambda: _summarize_abstractive(payload))
+
+def _sse_event(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+@app.post("/summarize-text/abstractive/stream", tags=["Summarization"])
+async def api_stream_abstractive_summary(
+    payload: AbstractiveSummarizationInput,
+    request: Request,
+    x_request_deadline: Optional[float] = Header(
+        None, description="Unix timestamp (seconds) after which generation stops and the stream ends with a truncated summary."
+    )
+):
+    """
+    Streams the abstractive summary as Server-Sent Events: one 'token' event per decoded
+    text piece, then a final 'summary' event with the SummaryOutput fields.
+    Generation starts when the stream is read and is cancelled when the client disconnects.
+    """
+    if payload.lengths:
+        raise HTTPException(status_code=422, detail="Streaming returns a single summary; 'lengths' is not supported.")
+    if "mode" in payload.model_fields_set and payload.mode != "fast":
+        raise HTTPException(status_code=422, detail="Streaming decodes greedily; only mode 'fast' is supported.")
+    if payload.long_document:
+        raise HTTPException(status_code=422, detail="Streaming does not support 'long_document'.")
+    if x_request_deadline is not None and time.time() >= x_request_deadline:
+        increment("abstractive.deadline_rejected")
+        raise HTTPException(status_code=504, detail="The request deadline passed before processing started.")
+    await run_in_threadpool(_resolve_document, payload)
+
+    def check_length():
+        with model_manager.use("abstractive"):
+            return _document_artifact(
+                payload, _model_artifact("abstractive.long_document", get_abstractive_model_version()),
+                needs_long_document_mode, JSON_CODEC
+            )
+
     try:
-        summary_text = generate_abstractive_summary(
-            payload.text, max_length=payload.max_length, min_length=payload.min_length
-        )
-        return SummaryOutput(
-            original_text_length=len(payload.text), summary=summary_text,
-            summary_length=len(summary_text), method="Abstractive (Hugging Face BART)"
-        )
+        too_long = await run_in_threadpool(check_length)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {str(e)}")
+    if too_long:
+        raise HTTPException(
+            status_code=413, detail="The text is longer than the model's context; "
+                                    "summarize it with /summarize-text/abstractive, which splits it into chunks."
+        )
+
+    cancel_event = threading.Event()
+
+    def start_stream():
+        # The stream keeps its own reference to the model, so it only needs to be held while starting.
+        with model_manager.use("abstractive"):
+            return stream_abstractive_summary(
+                payload.text, max_length=payload.max_length, min_length=payload.min_length,
+                cancel_event=cancel_event, deadline=x_request_deadline
+            )
+
+    async def event_source():
+        start_time = time.perf_counter()
+        time_to_first_token = None
+        summary_parts = []
+        try:
+            text_pieces = await run_in_threadpool(start_stream)
+            while True:
+                if await request.is_disconnected():
+                    increment("abstractive_stream.cancelled")
+                    return
+                text_piece = await run_in_threadpool(next, text_pieces, None)
+                if text_piece is None:
+                    break
+                if time_to_first_token is None:
+                    time_to_first_token = time.perf_counter() - start_time
+                    observe("abstractive_stream.time_to_first_token", time_to_first_token)
+                summary_parts.append(text_piece)
+                yield _sse_event("token", json.dumps({"text": text_piece}))
+
+            summary_text = "".join(summary_parts).strip()
+            generation_time = time.perf_counter() - start_time
+            observe("abstractive_stream.generation_time", generation_time)
+            truncated = x_request_deadline is not None and time.time() >= x_request_deadline
+            if truncated:
+                increment("abstractive.deadline_truncated")
+            final_output = SummaryOutput(
+                original_text_length=len(payload.text), summary=summary_text,
+                summary_length=len(summary_text), method="Abstractive (Hugging Face BART, streamed)",
+                truncated=truncated, generation_time=generation_time, time_to_first_token=time_to_first_token
+            )
+            yield _sse_event("summary", final_output.model_dump_json())
+        except DeadlineExceededError as e:
+            increment("abstractive.deadline_rejected")
+            yield _sse_event("error", json.dumps({"detail": str(e)}))
+        except Exception as e:
+            yield _sse_event("error", json.dumps({"detail": f"An internal error occurred: {str(e)}"}))
+        finally:
+            # Stops generation if the stream ended early (disconnect, error or cancellation).
+            cancel_event.set()
+
+    return StreamingResponse(event_source(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+## Fast Responses ##
+
+ENTITY_FIELDS = ("text", "label", "explanation")
+PROCESSED_WORD_FIELDS = ("original", "stemmed", "lemmatized")
+
+def _fast_response(content: Dict[str, Any], payload: Optional[TextInput] = None) -> FastJSONResponse:
+    """
+    Sends a plain dict straight to the fast JSON encoder, skipping response model
+    construction and validation (the response model still documents the shape).
+    Adds the echoed input text unless the request opted out or refers to a stored document.
+    """
+    if payload is not None and payload.include_text and payload.doc_id is None:
+        content = {"original_text": payload.text, **content}
+    return FastJSONResponse(content)
+
+def _records_or_columns(records: List[Dict[str, Any]], fields, list_format: str):
+    return to_columnar(records, fields) if list_format == "columnar" else records
 
 @app.post("/tokenize-text", response_model=TokenizerOutput, tags=["Tokenization"])
 def api_tokenize_text(payload: TextInput):
+    _resolve_document(payload)
     tokens = tokenize_text(payload.text)
-    return TokenizerOutput(original_text=payload.text, tokens=tokens, token_count=len(tokens))
+    return _fast_response({"tokens": tokens, "token_count": len(tokens)}, payload)
 
 @app.post("/analyze-sentiment", response_model=SentimentOutput, tags=["Sentiment Analysis"])
 def analyze_review_sentiment(payload: TextInput):
-    sentiment = predict_sentiment(payload.text)
-    return SentimentOutput(original_text=payload.text, predicted_sentiment=sentiment)
+    _resolve_document(payload)
+    with model_manager.use("sentiment"):
+        sentiment = _coalesced(
+            "sentiment", payload.text, {},
+            lambda: predict_sentiment(
+                payload.text, _document_artifact(payload, "sentiment.preprocessed", preprocess_review, TEXT_CODEC)
+            )
+        )
+    return _fast_response({"predicted_sentiment": sentiment}, payload)
+
+def _ner_doc(payload: DocumentReference):
+    return _document_artifact(payload, _model_artifact("ner.doc", get_ner_model_version()), parse_text, NER_DOC_CODEC)
 
-@app.post("/extract-entities", response_model=NerOutput, tags=["Named Entity Recognition"])
-def api_extract_entities(payload: TextInput):
-    entities = extract_named_entities(payload.text)
-    return NerOutput(original_text=payload.text, entities=entities)
+@app.post("/extract-entities", response_model=Union[NerOutput, NerColumnarOutput],
+          tags=["Named Entity Recognition"])
+def api_extract_entities(payload: EntityInput):
+    _resolve_document(payload)
+    with model_manager.use("ner"):
+        entities = _coalesced(
+            "entities", payload.text, {},
+            lambda: extract_named_entities(payload.text, doc=_ner_doc(payload))
+        )
+    return _fast_response({"entities": _records_or_columns(entities, ENTITY_FIELDS, payload.format)}, payload)
 
 @app.post("/visualize-entities", tags=["Named Entity Recognition"])
 def api_visualize_entities(payload: TextInput):
-    html_content = visualize_entities(payload.text)
+    _resolve_document(payload)
+    with model_manager.use("ner"):
+        html_content = _coalesced(
+            "visualize_entities", payload.text, {},
+            lambda: visualize_entities(payload.text, doc=_ner_doc(payload))
+        )
     return Response(content=html_content, media_type="text/html")
 
-@app.post("/process-words", response_model=WordProcessingOutput, tags=["Word Processing"])
+@app.post("/process-words", response_model=Union[WordProcessingOutput, WordProcessingColumnarOutput], tags=["Word Processing"])
 def api_process_words(payload: WordListInput):
-    processed_results = process_word_list(payload.words)
-    return WordProcessingOutput(results=processed_results)
+    with model_manager.use("word_processing"):
+        processed_results = process_word_list(payload.words)
+    return _fast_response({"results": _records_or_columns(processed_results, PROCESSED_WORD_FIELDS, payload.format)})
 
-@app.post("/analyze-morphology", response_model=MorphologyOutput, tags=["Morphological Analysis"])
+@app.post("/analyze-morphology", response_model=Union[MorphologyOutput, MorphologyColumnarOutput], tags=["Morphological Analysis"])
 def api_analyze_morphology(payload: WordListInput):
     analysis_results = analyze_morphology_list(payload.words)
-    return MorphologyOutput(results=analysis_results)
+    return _fast_response({"results": _records_or_columns(analysis_results, MORPHOLOGY_FIELDS, payload.format)})
+
+## Summarization Sessions ##
+
+session_store = SessionStore(
+    ttl=SESSION_TTL, max_sessions=MAX_SESSIONS, max_characters=SESSION_MAX_CHARACTERS,
+    max_pending_characters=SESSION_MAX_PENDING_CHARACTERS
+)
+
+def require_sessions():
+    if not SESSIONS_ENABLED:
+        raise HTTPException(
+            status_code=503, detail="Summarization sessions are disabled in this process; they need a single worker."
+        )
+
+def _get_session(session_id: str):
+    try:
+        return session_store.get(session_id)
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.post("/summarize-text/sessions", response_model=SessionInfo, status_code=201, tags=["Summarization"],
+          dependencies=[Depends(require_sessions)])
+def api_create_session(payload: SessionInput):
+    """
+    Opens a summarization session for a growing document (a live transcript, a feed).
+    Sessions live in the memory of the worker that created them, so they need a single
+    worker (or the sharding router, which sends them all to one worker).
+    """
+    with model_manager.use(payload.method):
+        try:
+            session = session_store.create(payload.method, payload.weighting)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    return session.info()
+
+@app.post("/summarize-text/sessions/{session_id}/text", response_model=SessionInfo, tags=["Summarization"],
+          dependencies=[Depends(require_sessions)])
+def api_append_session_text(session_id: str, payload: SessionTextInput):
+    """Appends text to the session's document. Only the new sentences are preprocessed and scored."""
+    session = _get_session(session_id)
+    with model_manager.use(session.method):
+        try:
+            return session.append(payload.text, flush=payload.flush)
+        except SessionFullError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+
+@app.get("/summarize-text/sessions/{session_id}/summary", response_model=SessionSummaryOutput, tags=["Summarization"],
+         dependencies=[Depends(require_sessions)])
+def api_session_summary(session_id: str, num_sentences: int = Query(3, gt=0)):
+    """Returns the current top sentences of the session's document, in document order."""
+    session = _get_session(session_id)
+    with model_manager.use(session.method):
+        summary_text = session.summary(num_sentences)
+    return {
+        "session_id": session_id, "summary": summary_text, "summary_length": len(summary_text),
+        "num_sentences": len(session.sentences), "method": session.method, "weighting": session.weighting
+    }
+
+@app.delete("/summarize-text/sessions/{session_id}", status_code=204, tags=["Summarization"],
+            dependencies=[Depends(require_sessions)])
+def api_close_session(session_id: str):
+    try:
+        session_store.close(session_id)
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(status_code=204)
+
+## Phrase Chunking ##
+
+PHRASE_FIELDS = ("text", "label", "start_char", "end_char")
+
+def _chunk_phrase_columns(texts: List[str], grammar: Optional[str], tagger: str,
+                          split_sentences: bool = True) -> Dict[str, List]:
+    """
+    Internal helper that chunks a batch with the requested tagger. Raises a 422 for an invalid grammar.
+    """
+    try:
+        if tagger == "spacy":
+            with model_manager.use("ner"):
+                docs = parse_texts(texts)
+            with model_manager.use("phrase_chunker"):
+                return chunk_docs_batch(docs, grammar)
+        with model_manager.use("phrase_chunker"):
+            return chunk_phrases_batch(texts, grammar, split_sentences)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.post("/chunk-phrases", response_model=Union[PhraseChunkOutput, PhraseChunkColumnarOutput], tags=["Phrase Chunking"])
+def api_chunk_phrases(payload: PhraseChunkInput):
+    """
+    Finds the phrases (NP, VP, ADJP, ADVP by default) of every text, with character offsets.
+    All sentences of the request are tagged in one call and matched in one scan.
+    """
+    if len(payload.texts) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A request may contain at most {BATCH_MAX_ITEMS} texts.")
+    columns = _chunk_phrase_columns(payload.texts, payload.grammar, payload.tagger, payload.split_sentences)
+    results = ListColumn(columns.pop("offsets"), columns).to_rows()
+    return _fast_response({"results": [_records_or_columns(rows, PHRASE_FIELDS, payload.format) for rows in results]})
+
+## Similarity Search ##
+
+def require_similarity_index():
+    if not SIMILARITY_ENABLED:
+        raise HTTPException(
+            status_code=503, detail="The similarity index is disabled in this process; it needs a single writer process."
+        )
+
+def _similarity_doc_ids(documents: List[SimilarityDocument]) -> Optional[List[str]]:
+    doc_ids = [document.id for document in documents]
+    if all(doc_id is None for doc_id in doc_ids):
+        return None
+    if any(doc_id is None for doc_id in doc_ids):
+        raise HTTPException(status_code=422, detail="Give an id for every document or for none.")
+    return doc_ids
+
+@app.post("/similarity/documents", response_model=SimilarityAddOutput, tags=["Similarity Search"],
+          dependencies=[Depends(require_similarity_index)])
+def api_add_similarity_documents(payload: SimilarityDocumentsInput):
+    """Adds documents to the TF-IDF index. They are searchable at once."""
+    texts = [document.text for document in payload.documents]
+    doc_ids = _similarity_doc_ids(payload.documents)
+    with model_manager.use("similarity"):
+        try:
+            added = add_to_similarity_index(texts, doc_ids, flush=payload.flush)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        num_documents = get_similarity_index_stats()["num_documents"]
+    return {"doc_ids": added, "num_documents": num_documents}
+
+@app.put("/similarity/index", response_model=SimilarityIndexStats, tags=["Similarity Search"],
+         dependencies=[Depends(require_admin), Depends(require_similarity_index)])
+def api_build_similarity_index(payload: SimilarityDocumentsInput):
+    """Replaces the whole index with the given documents."""
+    doc_ids = _similarity_doc_ids(payload.documents)
+    with model_manager.use("similarity"):
+        try:
+            return build_similarity_index([document.text for document in payload.documents], doc_ids)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+@app.get("/similarity/index", response_model=SimilarityIndexStats, tags=["Similarity Search"],
+         dependencies=[Depends(require_similarity_index)])
+def api_similarity_index_stats():
+    with model_manager.use("similarity"):
+        return get_similarity_index_stats()
+
+@app.post("/similarity/index/compact", response_model=SimilarityIndexStats, tags=["Similarity Search"],
+          dependencies=[Depends(require_admin), Depends(require_similarity_index)])
+def api_compact_similarity_index():
+    """Merges all segments into one and recomputes the weights with the current IDF values."""
+    with model_manager.use("similarity"):
+        return compact_similarity_index()
+
+@app.post("/similarity/search", response_model=SimilarityOutput, tags=["Similarity Search"],
+          dependencies=[Depends(require_similarity_index)])
+def api_similarity_search(payload: SimilarityQueryInput):
+    """Returns the k indexed documents most similar to the query (cosine similarity of TF-IDF vectors)."""
+    with model_manager.use("similarity"):
+        return _fast_response({"results": search_similar(payload.query, payload.k)})
+
+@app.post("/similarity/search/batch", response_model=SimilarityBatchOutput, tags=["Similarity Search"],
+          dependencies=[Depends(require_similarity_index)])
+def api_similarity_search_batch(payload: SimilarityBatchQueryInput):
+    """Answers many similarity queries in one call (faster than one request per query)."""
+    if len(payload.queries) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A batch may contain at most {BATCH_MAX_ITEMS} queries.")
+    with model_manager.use("similarity"):
+        return _fast_response({"results": search_similar_batch(payload.queries, payload.k)})
+
+## Batch Endpoints ##
+
+BATCH_REQUEST_DOC = {
+    "requestBody": {
+        "required": True,
+        "description": "A batch of inputs as JSON or MessagePack ({\"text\": [...]}) or as an Arrow IPC stream "
+                       "with a 'text' column. The response format follows the Accept header "
+                       "(defaults to the request format).",
+        "content": {
+            media_type: {"schema": {"type": "object", "properties": {"text": {"type": "array", "items": {"type": "string"}}}}}
+            for media_type in FORMAT_MEDIA_TYPES.values()
+        },
+    }
+}
+
+async def _read_batch(request: Request):
+    """
+    Internal helper that negotiates the request and response formats and decodes the inputs.
+    """
+    try:
+        input_format = request_format(request.headers.get("content-type"))
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    try:
+        output_format = response_format(request.headers.get("accept"), default=input_format)
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+    body = await request.body()
+    try:
+        texts = await run_in_threadpool(trace_function(decode_texts, "decode"), body, input_format)
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not decode the {input_format} request body: {e}")
+    if len(texts) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A batch may contain at most {BATCH_MAX_ITEMS} inputs.")
+    return texts, output_format
+
+async def _batch_response(compute, texts: List[str], output_format: str) -> Response:
+    """
+    Internal helper that runs the batch computation in the thread pool and encodes its columns.
+    """
+    def run():
+        with trace_span("compute", num_texts=len(texts)):
+            columns = compute(texts)
+        with trace_span("encode", format=output_format):
+            return encode_columns(columns, output_format)
+    try:
+        content, media_type = await run_in_threadpool(run)
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    increment("batch.items", len(texts))
+    headers = None
+    if output_format == "arrow":
+        # Arrow buffers are binary and gzip poorly; compressing them costs more than sending them.
+        headers = {"Content-Encoding": "identity"}
+    return Response(content=content, media_type=media_type, headers=headers)
+
+def _batch_tokenize(texts: List[str]) -> Dict[str, Any]:
+    tokens = tokenize_texts(texts)
+    token_counts = [len(row) for row in tokens]
+    # Flat tokens plus offsets become an Arrow list column without converting each row.
+    offsets = [0, *accumulate(token_counts)]
+    return {"tokens": ListColumn(offsets, list(chain.from_iterable(tokens))), "token_count": token_counts}
+
+def _batch_sentiment(texts: List[str]) -> Dict[str, Any]:
+    with model_manager.use("sentiment"):
+        return {"predicted_sentiment": predict_sentiment_batch(texts)}
+
+def _batch_entities(texts: List[str]) -> Dict[str, Any]:
+    with model_manager.use("ner"):
+        entities = extract_named_entities_batch(texts)
+    offsets = entities.pop("offsets")
+    return {"entities": ListColumn(offsets, entities)}
+
+def _batch_morphology(texts: List[str]) -> Dict[str, Any]:
+    return analyze_word_columns(texts)
+
+def _batch_phrases(texts: List[str], tagger: str) -> Dict[str, Any]:
+    phrases = _chunk_phrase_columns(texts, None, tagger)
+    offsets = phrases.pop("offsets")
+    return {"phrases": ListColumn(offsets, phrases)}
+
+@app.post("/batch/tokenize-text", tags=["Batch"], openapi_extra=BATCH_REQUEST_DOC)
+async def api_batch_tokenize_text(request: Request):
+    """Tokenizes every text of the batch. Returns 'tokens' (list of strings) and 'token_count' per text."""
+    texts, output_format = await _read_batch(request)
+    return await _batch_response(_batch_tokenize, texts, output_format)
+
+@app.post("/batch/analyze-sentiment", tags=["Batch"], openapi_extra=BATCH_REQUEST_DOC)
+async def api_batch_analyze_sentiment(request: Request):
+    """Predicts the sentiment of every text with one model call. Returns 'predicted_sentiment' per text."""
+    texts, output_format = await _read_batch(request)
+    return await _batch_response(_batch_sentiment, texts, output_format)
+
+@app.post("/batch/extract-entities", tags=["Batch"], openapi_extra=BATCH_REQUEST_DOC)
+async def api_batch_extract_entities(request: Request):
+    """
+    Extracts the named entities of every text. Returns 'entities' per text: a list of
+    structs with text, label, explanation, start_char and end_char.
+    """
+    texts, output_format = await _read_batch(request)
+    return await _batch_response(_batch_entities, texts, output_format)
+
+@app.post("/batch/analyze-morphology", tags=["Batch"], openapi_extra=BATCH_REQUEST_DOC)
+async def api_batch_analyze_morphology(request: Request):
+    """Analyzes every input word. Returns one column per analysis field (see /analyze-morphology)."""
+    texts, output_format = await _read_batch(request)
+    return await _batch_response(_batch_morphology, texts, output_format)
+
+@app.post("/batch/chunk-phrases", tags=["Batch"], openapi_extra=BATCH_REQUEST_DOC)
+async def api_batch_chunk_phrases(request: Request, tagger: Literal["nltk", "spacy"] = "nltk"):
+    """
+    Finds the phrases of every text with the default grammar. Returns 'phrases' per text:
+    a list of structs with text, label, start_char and end_char.
+    """
+    texts, output_format = await _read_batch(request)
+    return await _batch_response(lambda batch: _batch_phrases(batch, tagger), texts, output_format)
+
+@app.get("/metrics", tags=["Monitoring"])
+def api_metrics():
+    return get_metrics_snapshot()
+
+@app.get("/admin/models", tags=["Monitoring"], dependencies=[Depends(require_admin)])
+def api_model_stats():
+    """Reports, for each model, whether it is loaded, its size, last use, reload times and eviction counts."""
+    return model_manager.get_stats()
+
+@app.post("/admin/models/{name}/unload", tags=["Monitoring"], dependencies=[Depends(require_admin)])
+def api_unload_model(name: str):
+    if name not in model_manager.names():
+        raise HTTPException(status_code=404, detail=f"Unknown model '{name}'.")
+    if not model_manager.unload(name):
+        raise HTTPException(status_code=409, detail=f"Model '{name}' is pinned, in use or not loaded.")
+    return model_manager.get_stats()["models"][name]
+
+@app.get("/admin/extractive/idf", tags=["Monitoring"], dependencies=[Depends(require_admin)])
+def api_idf_table_info():
+    """Describes the corpus IDF table of the extractive summarizer."""
+    with model_manager.use("extractive"):
+        info = get_idf_table_info()
+    if info is None:
+        raise HTTPException(status_code=404, detail="No IDF table is configured (set NLU_EXTRACTIVE_IDF_TABLE).")
+    return info
+
+@app.post("/admin/extractive/idf/reload", tags=["Monitoring"], dependencies=[Depends(require_admin)])
+def api_reload_idf_table():
+    """Maps the IDF table file again at once, instead of at the next periodic check."""
+    with model_manager.use("extractive"):
+        info = reload_idf_table()
+    if info is None:
+        raise HTTPException(status_code=404, detail="No IDF table is configured (set NLU_EXTRACTIVE_IDF_TABLE).")
+    return info
+
+@app.get("/admin/abstractive/encoder-cache", tags=["Monitoring"], dependencies=[Depends(require_admin)])
+def api_encoder_cache_info():
+    """Reports the size and hit counts of the abstractive encoder cache and the encoder FLOPs it saved."""
+    info = get_encoder_cache_info()
+    if info is None:
+        raise HTTPException(status_code=404, detail="The abstractive model is not loaded or its encoder cache is disabled.")
+    return info
+
+@app.get("/admin/documents", tags=["Monitoring"], dependencies=[Depends(require_admin)])
+def api_document_store_stats():
+    """Reports the number and total size of the stored documents and those kept in memory."""
+    return document_store.stats()
+
+@app.get("/admin/profile", tags=["Monitoring"], dependencies=[Depends(require_admin)])
+async def api_profile(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS, description="How long to sample live traffic."),
+    interval_ms: float = Query(5.0, ge=1, le=1000, description="Time between two samples."),
+    format: Literal["collapsed", "speedscope"] = Query(
+        "collapsed", description="'collapsed' stacks (flamegraph.pl, inferno) or 'speedscope' JSON."
+    ),
+    include_idle: bool = Query(False, description="Keep samples of threads waiting for work.")
+):
+    """
+    Samples the stacks of all threads of this worker process while it serves traffic and
+    returns them ready for a flame graph. With several workers, each request profiles
+    the worker that receives it.
+    """
+    try:
+        profile = await run_in_threadpool(sample_stacks, seconds, interval_ms / 1000, include_idle)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    increment("profiles")
+    if format == "speedscope":
+        return FastJSONResponse(
+            to_speedscope(profile, name=f"nlu_app pid {os.getpid()}"),
+            headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'}
+        )
+    return PlainTextResponse(to_collapsed_stacks(profile))
+
+## Asynchronous Job API ##
+
+JOB_INPUT_MODELS = {
+    "abstractive": AbstractiveSummarizationInput,
+    "textrank": TextRankSummarizationInput,
+}
+
+register_job_handler("abstractive", lambda payload: _summarize_abstractive(AbstractiveSummarizationInput(**payload)).model_dump())
+register_job_handler("textrank", lambda payload: _summarize_textrank(TextRankSummarizationInput(**payload)).model_dump())
+
+@app.post("/jobs", response_model=JobStatus, status_code=202, tags=["Jobs"])
+def api_submit_job(submission: JobSubmission):
+    # Validate the payload now, so a malformed job fails fast instead of in a worker.
+    try:
+        JOB_INPUT_MODELS[submission.task](**submission.payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    try:
+        return submit_job(submission.task, submission.payload, submission.priority, submission.callback_url)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.get("/jobs/{job_id}", response_model=JobStatus, tags=["Jobs"])
+def api_get_job(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or its result has expired.")
+    return job
+
+@app.get("/jobs/{job_id}/result", response_model=JobResult, tags=["Jobs"])
+def api_get_job_result(job_id: str):
+    job = get_job_result(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or its result has expired.")
+    if job["status"] in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Job is still {job['status']}.")
+    return job
@@ -0,0 +1,8 @@
+from .logic import increment, observe, get_metrics_snapshot
+
+
+__all__ = [
+    "increment",
+    "observe",
+    "get_metrics_snapshot"
+]
@@ -0,0 +1,53 @@
+from typing import Any, Dict
+import threading
+
+# --- Module-Level Variables ---
+# In-process metrics shared by all request handlers. Counters are monotonically
+# increasing numbers; timings keep count, total, min, max and last value in seconds.
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_timings: Dict[str, Dict[str, float]] = {}
+
+def increment(name: str, value: float = 1) -> None:
+    """
+    Adds `value` to the counter called `name`, creating it if needed.
+
+    Args:
+        name (str): The counter name.
+        value (float): The amount to add.
+    """
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def observe(name: str, seconds: float) -> None:
+    """
+    Records one duration for the timing metric called `name`.
+
+    Args:
+        name (str): The timing metric name.
+        seconds (float): The observed duration in seconds.
+    """
+    with _lock:
+        timing = _timings.get(name)
+        if timing is None:
+            _timings[name] = {"count": 1, "total": seconds, "min": seconds, "max": seconds, "last": seconds}
+            return
+        timing["count"] += 1
+        timing["total"] += seconds
+        timing["min"] = min(timing["min"], seconds)
+        timing["max"] = max(timing["max"], seconds)
+        timing["last"] = seconds
+
+def get_metrics_snapshot() -> Dict[str, Any]:
+    """
+    Returns a copy of all counters and timings, with the mean added to every timing.
+
+    Returns:
+        Dict[str, Any]: {"counters": {...}, "timings": {...}}
+    """
+    with _lock:
+        timings = {
+            name: {**timing, "mean": timing["total"] / timing["count"]}
+            for name, timing in _timings.items()
+        }
+        return {"counters": dict(_counters), "timings": timings}
@@ -0,0 +1,7 @@
+from .logic import ModelManager, ManagedModel
+
+
+__all__ = [
+    "ModelManager",
+    "ManagedModel"
+]
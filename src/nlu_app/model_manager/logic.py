@@ -0,0 +1,283 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import threading
+import ctypes
+import time
+import gc
+import os
+
+from ..metrics import increment, observe
+from ..tracing import trace_span
+
+# --- Module-Level Constants ---
+# How often the background monitor looks for idle models, in seconds.
+MONITOR_INTERVAL_SECONDS = 30.0
+
+def _current_rss_bytes() -> int:
+    """
+    Internal helper returning the resident memory of this process (Linux), or 0 if unknown.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def _release_memory():
+    """
+    Internal helper that collects garbage and asks glibc to return freed heap pages
+    to the operating system, so that unloading a model actually lowers the RSS.
+    """
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+class ManagedModel:
+    """Bookkeeping for one model: how to (un)load it, its size and its usage history."""
+    def __init__(self, name: str, loader: Callable[[], Any], unloader: Callable[[], Any], pinned: bool = False):
+        self.name = name
+        self.loader = loader
+        self.unloader = unloader
+        self.pinned = pinned
+        self.loaded = False
+        self.in_use = 0
+        self.last_used: Optional[float] = None
+        self.size_bytes = 0
+        self.load_count = 0
+        self.last_load_time: Optional[float] = None
+        self.total_reload_time = 0.0
+        self.idle_evictions = 0
+        self.budget_evictions = 0
+        self.load_lock = threading.Lock()
+
+    def stats(self) -> Dict[str, Any]:
+        reloads = max(0, self.load_count - 1)
+        return {
+            "loaded": self.loaded,
+            "pinned": self.pinned,
+            "in_use": self.in_use,
+            "last_used": self.last_used,
+            "idle_seconds": round(time.time() - self.last_used, 3) if self.last_used else None,
+            "size_mb": round(self.size_bytes / (1024 * 1024), 1),
+            "load_count": self.load_count,
+            "reload_count": reloads,
+            "last_load_time": self.last_load_time,
+            "mean_reload_time": self.total_reload_time / reloads if reloads else None,
+            "idle_evictions": self.idle_evictions,
+            "budget_evictions": self.budget_evictions,
+        }
+
+class ModelManager:
+    """
+    Keeps track of when each model was last used and how much memory it takes. Models
+    idle for longer than `idle_timeout` are unloaded, and least recently used models are
+    evicted while the loaded models exceed `memory_budget_bytes`. An unloaded model is
+    loaded again the next time it is used. Pinned models are never evicted.
+    """
+    def __init__(self, idle_timeout: Optional[float] = None, memory_budget_bytes: Optional[int] = None):
+        self.idle_timeout = idle_timeout
+        self.memory_budget_bytes = memory_budget_bytes
+        self._models: Dict[str, ManagedModel] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any], unloader: Callable[[], Any], pinned: bool = False):
+        """
+        Registers a model with the functions that load and unload it.
+
+        Args:
+            name (str): The model name used by 'use' and in the statistics.
+            loader (Callable): Loads the model into its module.
+            unloader (Callable): Releases the model.
+            pinned (bool): If True, the model is never evicted.
+        """
+        self._models[name] = ManagedModel(name, loader, unloader, pinned)
+
+    def names(self) -> List[str]:
+        return list(self._models)
+
+    def _get(self, name: str) -> ManagedModel:
+        if name not in self._models:
+            raise KeyError(f"Unknown model '{name}'. Expected one of: {', '.join(self._models)}.")
+        return self._models[name]
+
+    def ensure_loaded(self, name: str):
+        """
+        Loads the model if it is not loaded yet (the lazy path), recording its
+        resident size and, for reloads, how long loading took.
+        """
+        entry = self._get(name)
+        if entry.loaded:
+            return
+        with entry.load_lock:
+            if entry.loaded:
+                return
+            rss_before = _current_rss_bytes()
+            start = time.perf_counter()
+            entry.loader()
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                entry.size_bytes = max(0, _current_rss_bytes() - rss_before)
+                entry.loaded = True
+                entry.load_count += 1
+                entry.last_load_time = elapsed
+                entry.last_used = time.time()
+                if entry.load_count > 1:
+                    entry.total_reload_time += elapsed
+            if entry.load_count > 1:
+                increment(f"models.reloads.{name}")
+                observe(f"models.reload_time.{name}", elapsed)
+        self.enforce_memory_budget(keep=name)
+
+    def load_all(self):
+        """Loads every registered model."""
+        for name in self._models:
+            self.ensure_loaded(name)
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[None]:
+        """
+        Context manager wrapping every use of a model: loads it if needed and keeps it
+        from being evicted until the block ends.
+        """
+        self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def acquire(self, name: str):
+        """Marks the model as in use, loading it first if needed. Pair with 'release'."""
+        entry = self._get(name)
+        with trace_span("model_acquire"):
+            while True:
+                self.ensure_loaded(name)
+                with self._lock:
+                    # The model may have been evicted between loading and marking it in use.
+                    if entry.loaded:
+                        entry.in_use += 1
+                        entry.last_used = time.time()
+                        return
+
+    def release(self, name: str):
+        entry = self._get(name)
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.time()
+
+    def _evict(self, entry: ManagedModel, reason: str) -> bool:
+        """
+        Internal helper that unloads a model unless it is pinned, in use or already unloaded.
+        The load lock is held throughout, so a concurrent reload waits for the unload to finish.
+        """
+        with entry.load_lock:
+            with self._lock:
+                if not entry.loaded or entry.pinned or entry.in_use:
+                    return False
+                entry.loaded = False
+                if reason == "idle":
+                    entry.idle_evictions += 1
+                elif reason == "budget":
+                    entry.budget_evictions += 1
+            entry.unloader()
+            _release_memory()
+        increment(f"models.evictions.{reason}")
+        print(f"Model '{entry.name}' unloaded ({reason}).")
+        return True
+
+    def unload(self, name: str) -> bool:
+        """
+        Unloads a model now unless it is pinned or in use.
+
+        Returns:
+            bool: True if the model was unloaded.
+        """
+        return self._evict(self._get(name), "manual")
+
+    def evict_idle_models(self) -> List[str]:
+        """
+        Unloads the models that have not been used for longer than the idle timeout.
+
+        Returns:
+            List[str]: The names of the unloaded models.
+        """
+        if self.idle_timeout is None:
+            return []
+        now = time.time()
+        with self._lock:
+            idle = [
+                entry for entry in self._models.values()
+                if entry.loaded and entry.last_used is not None and now - entry.last_used > self.idle_timeout
+            ]
+        return [entry.name for entry in idle if self._evict(entry, "idle")]
+
+    def enforce_memory_budget(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Evicts least recently used models until the loaded models fit in the memory budget.
+
+        Args:
+            keep (Optional[str]): A model that must not be evicted (e.g. the one just loaded).
+
+        Returns:
+            List[str]: The names of the evicted models.
+        """
+        if self.memory_budget_bytes is None:
+            return []
+        with self._lock:
+            loaded_bytes = sum(entry.size_bytes for entry in self._models.values() if entry.loaded)
+            candidates = sorted(
+                (entry for entry in self._models.values() if entry.loaded and entry.name != keep),
+                key=lambda entry: entry.last_used or 0.0
+            )
+        evicted = []
+        for entry in candidates:
+            if loaded_bytes <= self.memory_budget_bytes:
+                break
+            if self._evict(entry, "budget"):
+                loaded_bytes -= entry.size_bytes
+                evicted.append(entry.name)
+        return evicted
+
+    def start_monitor(self, interval: float = MONITOR_INTERVAL_SECONDS):
+        """
+        Starts a background thread that unloads idle models. Does nothing without an idle timeout.
+        """
+        if self.idle_timeout is None or self._monitor is not None:
+            return
+        self._stop_event.clear()
+
+        def monitor_loop():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.evict_idle_models()
+                except Exception as e:
+                    print(f"Idle model eviction failed: {e}")
+
+        self._monitor = threading.Thread(target=monitor_loop, name="model-monitor", daemon=True)
+        self._monitor.start()
+
+    def stop_monitor(self):
+        self._stop_event.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=5.0)
+            self._monitor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns the settings and the per-model statistics.
+        """
+        with self._lock:
+            models = {name: entry.stats() for name, entry in self._models.items()}
+        loaded_bytes = sum(
+            entry.size_bytes for entry in self._models.values() if entry.loaded
+        )
+        return {
+            "idle_timeout": self.idle_timeout,
+            "memory_budget_mb": round(self.memory_budget_bytes / (1024 * 1024), 1) if self.memory_budget_bytes else None,
+            "loaded_mb": round(loaded_bytes / (1024 * 1024), 1),
+            "process_rss_mb": round(_current_rss_bytes() / (1024 * 1024), 1),
+            "models": models,
+        }
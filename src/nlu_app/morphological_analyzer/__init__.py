@@ -1,7 +1,9 @@
-from .logic import analyze_morphology, analyze_word_list
+from .logic import analyze_morphology, analyze_word_list, analyze_word_columns, MORPHOLOGY_FIELDS
 
 
 __all__ = [
     "analyze_morphology",
-    "analyze_word_list"
+    "analyze_word_list",
+    "analyze_word_columns",
+    "MORPHOLOGY_FIELDS"
 ]
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 # --- Module-Level Constants ---
 # These are the rules for our simplified analyzer.
@@ -23,22 +23,18 @@ SUFFIXES = {
 SORTED_SUFFIX_KEYS = sorted(SUFFIXES.keys(), key=len, reverse=True)
 
 
-def analyze_morphology(word: str) -> Dict[str, str]:
-    """
-    Performs a simplified morphological analysis on a single word.
+# Field names of an analysis result, in output order.
+MORPHOLOGY_FIELDS = ("original_word", "prefix", "root", "suffix", "suffix_function", "inferred_pos")
+_EMPTY_ANALYSIS = ("", None, "", None, None, "Unknown")
 
-    Args:
-        word (str): The word to analyze.
 
-    Returns:
-        Dict[str, str]: A dictionary containing the analysis results.
+def _analyze(word: str) -> Tuple[Optional[str], ...]:
+    """
+    Internal helper returning the analysis of a word as a tuple ordered like MORPHOLOGY_FIELDS.
     """
     # Handle empty input
     if not word or not word.strip():
-        return {
-            "original_word": "", "prefix": None, "root": "", "suffix": None,
-            "suffix_function": None, "inferred_pos": "Unknown"
-        }
+        return _EMPTY_ANALYSIS
         
     original_word = word
     processed_word = word.lower().strip()
@@ -75,17 +71,19 @@ def analyze_morphology(word: str) -> Dict[str, str]:
         # Basic guess if no suffix is found
         inferred_pos = "Base Form (Noun/Verb/Adjective)"
 
-    # --- Compile Results ---
-    analysis_result = {
-        "original_word": original_word,
-        "prefix": identified_prefix,
-        "root": root,
-        "suffix": identified_suffix,
-        "suffix_function": suffix_function,
-        "inferred_pos": inferred_pos
-    }
-    
-    return analysis_result
+    return (original_word, identified_prefix, root, identified_suffix, suffix_function, inferred_pos)
+
+def analyze_morphology(word: str) -> Dict[str, str]:
+    """
+    Performs a simplified morphological analysis on a single word.
+
+    Args:
+        word (str): The word to analyze.
+
+    Returns:
+        Dict[str, str]: A dictionary containing the analysis results.
+    """
+    return dict(zip(MORPHOLOGY_FIELDS, _analyze(word)))
 
 def analyze_word_list(words: List[str]) -> List[Dict[str, str]]:
     """
@@ -96,3 +94,19 @@ def analyze_word_list(words: List[str]) -> List[Dict[str, str]]:
         List[Dict[str, str]]: A list of analysis result dictionaries.
     """
     return [analyze_morphology(word) for word in words]
+
+def analyze_word_columns(words: List[str]) -> Dict[str, List[Optional[str]]]:
+    """
+    Analyzes a list of words and returns the results column by column, without
+    building a dictionary per word.
+
+    Args:
+        words (List[str]): The list of words to analyze.
+
+    Returns:
+        Dict[str, List[Optional[str]]]: Maps each field of MORPHOLOGY_FIELDS to one value per word.
+    """
+    if not words:
+        return {field: [] for field in MORPHOLOGY_FIELDS}
+    columns = zip(*(_analyze(word) for word in words))
+    return {field: list(values) for field, values in zip(MORPHOLOGY_FIELDS, columns)}
@@ -1,8 +1,18 @@
-from .logic import load_ner_model, extract_named_entities, visualize_entities
+from .logic import (
+    load_ner_model, unload_ner_model, extract_named_entities, extract_named_entities_batch, parse_text, parse_texts,
+    doc_to_bytes, doc_from_bytes, visualize_entities, get_ner_model_version
+)
 
 
 __all__ = [
     "load_ner_model",
+    "unload_ner_model",
     "extract_named_entities",
-    "visualize_entities"
-]
\ No newline at end of file
+    "extract_named_entities_batch",
+    "parse_text",
+    "parse_texts",
+    "doc_to_bytes",
+    "doc_from_bytes",
+    "visualize_entities",
+    "get_ner_model_version"
+]
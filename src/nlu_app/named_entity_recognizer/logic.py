@@ -1,6 +1,9 @@
 from typing import List, Dict, Optional
-from spacy import displacy
-import spacy
+
+from ..tracing import trace_span
+
+# spaCy is imported inside the functions below: importing it takes seconds and
+# should only be paid by processes that actually load the NER model.
 
 # --- Module-Level Variable ---
 # This will hold the loaded spaCy model.
@@ -16,6 +19,7 @@ def load_ner_model(model_name: str = "en_core_web_sm"):
     """
     global nlp_model
     print(f"--- Loading spaCy model '{model_name}' ---")
+    import spacy
     try:
         nlp_model = spacy.load(model_name)
         print("spaCy model loaded successfully.")
@@ -25,7 +29,55 @@ def load_ner_model(model_name: str = "en_core_web_sm"):
         # Re-raise the exception to stop the server from starting incorrectly.
         raise OSError(error_msg)
 
-def extract_named_entities(text: str, labels_to_include: Optional[List[str]] = None) -> List[Dict[str, str]]:
+def unload_ner_model():
+    """
+    Releases the spaCy language model. It can be loaded again with 'load_ner_model'.
+    """
+    global nlp_model
+    nlp_model = None
+    print("spaCy model unloaded.")
+
+def get_ner_model_version() -> str:
+    """
+    Returns the language, name and version of the loaded spaCy model, e.g.
+    'en_core_web_sm-3.7.1', which identifies the Docs it produces.
+    """
+    if nlp_model is None:
+        raise RuntimeError("spaCy model is not loaded. Please run 'load_ner_model' at application startup.")
+    meta = nlp_model.meta
+    return f"{meta.get('lang', '')}_{meta.get('name', '')}-{meta.get('version', '')}"
+
+def parse_text(text: str):
+    """
+    Runs the spaCy pipeline over one text, for callers that keep the Doc and pass it
+    to 'extract_named_entities' or 'visualize_entities' later.
+
+    Args:
+        text (str): The input text.
+
+    Returns:
+        The spaCy Doc.
+    """
+    if nlp_model is None:
+        raise RuntimeError("spaCy model is not loaded. Please run 'load_ner_model' at application startup.")
+
+    with trace_span("ner.nlp", text_length=len(text)):
+        return nlp_model(text)
+
+def doc_to_bytes(doc) -> bytes:
+    """Serializes a spaCy Doc (its annotations, without the shared vocabulary)."""
+    return doc.to_bytes(exclude=["user_data"])
+
+def doc_from_bytes(data: bytes):
+    """Restores a spaCy Doc serialized with 'doc_to_bytes' against the loaded model's vocabulary."""
+    if nlp_model is None:
+        raise RuntimeError("spaCy model is not loaded. Please run 'load_ner_model' at application startup.")
+    from spacy.tokens import Doc
+
+    with trace_span("ner.doc_from_bytes", size=len(data)):
+        return Doc(nlp_model.vocab).from_bytes(data)
+
+def extract_named_entities(text: str, labels_to_include: Optional[List[str]] = None, doc=None) -> List[Dict[str, str]]:
     """
     Processes a text to find and extract named entities.
 
@@ -33,14 +85,15 @@ def extract_named_entities(text: str, labels_to_include: Optional[List[str]] = N
         text (str): The input text to analyze.
         labels_to_include (Optional[List[str]]): A list of entity labels to filter for 
                                                   (e.g., ["PERSON", "ORG"]). If None, all entities are returned.
+        doc: The result of 'parse_text' for this text, if it is already known.
 
     Returns:
         List[Dict[str, str]]: A list of dictionaries, where each dictionary represents a found entity.
     """
-    if nlp_model is None:
-        raise RuntimeError("spaCy model is not loaded. Please run 'load_ner_model' at application startup.")
+    from spacy import explain
 
-    doc = nlp_model(text)
+    if doc is None:
+        doc = parse_text(text)
     entities = []
     
     for ent in doc.ents:
@@ -49,27 +102,82 @@ def extract_named_entities(text: str, labels_to_include: Optional[List[str]] = N
             entity_data = {
                 "text": ent.text,
                 "label": ent.label_,
-                "explanation": spacy.explain(ent.label_)
+                "explanation": explain(ent.label_)
             }
             entities.append(entity_data)
             
     return entities
 
-def visualize_entities(text: str) -> str:
+def extract_named_entities_batch(texts: List[str], batch_size: int = 64) -> Dict[str, List]:
+    """
+    Finds the named entities of many texts with spaCy's batched 'pipe' and returns them
+    column by column: one flat list per entity field, plus offsets telling which
+    entities belong to which text (entities of text i are offsets[i]:offsets[i + 1]).
+
+    Args:
+        texts (List[str]): The input texts.
+        batch_size (int): Number of texts spaCy processes together.
+
+    Returns:
+        Dict[str, List]: "offsets", "text", "label", "explanation", "start_char" and "end_char".
+    """
+    if nlp_model is None:
+        raise RuntimeError("spaCy model is not loaded. Please run 'load_ner_model' at application startup.")
+
+    from spacy import explain
+
+    offsets = [0]
+    columns = {"text": [], "label": [], "explanation": [], "start_char": [], "end_char": []}
+    explanations = {}
+    with trace_span("ner.pipe", num_texts=len(texts)):
+        for doc in nlp_model.pipe(texts, batch_size=batch_size):
+            for ent in doc.ents:
+                label = ent.label_
+                if label not in explanations:
+                    explanations[label] = explain(label)
+                columns["text"].append(ent.text)
+                columns["label"].append(label)
+                columns["explanation"].append(explanations[label])
+                columns["start_char"].append(ent.start_char)
+                columns["end_char"].append(ent.end_char)
+            offsets.append(len(columns["text"]))
+    return {"offsets": offsets, **columns}
+
+def parse_texts(texts: List[str], batch_size: int = 64) -> List:
+    """
+    Runs the spaCy pipeline over many texts with 'pipe', for callers that reuse its
+    annotations (tags, sentences) instead of computing them again.
+
+    Args:
+        texts (List[str]): The input texts.
+        batch_size (int): Number of texts spaCy processes together.
+
+    Returns:
+        List: One spaCy Doc per text.
+    """
+    if nlp_model is None:
+        raise RuntimeError("spaCy model is not loaded. Please run 'load_ner_model' at application startup.")
+
+    with trace_span("ner.pipe", num_texts=len(texts)):
+        return list(nlp_model.pipe(texts, batch_size=batch_size))
+
+def visualize_entities(text: str, doc=None) -> str:
     """
     Generates an HTML string with highlighted named entities using displaCy.
 
     Args:
         text (str): The input text to visualize.
+        doc: The result of 'parse_text' for this text, if it is already known.
 
     Returns:
         str: A self-contained HTML string for rendering in a browser.
     """
-    if nlp_model is None:
-        raise RuntimeError("spaCy model is not loaded. Please run 'load_ner_model' at application startup.")
+    from spacy import displacy
 
-    doc = nlp_model(text)
+    if doc is None:
+        doc = parse_text(text)
     
     # The `page=True` argument creates a full HTML document.
-    html = displacy.render(doc, style="ent", page=True)
+    with trace_span("ner.render"):
+        html = displacy.render(doc, style="ent", page=True)
     return html
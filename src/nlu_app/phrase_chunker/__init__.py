@@ -0,0 +1,17 @@
+from .logic import (
+    ChunkGrammar, DEFAULT_GRAMMAR, compile_chunk_grammar, load_phrase_chunker, unload_phrase_chunker,
+    chunk_phrases, chunk_phrases_batch, chunk_docs, chunk_docs_batch
+)
+
+
+__all__ = [
+    "ChunkGrammar",
+    "DEFAULT_GRAMMAR",
+    "compile_chunk_grammar",
+    "load_phrase_chunker",
+    "unload_phrase_chunker",
+    "chunk_phrases",
+    "chunk_phrases_batch",
+    "chunk_docs",
+    "chunk_docs_batch"
+]
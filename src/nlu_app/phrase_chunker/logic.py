@@ -0,0 +1,503 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from bisect import bisect_right
+from functools import lru_cache
+import re
+
+import nltk
+
+from ..tracing import trace_span
+
+# --- Module-Level Constants ---
+# Penn Treebank tags, as produced by NLTK's perceptron tagger and spaCy's English 'tag_'.
+PENN_TREEBANK_TAGS = (
+    "CC", "CD", "DT", "EX", "FW", "IN", "JJ", "JJR", "JJS", "LS", "MD", "NN", "NNS", "NNP", "NNPS", "PDT",
+    "POS", "PRP", "PRP$", "RB", "RBR", "RBS", "RP", "SYM", "TO", "UH", "VB", "VBD", "VBG", "VBN", "VBP",
+    "VBZ", "WDT", "WP", "WP$", "WRB", "$", "#", "``", "''", "(", ")", ",", ".", ":", "-LRB-", "-RRB-",
+    # Tags only spaCy uses.
+    "ADD", "AFX", "HYPH", "NFP", "XX", "_SP",
+)
+
+# Noun, verb, adjective and adverb phrases, in priority order: where several rules match
+# at the same token, the first one wins.
+DEFAULT_GRAMMAR = r"""
+NP: {<DT|PDT|PRP\$|POS>*<CD>*<JJ.*|VBN|VBG>*<NN.*>+}
+NP: {<PRP|EX|WP>}
+VP: {<MD>?<RB.*>*<VB.*>+<RP>?}
+ADJP: {<RB.*>?<JJ.*>+}
+ADVP: {<RB.*>+}
+"""
+
+# Sentences longer than this many tokens are matched in windows of this size (phrases
+# do not cross windows), which bounds the backtracking work of a scan.
+MAX_CHUNK_TOKENS = 256
+# Largest rule after expanding counted repetitions ({m,n}), in '<TAG>' patterns.
+MAX_RULE_TAGS = 256
+MAX_RULE_REPEAT = 16
+
+# Each tag is encoded as one character from the Unicode private use area, so a sentence
+# becomes a short string and a rule becomes an ordinary regular expression over it.
+_TAG_CODE_BASE = 0xE000
+_RULE_PATTERN = re.compile(r"^([A-Za-z_][\w-]*)\s*:\s*\{(.+)\}$")
+_RULE_TOKEN_PATTERN = re.compile(r"<([^<>]+)>|\{(\d*)(?:(,)(\d*))?\}|([()|?*+])")
+
+# --- Module-Level Variables ---
+# These will be initialized once by the load function.
+sentence_splitter = None
+word_tokenizer = None
+default_grammar = None
+
+class _RuleParser:
+    """
+    Internal helper parsing one rule body into a syntax tree whose leaves are tag
+    positions: ("tag", position), ("seq", items), ("alt", branches), ("opt", item),
+    ("star", item) and ("plus", item). Counted repetitions are expanded into copies,
+    e.g. <A>{2,3} into <A><A>(<A>)?. `positions` holds the tag codes of each position.
+    """
+    def __init__(self, body: str, tag_codes, line: str):
+        self.tag_codes = tag_codes
+        self.line = line
+        self.positions: List[frozenset] = []
+        self.tokens = []
+        index = 0
+        while index < len(body):
+            match = _RULE_TOKEN_PATTERN.match(body, index)
+            if match is None:
+                self.fail("only <TAG> patterns and ?*+(){}| operators are allowed")
+            self.tokens.append(match)
+            index = match.end()
+        self.index = 0
+
+    def fail(self, reason: str):
+        raise ValueError(f"Invalid chunk rule '{self.line}': {reason}.")
+
+    def parse(self):
+        node = self._alternation()
+        if self.index < len(self.tokens):
+            self.fail("unbalanced ')'")
+        return node
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.index].group(0) if self.index < len(self.tokens) else None
+
+    def _alternation(self):
+        branches = [self._sequence()]
+        while self._peek() == "|":
+            self.index += 1
+            branches.append(self._sequence())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def _sequence(self):
+        items = []
+        while self._peek() not in (None, "|", ")"):
+            items.append(self._quantified(self._atom()))
+        if not items:
+            self.fail("empty pattern")
+        return items[0] if len(items) == 1 else ("seq", items)
+
+    def _atom(self):
+        match = self.tokens[self.index]
+        self.index += 1
+        if match.group(1) is not None:
+            return self._tag(self.tag_codes(match.group(1)))
+        if match.group(0) != "(":
+            self.fail(f"unexpected '{match.group(0)}'")
+        node = self._alternation()
+        if self._peek() != ")":
+            self.fail("missing ')'")
+        self.index += 1
+        return node
+
+    def _tag(self, codes: frozenset):
+        if len(self.positions) >= MAX_RULE_TAGS:
+            self.fail(f"it has more than {MAX_RULE_TAGS} tag patterns (after expanding {{m,n}})")
+        self.positions.append(codes)
+        return ("tag", len(self.positions) - 1)
+
+    def _copy(self, node):
+        if node[0] == "tag":
+            return self._tag(self.positions[node[1]])
+        if node[0] in ("seq", "alt"):
+            return (node[0], [self._copy(child) for child in node[1]])
+        return (node[0], self._copy(node[1]))
+
+    def _repeat(self, kind: str, node):
+        # Backtracking over a repetition nested in another one is exponential, e.g. (<NN>*)*.
+        if _contains_repetition(node):
+            self.fail("a repeated group cannot contain another repetition ('*', '+' or '{m,n}')")
+        if _nullable(node):
+            self.fail("a repeated group must match at least one tag")
+        return (kind, node)
+
+    def _quantified(self, node):
+        match = self.tokens[self.index] if self.index < len(self.tokens) else None
+        if match is None or (match.group(0) not in "?*+" and match.group(2) is None and match.group(3) is None):
+            return node
+        self.index += 1
+        if self._peek() is not None and (self._peek() in ("?", "*", "+") or self._peek().startswith("{")):
+            self.fail("quantifiers cannot be stacked (e.g. '*?' or '+*')")
+        symbol = match.group(0)
+        if symbol == "?":
+            return ("opt", node)
+        if symbol in ("*", "+"):
+            return self._repeat("star" if symbol == "*" else "plus", node)
+
+        low = int(match.group(2)) if match.group(2) else 0
+        high = low if match.group(3) is None else (int(match.group(4)) if match.group(4) else None)
+        if (high is not None and (high < low or high == 0)) or max(low, high or 0) > MAX_RULE_REPEAT:
+            self.fail(f"invalid count {symbol} (at most {MAX_RULE_REPEAT} repetitions)")
+        if high is None:
+            repeated = self._repeat("star", node)
+            if low == 0:
+                return repeated
+            items = [node] + [self._copy(node) for _ in range(low - 1)] + [("star", self._copy(node))]
+        else:
+            items = [node] + [self._copy(node) for _ in range(low - 1)] if low else []
+            optional = None
+            for _ in range(high - low):
+                copy = node if not items and optional is None else self._copy(node)
+                optional = ("opt", copy if optional is None else ("seq", [copy, optional]))
+            if optional is not None:
+                items.append(optional)
+        return items[0] if len(items) == 1 else ("seq", items)
+
+def _contains_repetition(node) -> bool:
+    if node[0] == "tag":
+        return False
+    if node[0] in ("star", "plus"):
+        return True
+    if node[0] == "opt":
+        return _contains_repetition(node[1])
+    return any(_contains_repetition(child) for child in node[1])
+
+def _nullable(node) -> bool:
+    kind = node[0]
+    if kind == "tag":
+        return False
+    if kind in ("opt", "star"):
+        return True
+    if kind == "plus":
+        return _nullable(node[1])
+    if kind == "seq":
+        return all(_nullable(child) for child in node[1])
+    return any(_nullable(child) for child in node[1])
+
+def _glushkov(node, follow: Dict[int, set]) -> Tuple[set, set]:
+    """
+    Internal helper returning the positions that can start and end a match of `node`,
+    and adding to `follow` the positions that can come right after each position.
+    """
+    kind = node[0]
+    if kind == "tag":
+        return {node[1]}, {node[1]}
+    if kind == "alt":
+        first, last = set(), set()
+        for child in node[1]:
+            child_first, child_last = _glushkov(child, follow)
+            first |= child_first
+            last |= child_last
+        return first, last
+    if kind == "seq":
+        first, last, prefix_nullable = set(), set(), True
+        for child in node[1]:
+            child_first, child_last = _glushkov(child, follow)
+            for position in last:
+                follow.setdefault(position, set()).update(child_first)
+            if prefix_nullable:
+                first |= child_first
+            last = child_last | last if _nullable(child) else set(child_last)
+            prefix_nullable = prefix_nullable and _nullable(child)
+        return first, last
+    first, last = _glushkov(node[1], follow)
+    if kind in ("star", "plus"):
+        for position in last:
+            follow.setdefault(position, set()).update(first)
+    return first, last
+
+def _emit(node, positions: List[frozenset], order: Dict[str, int]) -> str:
+    """Internal helper writing a rule's syntax tree as a regular expression over tag codes."""
+    kind = node[0]
+    if kind == "tag":
+        return "[" + "".join(sorted(positions[node[1]], key=order.get)) + "]"
+    if kind == "seq":
+        return "".join(_emit(child, positions, order) for child in node[1])
+    if kind == "alt":
+        return "(?:" + "|".join(_emit(child, positions, order) for child in node[1]) + ")"
+    inner = _emit(node[1], positions, order)
+    if node[1][0] != "tag":
+        # Groups inside a rule must not capture: the capturing group of a match tells its rule.
+        inner = f"(?:{inner})"
+    return inner + {"opt": "?", "star": "*", "plus": "+"}[kind]
+
+class ChunkGrammar:
+    """
+    A chunk grammar compiled into a single regular expression over tag codes.
+
+    Rules use NLTK's RegexpParser notation, one per line: 'LABEL: {<DT>?<JJ.*>*<NN.*>+}'.
+    Each '<...>' is a regular expression over one tag name; it is expanded into a
+    character class of the matching tags of the tagset when the grammar is compiled, so
+    all rules are matched in one scan of Python's (backtracking) 're' instead of a rule
+    cascade. Phrases do not overlap: scanning left to right, the first rule matching at
+    a token wins and its quantifiers are greedy. Tags outside the tagset never match.
+
+    Grammars may come from API callers, so rules are restricted to forms the backtracking
+    matcher handles in time proportional to the sentence length per match attempt: a
+    repeated group cannot contain another repetition or match nothing, and a rule must be
+    deterministic, i.e. each tag can only be matched by one part of the rule at any point
+    ('<NN.*>*<NN>' is rejected; '<NN.*>+' says the same). Sentences are matched in windows
+    of MAX_CHUNK_TOKENS tokens.
+    """
+
+    def __init__(self, grammar: str, tagset: Sequence[str] = PENN_TREEBANK_TAGS):
+        tagset = list(dict.fromkeys(tagset))
+        self.codes = {tag: chr(_TAG_CODE_BASE + i) for i, tag in enumerate(tagset)}
+        # Unknown tags and sentence boundaries get a code outside every character class.
+        self.unknown_code = chr(_TAG_CODE_BASE + len(tagset))
+        self.labels: List[str] = []
+        alternatives = []
+        for line in grammar.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            match = _RULE_PATTERN.match(line)
+            if match is None:
+                raise ValueError(f"Invalid chunk rule '{line}'. Expected 'LABEL: {{<TAG>...}}'.")
+            label, body = match.groups()
+            alternatives.append(f"({self._compile_rule(body, tagset, line)})")
+            self.labels.append(label)
+        if not alternatives:
+            raise ValueError("The chunk grammar contains no rules.")
+        try:
+            self.pattern = re.compile("|".join(alternatives))
+        except re.error as e:
+            raise ValueError(f"Invalid chunk grammar: {e}")
+
+    def _compile_rule(self, body: str, tagset: List[str], line: str) -> str:
+        """
+        Internal helper translating one rule body into a regular expression over tag codes,
+        after checking the restrictions described in the class docstring.
+        """
+        def tag_codes(tag_source: str) -> frozenset:
+            try:
+                tag_pattern = re.compile(tag_source)
+            except re.error as e:
+                raise ValueError(f"Invalid tag pattern <{tag_source}> in '{line}': {e}")
+            codes = frozenset(self.codes[tag] for tag in tagset if tag_pattern.fullmatch(tag))
+            if not codes:
+                raise ValueError(f"Tag pattern <{tag_source}> in '{line}' matches no known tag.")
+            return codes
+
+        parser = _RuleParser(re.sub(r"\s+", "", body), tag_codes, line)
+        tree = parser.parse()
+        if _nullable(tree):
+            parser.fail("it must match at least one tag")
+        follow: Dict[int, set] = {}
+        first, _ = _glushkov(tree, follow)
+        tags = {code: tag for tag, code in self.codes.items()}
+        for candidates in [first] + list(follow.values()):
+            seen = set()
+            for position in sorted(candidates):
+                shared = seen & parser.positions[position]
+                if shared:
+                    parser.fail(f"it is ambiguous: tag {tags[min(shared)]} can be matched by two parts of it at the same point")
+                seen |= parser.positions[position]
+        order = {code: index for index, code in enumerate(self.codes.values())}
+        return _emit(tree, parser.positions, order)
+
+    def encode(self, tags: Iterable[str]) -> str:
+        """Returns the tag codes of one sentence as a string."""
+        codes, unknown = self.codes, self.unknown_code
+        return "".join([codes.get(tag, unknown) for tag in tags])
+
+    def find_chunks(self, tag_sequences: Sequence[Sequence[str]]) -> Iterator[Tuple[int, str, int, int]]:
+        """
+        Finds the phrases of many sentences with a single scan over all of them.
+
+        Args:
+            tag_sequences (Sequence[Sequence[str]]): The POS tags of each sentence.
+
+        Yields:
+            Tuple[int, str, int, int]: The sentence index, label, first token and end token (exclusive).
+        """
+        encoded, windows, window_starts = [], [], []
+        position = 0
+        for sentence, tags in enumerate(tag_sequences):
+            codes = self.encode(tags)
+            for token_start in range(0, len(codes), MAX_CHUNK_TOKENS):
+                encoded.append(codes[token_start:token_start + MAX_CHUNK_TOKENS])
+                windows.append((sentence, token_start))
+                window_starts.append(position)
+                position += len(encoded[-1]) + 1
+        # The separator matches no rule, so phrases never cross sentence (or window) boundaries.
+        labels = self.labels
+        for match in self.pattern.finditer(self.unknown_code.join(encoded)):
+            start, end = match.span()
+            window = bisect_right(window_starts, start) - 1
+            sentence, token_start = windows[window]
+            offset = window_starts[window] - token_start
+            yield sentence, labels[match.lastindex - 1], start - offset, end - offset
+
+@lru_cache(maxsize=32)
+def compile_chunk_grammar(grammar: str) -> ChunkGrammar:
+    """
+    Compiles a chunk grammar once; later calls with the same grammar return the same object.
+
+    Args:
+        grammar (str): The rules, one per line (see ChunkGrammar).
+
+    Returns:
+        ChunkGrammar: The compiled grammar.
+    """
+    return ChunkGrammar(grammar)
+
+def load_phrase_chunker():
+    """
+    Downloads the necessary NLTK resources and initializes the tokenizers and the default grammar.
+    This function should be called once when the application starts.
+    """
+    global sentence_splitter, word_tokenizer, default_grammar
+
+    print("--- Loading Phrase Chunker ---")
+    try:
+        # NLTK 3.9 renamed the resources; the old names are kept for older versions.
+        for resource in ("punkt", "punkt_tab", "averaged_perceptron_tagger", "averaged_perceptron_tagger_eng"):
+            nltk.download(resource, quiet=True)
+    except Exception as e:
+        print(f"Error downloading NLTK data: {e}")
+        raise e
+
+    from nltk.tokenize import NLTKWordTokenizer
+    try:
+        from nltk.tokenize import PunktTokenizer
+        sentence_splitter = PunktTokenizer()
+    except ImportError:
+        sentence_splitter = nltk.data.load("tokenizers/punkt/english.pickle")
+    word_tokenizer = NLTKWordTokenizer()
+    default_grammar = compile_chunk_grammar(DEFAULT_GRAMMAR)
+    print("Phrase chunker initialized.")
+
+def unload_phrase_chunker():
+    """
+    Releases the tokenizers. They can be loaded again with 'load_phrase_chunker'.
+    """
+    global sentence_splitter, word_tokenizer, default_grammar
+    sentence_splitter = word_tokenizer = default_grammar = None
+    print("Phrase chunker unloaded.")
+
+def _grammar(grammar: Optional[str]) -> ChunkGrammar:
+    if default_grammar is None:
+        raise RuntimeError("Phrase chunker is not loaded. Please run 'load_phrase_chunker' at startup.")
+    return default_grammar if grammar is None else compile_chunk_grammar(grammar)
+
+def _collect(texts: Sequence[str], sentence_texts: List[int], spans: List[List[Tuple[int, int]]],
+             tag_sequences: Sequence[Sequence[str]], grammar: ChunkGrammar) -> Dict[str, List]:
+    """
+    Internal helper that matches the grammar and returns the phrases column by column.
+    """
+    columns = {"text": [], "label": [], "start_char": [], "end_char": []}
+    counts = [0] * len(texts)
+    with trace_span("chunker.match", num_sentences=len(tag_sequences)):
+        for sentence, label, start, end in grammar.find_chunks(tag_sequences):
+            text_index = sentence_texts[sentence]
+            start_char, end_char = spans[sentence][start][0], spans[sentence][end - 1][1]
+            columns["text"].append(texts[text_index][start_char:end_char])
+            columns["label"].append(label)
+            columns["start_char"].append(start_char)
+            columns["end_char"].append(end_char)
+            counts[text_index] += 1
+    offsets = [0]
+    for count in counts:
+        offsets.append(offsets[-1] + count)
+    return {"offsets": offsets, **columns}
+
+def chunk_phrases_batch(texts: Sequence[str], grammar: Optional[str] = None,
+                        split_sentences: bool = True) -> Dict[str, List]:
+    """
+    Finds the phrases of many texts. All sentences of the batch are POS-tagged with one
+    'pos_tag_sents' call and matched against the grammar in one scan. The phrases are
+    returned column by column, plus offsets telling which phrases belong to which text
+    (phrases of text i are offsets[i]:offsets[i + 1]).
+
+    Args:
+        texts (Sequence[str]): The input texts.
+        grammar (Optional[str]): Chunk rules (see ChunkGrammar). Defaults to DEFAULT_GRAMMAR.
+        split_sentences (bool): Split the texts into sentences. Disable it when every text is one sentence.
+
+    Returns:
+        Dict[str, List]: "offsets", "text", "label", "start_char" and "end_char" (character offsets in the text).
+    """
+    compiled = _grammar(grammar)
+    if sentence_splitter is None or word_tokenizer is None:
+        raise RuntimeError("Phrase chunker is not loaded. Please run 'load_phrase_chunker' at startup.")
+
+    sentence_texts, spans, tokens = [], [], []
+    with trace_span("chunker.tokenize", num_texts=len(texts)):
+        for text_index, text in enumerate(texts):
+            sentence_spans = sentence_splitter.span_tokenize(text) if split_sentences else [(0, len(text))]
+            for sentence_start, sentence_end in sentence_spans:
+                token_spans = [
+                    (sentence_start + start, sentence_start + end)
+                    for start, end in word_tokenizer.span_tokenize(text[sentence_start:sentence_end])
+                ]
+                if token_spans:
+                    sentence_texts.append(text_index)
+                    spans.append(token_spans)
+                    tokens.append([text[start:end] for start, end in token_spans])
+    with trace_span("chunker.tag", num_sentences=len(tokens)):
+        tagged = nltk.pos_tag_sents(tokens)
+    tag_sequences = [[tag for _, tag in sentence] for sentence in tagged]
+    return _collect(texts, sentence_texts, spans, tag_sequences, compiled)
+
+def chunk_docs_batch(docs: Sequence[Any], grammar: Optional[str] = None) -> Dict[str, List]:
+    """
+    Finds the phrases of spaCy Docs using the tags spaCy already assigned ('token.tag_'),
+    so texts that went through the spaCy pipeline are not tagged again. Sentences come
+    from the Doc if it has sentence boundaries; otherwise a Doc is one sentence.
+
+    Args:
+        docs (Sequence[Any]): spaCy Doc objects with a tagger's annotations.
+        grammar (Optional[str]): Chunk rules (see ChunkGrammar). Defaults to DEFAULT_GRAMMAR.
+
+    Returns:
+        Dict[str, List]: Like 'chunk_phrases_batch'.
+    """
+    compiled = _grammar(grammar)
+    sentence_texts, spans, tag_sequences = [], [], []
+    with trace_span("chunker.tokenize", num_texts=len(docs)):
+        for doc_index, doc in enumerate(docs):
+            sentences = doc.sents if doc.has_annotation("SENT_START") else [doc[:]]
+            for sentence in sentences:
+                if len(sentence):
+                    sentence_texts.append(doc_index)
+                    spans.append([(token.idx, token.idx + len(token)) for token in sentence])
+                    tag_sequences.append([token.tag_ for token in sentence])
+    return _collect([doc.text for doc in docs], sentence_texts, spans, tag_sequences, compiled)
+
+def _records(columns: Dict[str, List]) -> List[List[Dict[str, Any]]]:
+    offsets = columns["offsets"]
+    fields = ("text", "label", "start_char", "end_char")
+    rows = list(zip(*(columns[field] for field in fields)))
+    return [
+        [dict(zip(fields, row)) for row in rows[offsets[i]:offsets[i + 1]]]
+        for i in range(len(offsets) - 1)
+    ]
+
+def chunk_phrases(texts: Sequence[str], grammar: Optional[str] = None,
+                  split_sentences: bool = True) -> List[List[Dict[str, Any]]]:
+    """
+    Finds the noun, verb, adjective and adverb phrases of many texts.
+
+    Args:
+        texts (Sequence[str]): The input texts.
+        grammar (Optional[str]): Chunk rules (see ChunkGrammar). Defaults to DEFAULT_GRAMMAR.
+        split_sentences (bool): Split the texts into sentences. Disable it when every text is one sentence.
+
+    Returns:
+        List[List[Dict[str, Any]]]: For each text, its phrases with text, label, start_char and end_char.
+    """
+    return _records(chunk_phrases_batch(texts, grammar, split_sentences))
+
+def chunk_docs(docs: Sequence[Any], grammar: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Like 'chunk_phrases', but for spaCy Docs whose tags are reused (see 'chunk_docs_batch').
+    """
+    return _records(chunk_docs_batch(docs, grammar))
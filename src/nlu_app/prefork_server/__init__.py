@@ -0,0 +1,14 @@
+from .logic import (
+    run_prefork_server,
+    limit_threads,
+    read_memory_usage,
+    format_memory_report
+)
+
+
+__all__ = [
+    "run_prefork_server",
+    "limit_threads",
+    "read_memory_usage",
+    "format_memory_report"
+]
@@ -0,0 +1,16 @@
+import argparse
+
+from .logic import run_prefork_server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve the NLU API with pre-forked workers that share the loaded models."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind.")
+    parser.add_argument("--workers", type=int, default=2, help="Number of worker processes.")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="Torch/BLAS threads per worker (default: available cores // workers).")
+    parser.add_argument("--log-level", default="info", help="uvicorn log level.")
+    args = parser.parse_args()
+    run_prefork_server(args.host, args.port, args.workers, args.threads_per_worker, args.log_level)
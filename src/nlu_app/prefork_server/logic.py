@@ -0,0 +1,272 @@
+from typing import Dict, Optional
+import signal
+import socket
+import time
+import gc
+import os
+
+# --- Module-Level Constants ---
+# Fields of /proc/<pid>/smaps_rollup, in kB.
+_SHARED_FIELDS = ("Shared_Clean", "Shared_Dirty")
+_PRIVATE_FIELDS = ("Private_Clean", "Private_Dirty")
+# Seconds to wait after forking before the first memory report.
+REPORT_DELAY_SECONDS = 5.0
+# A worker that dies within this many seconds of starting is not respawned.
+MIN_WORKER_UPTIME_SECONDS = 5.0
+# Index of the worker that runs the job queue threads; the others only submit and read jobs.
+JOB_WORKER_INDEX = 0
+
+# --- Module-Level Variables ---
+_workers: Dict[int, int] = {}  # pid -> worker index
+_report_requested = False
+_shutting_down = False
+
+def default_threads_per_worker(num_workers: int) -> int:
+    """
+    Splits the available cores evenly between the workers (at least one thread each).
+    """
+    cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    return max(1, cpu_count // num_workers)
+
+def limit_threads(num_threads: int):
+    """
+    Limits the Torch and BLAS/OpenMP thread pools of the current process, so that
+    workers sharing a machine do not oversubscribe its cores.
+
+    Args:
+        num_threads (int): Threads each library may use.
+    """
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(num_threads)
+    # Hugging Face tokenizers warn (and may deadlock) when their pool is used after a fork.
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    # BLAS pools that were already initialized ignore the environment variables.
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=num_threads)
+    except ImportError:
+        print("threadpoolctl is not installed; BLAS thread pools keep their default size.")
+
+def read_memory_usage(pid: int) -> Optional[Dict[str, int]]:
+    """
+    Reads the memory usage of a process from /proc/<pid>/smaps_rollup (Linux only).
+
+    Args:
+        pid (int): The process id.
+
+    Returns:
+        Optional[Dict[str, int]]: rss, pss, shared and unique memory in kB, or None if unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    fields = {}
+    for line in lines[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(":"):
+            fields[parts[0][:-1]] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": sum(fields.get(name, 0) for name in _SHARED_FIELDS),
+        "unique": sum(fields.get(name, 0) for name in _PRIVATE_FIELDS),
+    }
+
+def format_memory_report(pids: Dict[int, int]) -> str:
+    """
+    Builds a table of unique vs. shared resident memory for the given workers.
+
+    Args:
+        pids (Dict[int, int]): Maps worker pids to worker indices.
+
+    Returns:
+        str: The report.
+    """
+    lines = [f"{'worker':>6} {'pid':>8} {'rss MB':>9} {'shared MB':>10} {'unique MB':>10} {'pss MB':>9}"]
+    total_unique = total_pss = 0
+    for pid, index in sorted(pids.items(), key=lambda item: item[1]):
+        usage = read_memory_usage(pid)
+        if usage is None:
+            lines.append(f"{index:>6} {pid:>8}  (memory usage unavailable)")
+            continue
+        total_unique += usage["unique"]
+        total_pss += usage["pss"]
+        lines.append(
+            f"{index:>6} {pid:>8} {usage['rss'] / 1024:>9.1f} {usage['shared'] / 1024:>10.1f} "
+            f"{usage['unique'] / 1024:>10.1f} {usage['pss'] / 1024:>9.1f}"
+        )
+    master = read_memory_usage(os.getpid())
+    if master is not None:
+        lines.append(f"{'master':>6} {os.getpid():>8} {master['rss'] / 1024:>9.1f} {master['shared'] / 1024:>10.1f} "
+                     f"{master['unique'] / 1024:>10.1f} {master['pss'] / 1024:>9.1f}")
+        total_pss += master["pss"]
+    lines.append(f"Total unique (workers): {total_unique / 1024:.1f} MB, total PSS: {total_pss / 1024:.1f} MB")
+    return "\n".join(lines)
+
+def _run_worker(index: int, sock: socket.socket, app_path: str, threads_per_worker: int, log_level: str):
+    """
+    Internal helper executed in each forked worker: limits its threads and serves the
+    app on the inherited socket. Never returns.
+    """
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+    exit_code = 0
+    try:
+        limit_threads(threads_per_worker)
+        if index != JOB_WORKER_INDEX:
+            # The queue lives in the shared database, so jobs submitted to any worker are
+            # picked up by the job worker's threads; more threads would only load more models.
+            from .. import main
+            main.JOB_WORKERS = 0
+        print(f"Worker {index} (pid {os.getpid()}) serving with {threads_per_worker} thread(s).")
+        config = uvicorn.Config(app_path, log_level=log_level, lifespan="on")
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException as e:
+        print(f"Worker {index} (pid {os.getpid()}) stopped with an error: {e}")
+        exit_code = 1
+    finally:
+        os._exit(exit_code)
+
+def _spawn_worker(index: int, sock: socket.socket, app_path: str, threads_per_worker: int, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        _run_worker(index, sock, app_path, threads_per_worker, log_level)
+    _workers[pid] = index
+    return pid
+
+def _request_report(signum, frame):
+    global _report_requested
+    _report_requested = True
+
+def _request_shutdown(signum, frame):
+    global _shutting_down
+    _shutting_down = True
+
+def run_prefork_server(host: str = "127.0.0.1", port: int = 8000, num_workers: int = 2,
+                       threads_per_worker: Optional[int] = None, log_level: str = "info"):
+    """
+    Serves the API with several worker processes that share the models copy-on-write.
+    The master process loads every model once, freezes its heap so that the garbage
+    collector does not touch (and thereby copy) the shared objects, binds the socket
+    and forks the workers. Only worker JOB_WORKER_INDEX runs job queue threads; the
+    others accept /jobs requests through the shared database. The similarity index is
+    not served, because it needs a single writer process, and neither are summarization
+    sessions, which live in one worker (serve them with the sharding router instead).
+    Send SIGUSR1 to the master for a memory report.
+
+    Args:
+        host (str): Address to bind.
+        port (int): Port to bind.
+        num_workers (int): Number of worker processes.
+        threads_per_worker (Optional[int]): Torch/BLAS threads per worker. Defaults to cores // workers.
+        log_level (str): uvicorn log level of the workers.
+    """
+    global _report_requested
+
+    if not hasattr(os, "fork"):
+        raise RuntimeError("The pre-fork server requires a platform with os.fork (Linux or macOS).")
+    if threads_per_worker is None:
+        threads_per_worker = default_threads_per_worker(num_workers)
+
+    # Limit threads before loading so that no larger pools are created in the master.
+    limit_threads(threads_per_worker)
+
+    from .. import main
+    from ..job_queue import requeue_interrupted_jobs
+
+    print(f"--- Pre-fork Server: loading models once for {num_workers} worker(s) ---")
+    if main.INFERENCE_THREADS is None:
+        main.INFERENCE_THREADS = threads_per_worker
+    if main.SIMILARITY_ENABLED:
+        # Each worker would buffer, flush and merge into the same index directory on its own,
+        # and a request cannot be sent to a chosen worker on the shared socket.
+        print("The similarity index needs a single writer process; its endpoints are disabled in the workers.")
+        main.SIMILARITY_ENABLED = False
+    if main.SESSIONS_ENABLED:
+        # A session lives in one worker, but its follow-up calls would reach any of them.
+        print("Summarization sessions need a single worker; their endpoints are disabled in the workers.")
+        main.SESSIONS_ENABLED = False
+    main.load_all_models()
+    if main.WARMUP_ROUNDS > 0:
+        # Warming up in the master shares the lazily initialized data with every worker.
+        # It runs single-threaded: OpenMP pools started before fork() can hang the children.
+        limit_threads(1)
+        main.warm_up_models()
+    requeue_interrupted_jobs(main.JOB_DB_PATH)
+    main.JOB_REQUEUE_INTERRUPTED = False
+
+    # Move everything allocated so far to a permanent generation the collector ignores;
+    # otherwise each collection would write to the shared pages and copy them.
+    gc.collect()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    app_path = "nlu_app.main:app"
+    started_at = {}
+    for index in range(num_workers):
+        started_at[_spawn_worker(index, sock, app_path, threads_per_worker, log_level)] = time.time()
+    print(f"Serving on http://{host}:{port} with {num_workers} worker(s). Send SIGUSR1 (pid {os.getpid()}) for a memory report.")
+
+    signal.signal(signal.SIGUSR1, _request_report)
+    signal.signal(signal.SIGINT, _request_shutdown)
+    signal.signal(signal.SIGTERM, _request_shutdown)
+
+    report_at = time.time() + REPORT_DELAY_SECONDS
+    try:
+        while not _shutting_down and _workers:
+            if _report_requested or (report_at is not None and time.time() >= report_at):
+                print(format_memory_report(_workers), flush=True)
+                _report_requested = False
+                report_at = None
+
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.5)
+                continue
+
+            index = _workers.pop(pid, None)
+            if index is None or _shutting_down:
+                continue
+            uptime = time.time() - started_at.pop(pid, 0.0)
+            if uptime < MIN_WORKER_UPTIME_SECONDS:
+                print(f"Worker {index} (pid {pid}) exited after {uptime:.1f}s; not respawning it.")
+                continue
+            print(f"Worker {index} (pid {pid}) exited with status {status}; respawning it.")
+            started_at[_spawn_worker(index, sock, app_path, threads_per_worker, log_level)] = time.time()
+    finally:
+        print("--- Pre-fork Server: stopping workers ---")
+        for pid in list(_workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(_workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        _workers.clear()
+        sock.close()
@@ -0,0 +1,16 @@
+from .logic import (
+    sample_stacks, to_collapsed_stacks, to_speedscope, profile_stage, profile_function,
+    StageProfileMiddleware, ProfiledRoute, ProfilerBusyError
+)
+
+
+__all__ = [
+    "sample_stacks",
+    "to_collapsed_stacks",
+    "to_speedscope",
+    "profile_stage",
+    "profile_function",
+    "StageProfileMiddleware",
+    "ProfiledRoute",
+    "ProfilerBusyError"
+]
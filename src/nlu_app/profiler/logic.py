@@ -0,0 +1,282 @@
+from contextvars import ContextVar
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from functools import lru_cache
+from fastapi.routing import APIRoute
+import functools
+import threading
+import inspect
+import time
+import json
+import sys
+import os
+
+# --- Module-Level Constants ---
+DEFAULT_SAMPLE_INTERVAL = 0.005
+# Innermost frames of threads that are waiting for work rather than doing any.
+IDLE_LEAF_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+# Code objects whose frame labels are kept between samples (code created at run time would grow an unbounded cache).
+FRAME_LABEL_CACHE_SIZE = 4096
+
+# --- Module-Level Variables ---
+# Only one sampling profile runs at a time.
+_profile_lock = threading.Lock()
+# Stage timings of the request being profiled with ?profile=1 (None when it is not).
+_request_stages: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_stages", default=None)
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a sampling profile is requested while another one is running."""
+
+def _short_path(filename: str) -> str:
+    """
+    Internal helper shortening a source path to the part that identifies it:
+    'spacy/language.py' for installed packages, 'nlu_app/ner/logic.py' for this app.
+    """
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep, os.sep + "nlu_app" + os.sep):
+        index = filename.rfind(marker)
+        if index != -1:
+            start = index + len(marker)
+            return ("nlu_app" + os.sep if marker.endswith("nlu_app" + os.sep) else "") + filename[start:]
+    return os.path.basename(filename)
+
+@lru_cache(maxsize=FRAME_LABEL_CACHE_SIZE)
+def _frame_label(code) -> Tuple[str, str, int]:
+    return (code.co_name, _short_path(code.co_filename), code.co_firstlineno)
+
+def sample_stacks(duration: float, interval: float = DEFAULT_SAMPLE_INTERVAL,
+                  include_idle: bool = False) -> Dict[str, Any]:
+    """
+    Statistical profiler: every `interval` seconds for `duration` seconds, records the
+    Python stack of every thread of this process (except the sampling thread itself).
+    Nothing runs between profiles, so it costs nothing when it is not in use.
+
+    Args:
+        duration (float): How long to sample, in seconds.
+        interval (float): Time between two samples, in seconds.
+        include_idle (bool): Keep samples of threads waiting for work (thread pool
+                             workers blocked on their queue, the idle event loop, ...).
+
+    Returns:
+        Dict[str, Any]: "stacks" (Counter mapping a root-to-leaf tuple of frames, the
+                        first one being the thread name, to its sample count),
+                        "samples", "interval" and "duration".
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running.")
+    try:
+        own_thread = threading.get_ident()
+        stacks: Counter = Counter()
+        num_samples = 0
+        start = time.perf_counter()
+        next_sample = start
+        while True:
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if not frames or (not include_idle and (frames[0][1].rsplit(os.sep, 1)[-1], frames[0][0]) in IDLE_LEAF_FRAMES):
+                    continue
+                frames.append((thread_names.get(thread_id, f"thread-{thread_id}"), "", 0))
+                stacks[tuple(reversed(frames))] += 1
+            num_samples += 1
+
+            next_sample += interval
+            now = time.perf_counter()
+            if now - start >= duration:
+                break
+            if next_sample > now:
+                time.sleep(next_sample - now)
+            else:
+                # Sampling fell behind; skip the missed samples instead of bursting.
+                next_sample = now
+        return {"stacks": stacks, "samples": num_samples, "interval": interval, "duration": time.perf_counter() - start}
+    finally:
+        _profile_lock.release()
+
+def _frame_text(frame: Tuple[str, str, int]) -> str:
+    name, path, line = frame
+    return f"{name} ({path}:{line})" if path else name
+
+def to_collapsed_stacks(profile: Dict[str, Any]) -> str:
+    """
+    Formats a profile as collapsed stacks ('root;child;leaf count' per line), the input
+    format of flamegraph.pl, inferno and speedscope.
+    """
+    lines = [
+        ";".join(_frame_text(frame).replace(";", ":") for frame in stack) + f" {count}"
+        for stack, count in profile["stacks"].most_common()
+    ]
+    return "\n".join(lines) + "\n"
+
+def to_speedscope(profile: Dict[str, Any], name: str = "nlu_app") -> Dict[str, Any]:
+    """
+    Formats a profile as a speedscope 'sampled' profile (open it at https://www.speedscope.app).
+    Sample weights are in seconds.
+    """
+    frame_indexes: Dict[Tuple[str, str, int], int] = {}
+    frames: List[Dict[str, Any]] = []
+    samples, weights = [], []
+    for stack, count in profile["stacks"].most_common():
+        sample = []
+        for frame in stack:
+            index = frame_indexes.get(frame)
+            if index is None:
+                index = frame_indexes[frame] = len(frames)
+                frame_name, path, line = frame
+                frames.append({"name": frame_name, "file": path, "line": line} if path else {"name": frame_name})
+            sample.append(index)
+        samples.append(sample)
+        weights.append(count * profile["interval"])
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "exporter": "nlu_app.profiler",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled", "name": name, "unit": "seconds",
+            "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights,
+        }],
+    }
+
+class _Stage:
+    __slots__ = ("stages", "name", "start")
+
+    def __init__(self, stages: Dict[str, Any], name: str):
+        self.stages = stages
+        self.name = name
+
+    def __enter__(self):
+        stack = self.stages["stack"]
+        stack.append(self.name)
+        self.name = "/".join(stack)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.stages["stack"].pop()
+        timings = self.stages["timings"]
+        timings[self.name] = timings.get(self.name, 0.0) + elapsed
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+_NO_STAGE = _NoStage()
+
+def profile_stage(name: str):
+    """
+    Context manager timing one stage of the request being profiled with ?profile=1.
+    Nested stages are reported as 'outer/inner'. Outside a profiled request it does
+    nothing beyond one context variable lookup.
+    """
+    stages = _request_stages.get()
+    if stages is None:
+        return _NO_STAGE
+    return _Stage(stages, name)
+
+def profile_function(func: Callable, name: str) -> Callable:
+    """Wraps a function so that each call is timed as the stage `name`."""
+    def wrapper(*args, **kwargs):
+        with profile_stage(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+def _profile_requested(query_string: bytes) -> bool:
+    """
+    Internal helper deciding whether a query string asks for profiling: its 'profile'
+    parameter must be exactly "1" ('noprofile=1' or 'profile=10' do not count).
+    """
+    if b"profile=1" not in query_string:
+        return False
+    return "1" in parse_qs(query_string.decode("latin-1")).get("profile", [])
+
+class StageProfileMiddleware:
+    """
+    ASGI middleware for per-request profiling: a request with '?profile=1' has its stages
+    timed and gets them back as JSON in the 'X-Profile' response header, in milliseconds:
+    {"total": ..., "stages": {"handler": ..., "handler/model_acquire": ..., ...},
+    "unaccounted": ...} (unaccounted is routing, validation and middleware time).
+    Other requests only pay for a substring check of the query string; the query
+    string is parsed only when it mentions profile=1.
+
+    Args:
+        app: The wrapped ASGI application.
+        authorize (Callable[[Dict[str, str]], bool]): Decides from the request headers
+                                                       whether the caller may profile.
+    """
+    def __init__(self, app, authorize: Callable[[Dict[str, str]], bool]):
+        self.app = app
+        self.authorize = authorize
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profile_requested(scope.get("query_string", b"")):
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        if not self.authorize(headers):
+            body = b'{"detail":"Profiling requires a valid admin token."}'
+            await send({"type": "http.response.start", "status": 403,
+                        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        stages = {"stack": [], "timings": {}}
+        token = _request_stages.set(stages)
+        start = time.perf_counter()
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - start
+                timings = stages["timings"]
+                top_level = sum(seconds for name, seconds in timings.items() if "/" not in name)
+                report = {
+                    "total": round(total * 1000, 3),
+                    "stages": {name: round(seconds * 1000, 3) for name, seconds in timings.items()},
+                    "unaccounted": round((total - top_level) * 1000, 3),
+                }
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile", json.dumps(report).encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _request_stages.reset(token)
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    """
+    Internal helper wrapping an endpoint so that its body is timed as the 'handler' stage.
+    The wrapper keeps the endpoint's signature, so FastAPI sees the same parameters.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kwargs):
+            with profile_stage("handler"):
+                return await endpoint(*args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def timed_endpoint(*args, **kwargs):
+            with profile_stage("handler"):
+                return endpoint(*args, **kwargs)
+    return timed_endpoint
+
+class ProfiledRoute(APIRoute):
+    """Route class timing each endpoint call as the 'handler' stage of ?profile=1 requests."""
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
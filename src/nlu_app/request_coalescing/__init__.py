@@ -0,0 +1,7 @@
+from .logic import Singleflight, make_request_key
+
+
+__all__ = [
+    "Singleflight",
+    "make_request_key"
+]
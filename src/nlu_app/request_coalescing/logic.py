@@ -0,0 +1,105 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import threading
+import hashlib
+
+from ..metrics import increment
+from ..tracing import trace_span
+
+def make_request_key(endpoint: str, text: str, params: Dict[str, Any]) -> Tuple:
+    """
+    Builds the coalescing key of a request from its endpoint, a hash of its input
+    text and its remaining parameters.
+
+    Args:
+        endpoint (str): The endpoint name.
+        text (str): The input text.
+        params (Dict[str, Any]): Other parameters that change the result.
+
+    Returns:
+        Tuple: A hashable key.
+    """
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return (endpoint, text_hash, tuple(sorted(params.items())))
+
+class Singleflight:
+    """
+    Coalesces identical in-flight computations: the first caller for a key (the
+    leader) runs the computation, and callers arriving with the same key while it
+    runs (followers) wait for the leader's result instead of starting their own.
+
+    A follower that times out or is abandoned only stops waiting; the leader's
+    computation always runs to completion.
+
+    Followers block their thread while they wait, so at most `max_waiters` of them
+    wait at once (over all keys); the ones beyond that run the computation themselves,
+    as they would without coalescing, instead of holding more worker threads idle.
+    """
+    def __init__(self, metric_name: str = "coalesced_requests", max_waiters: Optional[int] = None):
+        self.metric_name = metric_name
+        self.max_waiters = max_waiters
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._waiting = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any], timeout: Optional[float] = None, label: Optional[str] = None) -> Any:
+        """
+        Runs `func` for the key, or waits for the identical computation already running.
+
+        Args:
+            key (Hashable): Identifies identical computations.
+            func (Callable[[], Any]): The computation.
+            timeout (Optional[float]): Maximum seconds a follower waits for the leader.
+                                       Raises concurrent.futures.TimeoutError when exceeded.
+            label (Optional[str]): If given, coalesced calls are also counted per label.
+
+        Returns:
+            Any: The result of the computation (or re-raises its exception).
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+            elif self.max_waiters is not None and self._waiting >= self.max_waiters:
+                future = None
+            else:
+                self._waiting += 1
+
+        if future is None:
+            increment(f"{self.metric_name}.overflow")
+            return func()
+
+        if not is_leader:
+            increment(self.metric_name)
+            if label:
+                increment(f"{self.metric_name}.{label}")
+            try:
+                with trace_span("coalesced_wait"):
+                    return future.result(timeout=timeout)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def in_flight_count(self) -> int:
+        """Returns the number of computations currently running."""
+        with self._lock:
+            return len(self._in_flight)
+
+    def waiting_count(self) -> int:
+        """Returns the number of followers currently waiting for a leader."""
+        with self._lock:
+            return self._waiting
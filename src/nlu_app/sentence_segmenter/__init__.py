@@ -0,0 +1,14 @@
+from .logic import (
+    load_sentence_segmenter, unload_sentence_segmenter, sentence_spans, split_sentences,
+    clear_sentence_cache, get_segmenter_info
+)
+
+
+__all__ = [
+    "load_sentence_segmenter",
+    "unload_sentence_segmenter",
+    "sentence_spans",
+    "split_sentences",
+    "clear_sentence_cache",
+    "get_segmenter_info"
+]
@@ -0,0 +1,224 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+import threading
+import hashlib
+import nltk
+import re
+
+from ..metrics import increment
+from ..tracing import trace_span
+
+# One sentence segmentation shared by the summarizers: a compiled regular expression
+# finds the sentence boundaries of ordinary English text, and NLTK's punkt model only
+# decides the stretches of text where a period may belong to an abbreviation, an
+# initial or an ellipsis. Results are sentence spans (offsets into the text), cached
+# by a hash of the text, so a document is segmented once for all summarizers.
+
+# --- Module-Level Constants ---
+# Number of segmented texts kept in the cache.
+SEGMENT_CACHE_SIZE = 512
+# Characters looked back from a period for the word it ends.
+MAX_WORD_LENGTH = 64
+# Words that end with a period without ending the sentence, in addition to the
+# abbreviations the punkt model learned (lowercase, without the final period).
+EXTRA_ABBREVIATIONS = {
+    "e.g", "i.e", "al", "etc", "vs", "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st",
+    "inc", "ltd", "co", "corp", "no", "fig", "approx", "u.s", "u.k",
+}
+# A run of sentence-ending punctuation and closing quotes or brackets before whitespace,
+# or a paragraph break (an empty line). The lookahead captures the next non-space
+# character (empty at the end of the text), where the next sentence would start.
+_BOUNDARY_PATTERN = re.compile(r"(?:([.!?…]+)[\"'’”)\]]*(?=\s)|\n\s*\n)(?=\s*(\S?))")
+_WORD_BEFORE_PATTERN = re.compile(r"\S*\Z")
+_OPENING_CHARACTERS = "\"'‘“([-"
+
+# --- Module-Level Variables ---
+# These will be initialized by the load function.
+punkt_tokenizer = None
+abbreviations = None
+
+_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def load_sentence_segmenter():
+    """
+    Downloads the punkt model and initializes the sentence segmenter. It is called
+    by the summarizers' load functions, so it only loads once per process.
+    """
+    global punkt_tokenizer, abbreviations
+    if punkt_tokenizer is not None:
+        return
+
+    print("--- Loading Sentence Segmenter ---")
+    try:
+        # NLTK 3.9 renamed the resource; the old name is kept for older versions.
+        for resource in ("punkt", "punkt_tab"):
+            nltk.download(resource, quiet=True)
+    except Exception as e:
+        print(f"Error downloading NLTK data for the sentence segmenter: {e}")
+        raise e
+
+    try:
+        from nltk.tokenize import PunktTokenizer
+        tokenizer = PunktTokenizer()
+    except ImportError:
+        tokenizer = nltk.data.load("tokenizers/punkt/english.pickle")
+    params = getattr(tokenizer, "_params", None)
+    learned = set(params.abbrev_types) if params is not None else set()
+    if params is not None:
+        # Teach punkt the extra abbreviations too, so both paths agree on them.
+        params.abbrev_types.update(EXTRA_ABBREVIATIONS)
+    abbreviations = frozenset(learned | EXTRA_ABBREVIATIONS)
+    punkt_tokenizer = tokenizer
+    print(f"Sentence segmenter initialized ({len(abbreviations)} abbreviations).")
+
+def unload_sentence_segmenter():
+    """
+    Releases the punkt model and clears the cache. It can be loaded again with 'load_sentence_segmenter'.
+    """
+    global punkt_tokenizer, abbreviations
+    punkt_tokenizer = abbreviations = None
+    clear_sentence_cache()
+    print("Sentence segmenter unloaded.")
+
+def clear_sentence_cache():
+    """Drops every cached segmentation."""
+    with _cache_lock:
+        _cache.clear()
+
+def get_segmenter_info() -> Dict[str, Any]:
+    """Returns whether the segmenter is loaded and how full its cache is."""
+    with _cache_lock:
+        cached = len(_cache)
+    return {"loaded": punkt_tokenizer is not None, "cached_texts": cached, "cache_size": SEGMENT_CACHE_SIZE}
+
+def _is_unambiguous(text: str, match: "re.Match") -> bool:
+    """
+    Internal helper that decides whether a candidate boundary certainly ends a
+    sentence. A period after an abbreviation, an initial or a dotted word, an
+    ellipsis and a boundary not followed by an uppercase letter, a digit or an
+    opening quote are left to punkt.
+    """
+    terminator, next_character = match.group(1, 2)
+    if terminator is None or not next_character:
+        # A paragraph break or the end of the text.
+        return True
+    if not (next_character.isupper() or next_character.isdigit() or next_character in _OPENING_CHARACTERS):
+        return False
+    if terminator == ".":
+        position = match.start()
+        word = _WORD_BEFORE_PATTERN.search(text, max(0, position - MAX_WORD_LENGTH), position).group()
+        word = word.lstrip(_OPENING_CHARACTERS).lower()
+        return not (word in abbreviations or "." in word or (len(word) == 1 and word.isalpha()))
+    return terminator.strip("!?") == ""
+
+def _segment(text: str) -> np.ndarray:
+    """
+    Internal helper implementing the segmentation. The unambiguous boundaries cut
+    the text into regions; a region without ambiguous candidates is one sentence,
+    and each run of consecutive regions with ambiguous candidates is split by punkt.
+    """
+    regions: List[tuple] = []
+    start = len(text) - len(text.lstrip())
+    ambiguous = False
+    for match in _BOUNDARY_PATTERN.finditer(text):
+        following = match.start(2)
+        if following <= start:
+            continue
+        if not _is_unambiguous(text, match):
+            ambiguous = True
+            continue
+        end = match.end()
+        if match.group(1) is None:
+            # A paragraph break: the sentence ends before the whitespace of the line break.
+            end = match.start()
+            while end > start and text[end - 1].isspace():
+                end -= 1
+        if end > start:
+            regions.append((start, end, ambiguous))
+        start = following if match.group(2) else len(text)
+        ambiguous = False
+    end = len(text.rstrip())
+    if end > start:
+        regions.append((start, end, ambiguous))
+
+    spans: List[int] = []
+    punkt_runs = 0
+    index = 0
+    while index < len(regions):
+        start, end, ambiguous = regions[index]
+        index += 1
+        if not ambiguous:
+            spans.extend((start, end))
+            continue
+        while index < len(regions) and regions[index][2]:
+            end = regions[index][1]
+            index += 1
+        # Punkt looks at the token after a period to decide on it, so it also gets the
+        # next sentence; a span running past the run is cut at its end.
+        context_end = regions[index][1] if index < len(regions) else end
+        for sentence_start, sentence_end in punkt_tokenizer.span_tokenize(text[start:context_end]):
+            if start + sentence_start >= end:
+                break
+            spans.extend((start + sentence_start, min(start + sentence_end, end)))
+        punkt_runs += 1
+
+    if punkt_runs:
+        increment("sentence_segmenter.punkt_runs", punkt_runs)
+    return np.array(spans, dtype=np.int64).reshape(-1, 2)
+
+def sentence_spans(text: str, cache: bool = True) -> np.ndarray:
+    """
+    Splits a text into sentences and returns their offsets.
+
+    Args:
+        text (str): The input text.
+        cache (bool): Look the text up in (and add it to) the segmentation cache. Pass
+                      False for texts that are unlikely to be segmented again.
+
+    Returns:
+        np.ndarray: A read-only (num_sentences, 2) array of [start, end) character
+                    offsets; text[start:end] is a sentence without surrounding whitespace.
+    """
+    if punkt_tokenizer is None:
+        raise RuntimeError("Sentence segmenter is not loaded. Please run 'load_sentence_segmenter' at startup.")
+
+    key = None
+    if cache:
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with _cache_lock:
+            spans = _cache.get(key)
+            if spans is not None:
+                _cache.move_to_end(key)
+        if spans is not None:
+            increment("sentence_segmenter.cache_hits")
+            return spans
+        increment("sentence_segmenter.cache_misses")
+
+    with trace_span("sentence_segmenter.segment", text_length=len(text)):
+        spans = _segment(text)
+    spans.flags.writeable = False
+
+    if key is not None:
+        with _cache_lock:
+            _cache[key] = spans
+            while len(_cache) > SEGMENT_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return spans
+
+def split_sentences(text: str, cache: bool = True, spans: Optional[np.ndarray] = None) -> List[str]:
+    """
+    Splits a text into sentences.
+
+    Args:
+        text (str): The input text.
+        cache (bool): Use the segmentation cache (see 'sentence_spans').
+        spans (Optional[np.ndarray]): The result of 'sentence_spans' for this text, if it is already known.
+
+    Returns:
+        List[str]: The sentences in document order.
+    """
+    if spans is None:
+        spans = sentence_spans(text, cache)
+    return [text[start:end] for start, end in spans.tolist()]
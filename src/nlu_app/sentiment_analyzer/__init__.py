@@ -1,7 +1,10 @@
-from .logic import load_sentiment_model, predict_sentiment
+from .logic import load_sentiment_model, unload_sentiment_model, predict_sentiment, predict_sentiment_batch, preprocess_review
 
 
 __all__ = [
     "load_sentiment_model",
-    "predict_sentiment"
-]
\ No newline at end of file
+    "unload_sentiment_model",
+    "predict_sentiment",
+    "predict_sentiment_batch",
+    "preprocess_review"
+]
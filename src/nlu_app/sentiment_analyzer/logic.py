@@ -1,10 +1,13 @@
 from nltk.stem import WordNetLemmatizer
 from nltk.corpus import stopwords
+from typing import List, Optional
 import joblib
 import nltk
 import re
 import os
 
+from ..tracing import trace_span
+
 # --- Module-Level Variables ---
 # These will be loaded once by the load_sentiment_model function
 model = None
@@ -58,16 +61,36 @@ def load_sentiment_model(model_dir: str = 'saved_model', nltk_data_dir: str = '.
         print(error_msg)
         raise FileNotFoundError(error_msg)
         
-    nltk.data.path.append(nltk_data_dir)
+    # The model is reloaded after each unload; append the path only once.
+    if nltk_data_dir not in nltk.data.path:
+        nltk.data.path.append(nltk_data_dir)
     
     # Initialize lemmatizer and stopwords after setting the path
     lemmatizer = WordNetLemmatizer()
     stop_words = set(stopwords.words('english'))
     print("NLTK resources initialized.")
 
-def predict_sentiment(review_text: str) -> str:
+def unload_sentiment_model():
+    """
+    Releases the sentiment model, vectorizer and NLTK resources.
+    They can be loaded again with 'load_sentiment_model'.
+    """
+    global model, vectorizer, lemmatizer, stop_words
+    model = vectorizer = lemmatizer = stop_words = None
+    print("Sentiment analysis model unloaded.")
+
+def preprocess_review(review_text: str) -> str:
+    """
+    Cleans a review like 'predict_sentiment' does before vectorizing it. The result
+    can be passed back to 'predict_sentiment' for later predictions on the same text.
+    """
+    with trace_span("sentiment.preprocess", text_length=len(review_text)):
+        return _preprocess_text(review_text)
+
+def predict_sentiment(review_text: str, processed_text: Optional[str] = None) -> str:
     """
     Takes a raw review string and predicts its sentiment (Positive/Negative).
+    'processed_text' is the result of 'preprocess_review' for it, if already known.
     """
     global model, vectorizer
 
@@ -79,9 +102,41 @@ def predict_sentiment(review_text: str) -> str:
         return "Cannot predict sentiment for an empty review."
         
     # Preprocess and predict
-    processed_text = _preprocess_text(review_text)
-    vectorized_text = vectorizer.transform([processed_text])
-    prediction = model.predict(vectorized_text)
+    if processed_text is None:
+        processed_text = preprocess_review(review_text)
+    with trace_span("sentiment.vectorize"):
+        vectorized_text = vectorizer.transform([processed_text])
+    with trace_span("sentiment.predict"):
+        prediction = model.predict(vectorized_text)
     
     # Return the result in a consistent format
     return str(prediction[0]).capitalize()
+
+def predict_sentiment_batch(review_texts: List[str]) -> List[str]:
+    """
+    Predicts the sentiment of many reviews with a single vectorizer and model call,
+    which is much cheaper than calling 'predict_sentiment' once per review.
+
+    Args:
+        review_texts (List[str]): The raw review strings.
+
+    Returns:
+        List[str]: One label per review, like 'predict_sentiment'.
+    """
+    if model is None or vectorizer is None:
+        raise RuntimeError("Model is not loaded. Please run 'load_sentiment_model' at application startup.")
+
+    results = ["Cannot predict sentiment for an empty review."] * len(review_texts)
+    non_empty = [i for i, text in enumerate(review_texts) if text.strip()]
+    if not non_empty:
+        return results
+
+    with trace_span("sentiment.preprocess", num_texts=len(non_empty)):
+        processed_texts = [_preprocess_text(review_texts[i]) for i in non_empty]
+    with trace_span("sentiment.vectorize"):
+        vectorized_texts = vectorizer.transform(processed_texts)
+    with trace_span("sentiment.predict"):
+        predictions = model.predict(vectorized_texts)
+    for i, prediction in zip(non_empty, predictions):
+        results[i] = str(prediction).capitalize()
+    return results
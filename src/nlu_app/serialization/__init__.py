@@ -0,0 +1,8 @@
+from .logic import FastJSONResponse, to_columnar, add_response_compression
+
+
+__all__ = [
+    "FastJSONResponse",
+    "to_columnar",
+    "add_response_compression"
+]
@@ -0,0 +1,18 @@
+from .logic import (
+    run_sharding_router,
+    create_router_app,
+    parse_worker_counts,
+    ShardingRouter,
+    WorkerProcess,
+    TASK_MODELS
+)
+
+
+__all__ = [
+    "run_sharding_router",
+    "create_router_app",
+    "parse_worker_counts",
+    "ShardingRouter",
+    "WorkerProcess",
+    "TASK_MODELS"
+]
@@ -0,0 +1,19 @@
+import argparse
+
+from .logic import run_sharding_router, TASK_MODELS
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve the NLU API through a router that forwards each request to a worker process of its task."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind.")
+    parser.add_argument("--workers", default=None,
+                        help=f"Workers per task, e.g. 'sentiment=2,ner=0' (default: 1 each). "
+                             f"Tasks: {', '.join(TASK_MODELS)}.")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="Torch/BLAS threads per worker (default: available cores // workers).")
+    parser.add_argument("--app", default="nlu_app.main:app", help="The ASGI app the workers serve.")
+    parser.add_argument("--log-level", default="info", help="uvicorn log level.")
+    args = parser.parse_args()
+    run_sharding_router(args.host, args.port, args.workers, args.threads_per_worker, args.log_level, args.app)
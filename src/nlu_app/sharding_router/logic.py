@@ -0,0 +1,465 @@
+from typing import Any, Dict, List, Optional
+import multiprocessing
+import tempfile
+import hashlib
+import asyncio
+import shutil
+import math
+import time
+import os
+import re
+
+try:
+    import httpx
+except ImportError:
+    raise ImportError("The sharding router requires httpx. Please install it by command 'pip install httpx'.")
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ..prefork_server import limit_threads, read_memory_usage
+from ..prefork_server.logic import default_threads_per_worker
+
+# --- Module-Level Constants ---
+# Models each task's workers load and warm up at startup. A worker still loads any
+# other model on first use, e.g. for the tasks folded into "general".
+TASK_MODELS = {
+    "general": ["word_processing"],
+    "sentiment": ["sentiment"],
+    "ner": ["ner", "phrase_chunker"],
+    "extractive": ["extractive"],
+    "textrank": ["textrank"],
+    "abstractive": ["abstractive"],
+    "sessions": ["extractive", "textrank"],
+    "similarity": ["similarity"],
+}
+# Tasks whose state lives in a single process (open sessions, the index writer).
+SINGLE_WORKER_TASKS = ("sessions", "similarity")
+# Workers of this task run the job queue threads; /jobs requests are routed to them.
+JOB_TASK = "abstractive"
+# Tasks that must stay in one process when they have no workers of their own and fall
+# back to "general": they are all pinned to the first general worker, which also runs
+# the job queue threads if JOB_TASK is one of them.
+PINNED_FALLBACK_TASKS = SINGLE_WORKER_TASKS + (JOB_TASK,)
+# Request paths of each task; the first match wins and other paths go to "general".
+TASK_ROUTES = [
+    (re.compile(r"/summarize-text/sessions(/|$)"), "sessions"),
+    (re.compile(r"/summarize-text/extractive$"), "extractive"),
+    (re.compile(r"/summarize-text/textrank$"), "textrank"),
+    (re.compile(r"/summarize-text/abstractive(/stream)?$"), "abstractive"),
+    (re.compile(r"/jobs(/|$)"), "abstractive"),
+    (re.compile(r"/(batch/)?analyze-sentiment$"), "sentiment"),
+    (re.compile(r"/((batch/)?extract-entities|visualize-entities|(batch/)?chunk-phrases)$"), "ner"),
+    (re.compile(r"/similarity/"), "similarity"),
+]
+# A worker takes a request while its in-flight count stays below this factor times
+# the group average (consistent hashing with bounded loads); otherwise the request
+# goes to the next worker in its hash order.
+LOAD_BALANCE_FACTOR = 1.25
+# Small request bodies naming a stored document are routed by the document id, so that
+# every analysis of one document lands on the worker caching its artifacts.
+DOC_ID_PATTERN = re.compile(rb'"doc_id"\s*:\s*"([0-9a-f]{64})"')
+DOC_ID_SCAN_LIMIT = 4096
+# Hop-by-hop headers are not forwarded.
+HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "te", "upgrade", "proxy-connection", "host"}
+# A worker that dies within this many seconds of starting is not respawned.
+MIN_WORKER_UPTIME_SECONDS = 5.0
+SUPERVISE_INTERVAL_SECONDS = 1.0
+# Seconds the router waits for a starting worker to report ready before serving anyway.
+WORKER_READY_TIMEOUT = 600.0
+
+def parse_worker_counts(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Parses a worker layout like "sentiment=2,abstractive=1,ner=0". Unlisted tasks get one
+    worker; a task with zero workers is served by the "general" workers. Sessions,
+    similarity and /jobs (abstractive) keep state in one process, so with zero workers
+    they are served by the first general worker only, which then runs the job threads.
+
+    Args:
+        spec (Optional[str]): Comma-separated task=count pairs.
+
+    Returns:
+        Dict[str, int]: The number of workers of every task.
+    """
+    counts = {task: 1 for task in TASK_MODELS}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        task, _, count = part.partition("=")
+        task = task.strip()
+        if task not in TASK_MODELS:
+            raise ValueError(f"Unknown task '{task}'. Expected one of: {', '.join(TASK_MODELS)}.")
+        try:
+            counts[task] = int(count)
+        except ValueError:
+            raise ValueError(f"Invalid worker count '{count}' for task '{task}'.")
+        if counts[task] < 0:
+            raise ValueError(f"Invalid worker count '{count}' for task '{task}'.")
+    if counts["general"] < 1:
+        raise ValueError("The 'general' task needs at least one worker.")
+    for task in SINGLE_WORKER_TASKS:
+        if counts[task] > 1:
+            raise ValueError(f"The '{task}' task keeps its state in one process and can only have one worker.")
+    return counts
+
+def _routed_task(path: str) -> Optional[str]:
+    """Internal helper returning the task of a request path in TASK_ROUTES, if any."""
+    for pattern, task in TASK_ROUTES:
+        if pattern.match(path):
+            return task
+    return None
+
+def task_for_path(path: str, counts: Dict[str, int]) -> str:
+    """Returns the task serving a request path (tasks without workers fall back to "general")."""
+    task = _routed_task(path)
+    return task if task is not None and counts.get(task) else "general"
+
+def routing_key(body: bytes) -> bytes:
+    """
+    Returns the content key a request is hashed by: the id of the stored document it
+    names, or else a digest of its body.
+    """
+    if len(body) <= DOC_ID_SCAN_LIMIT:
+        match = DOC_ID_PATTERN.search(body)
+        if match:
+            return match.group(1)
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+def _run_worker(name: str, socket_path: str, app_path: str, environment: Dict[str, str],
+                threads_per_worker: int, log_level: str):
+    """
+    Internal helper executed in each spawned worker process: sets its environment
+    (models, job threads) before the app is imported and serves the app on its
+    Unix socket until it is terminated.
+    """
+    import uvicorn
+
+    os.environ.update(environment)
+    limit_threads(threads_per_worker)
+    print(f"Worker {name} (pid {os.getpid()}) serving on {socket_path} with {threads_per_worker} thread(s).")
+    uvicorn.run(app_path, uds=socket_path, log_level=log_level, lifespan="on")
+
+class WorkerProcess:
+    """
+    One worker process of the router: its process, the HTTP client talking to it over
+    its Unix socket and its load counters.
+    """
+    def __init__(self, task: str, index: int, socket_path: str, environment: Dict[str, str]):
+        self.task = task
+        self.index = index
+        self.name = f"{task}-{index}"
+        self.socket_path = socket_path
+        self.environment = environment
+        self.process = None
+        self.started_at = 0.0
+        self.ready = False
+        self.failed = False
+        self.restarts = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(uds=socket_path), base_url="http://nlu-worker", timeout=None
+        )
+        self._hash_prefix = self.name.encode() + b"\0"
+
+    def start(self, app_path: str, threads_per_worker: int, log_level: str):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.process = multiprocessing.get_context("spawn").Process(
+            target=_run_worker, name=f"nlu-worker-{self.name}",
+            args=(self.name, self.socket_path, app_path, self.environment, threads_per_worker, log_level)
+        )
+        self.process.start()
+        self.started_at = time.time()
+        self.ready = False
+
+    def stop(self, timeout: float = 10.0):
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def score(self, key: bytes) -> bytes:
+        """Rendezvous hash of a content key for this worker; the highest score owns the key."""
+        return hashlib.blake2b(self._hash_prefix + key, digest_size=8).digest()
+
+    def stats(self) -> Dict[str, Any]:
+        memory = read_memory_usage(self.process.pid) if self.alive() else None
+        return {
+            "name": self.name,
+            "task": self.task,
+            "pid": self.process.pid if self.process is not None else None,
+            "alive": self.alive(),
+            "ready": self.ready,
+            "restarts": self.restarts,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean_latency_ms": self.total_time / self.requests * 1000 if self.requests else None,
+            "rss_mb": memory["rss"] / 1024 if memory else None,
+            "pss_mb": memory["pss"] / 1024 if memory else None,
+        }
+
+class ShardingRouter:
+    """
+    Starts the worker processes of every task and picks the worker of each request:
+    requests go to a worker of their task, and requests with the same content go to
+    the same worker (rendezvous hashing), unless it is overloaded compared to the
+    other workers of its task (bounded loads).
+    """
+    def __init__(self, counts: Dict[str, int], socket_dir: str, app_path: str = "nlu_app.main:app",
+                 threads_per_worker: Optional[int] = None, log_level: str = "info"):
+        self.counts = counts
+        self.app_path = app_path
+        self.threads_per_worker = threads_per_worker or default_threads_per_worker(sum(counts.values()))
+        self.log_level = log_level
+        # Tasks without workers whose requests all go to the first general worker.
+        self.pinned_tasks = {task for task in PINNED_FALLBACK_TASKS if not counts[task]}
+        self.workers: Dict[str, List[WorkerProcess]] = {}
+        for task, count in counts.items():
+            self.workers[task] = []
+            for index in range(count):
+                models = list(TASK_MODELS[task])
+                runs_jobs = task == JOB_TASK
+                if task == "general" and index == 0:
+                    for pinned in sorted(self.pinned_tasks):
+                        models += [model for model in TASK_MODELS[pinned] if model not in models]
+                    runs_jobs = JOB_TASK in self.pinned_tasks
+                environment = {
+                    "NLU_WORKER_MODELS": ",".join(models),
+                    # Interrupted jobs are re-queued once by the router, not by each (re)starting worker.
+                    "NLU_JOB_REQUEUE_INTERRUPTED": "0",
+                    "NLU_INFERENCE_THREADS": os.environ.get("NLU_INFERENCE_THREADS", str(self.threads_per_worker)),
+                }
+                if not runs_jobs:
+                    environment["NLU_JOB_WORKERS"] = "0"
+                self.workers[task].append(
+                    WorkerProcess(task, index, os.path.join(socket_dir, f"{task}-{index}.sock"), environment)
+                )
+
+    def all_workers(self) -> List[WorkerProcess]:
+        return [worker for workers in self.workers.values() for worker in workers]
+
+    def start(self):
+        for worker in self.all_workers():
+            worker.start(self.app_path, self.threads_per_worker, self.log_level)
+
+    async def wait_until_ready(self, worker: WorkerProcess, timeout: float = WORKER_READY_TIMEOUT):
+        """Polls the worker's /ready endpoint until it answers 200 (or the worker died)."""
+        deadline = time.time() + timeout
+        while worker.alive() and time.time() < deadline:
+            try:
+                if (await worker.client.get("/ready", timeout=2.0)).status_code == 200:
+                    worker.ready = True
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+
+    async def supervise(self):
+        """Respawns workers that exit, unless they died right after starting (a startup error)."""
+        while True:
+            await asyncio.sleep(SUPERVISE_INTERVAL_SECONDS)
+            for worker in self.all_workers():
+                if worker.alive() or worker.failed:
+                    continue
+                uptime = time.time() - worker.started_at
+                if uptime < MIN_WORKER_UPTIME_SECONDS:
+                    print(f"Worker {worker.name} exited after {uptime:.1f}s; not respawning it.")
+                    worker.failed = True
+                    continue
+                print(f"Worker {worker.name} exited with code {worker.process.exitcode}; respawning it.")
+                worker.restarts += 1
+                worker.start(self.app_path, self.threads_per_worker, self.log_level)
+                asyncio.create_task(self.wait_until_ready(worker))
+
+    def candidates(self, task: str, key: Optional[bytes], path: Optional[str] = None) -> List[WorkerProcess]:
+        """
+        Orders the live workers of a task for a request: by rendezvous hash of its
+        content key, with workers over the load bound moved to the back. Without a key
+        the least loaded worker comes first. Requests of a pinned task (see
+        PINNED_FALLBACK_TASKS) only go to the first general worker.
+        """
+        if path is not None and _routed_task(path) in self.pinned_tasks:
+            return [worker for worker in self.workers["general"][:1] if worker.alive()]
+        workers = [worker for worker in self.workers[task] if worker.alive()]
+        if key is None:
+            return sorted(workers, key=lambda worker: worker.in_flight)
+        workers.sort(key=lambda worker: worker.score(key), reverse=True)
+        total_in_flight = sum(worker.in_flight for worker in workers)
+        bound = math.ceil(LOAD_BALANCE_FACTOR * (total_in_flight + 1) / max(1, len(workers)))
+        return [worker for worker in workers if worker.in_flight < bound] + \
+               [worker for worker in workers if worker.in_flight >= bound]
+
+    def stop(self):
+        for worker in self.all_workers():
+            worker.stop()
+
+def _forwarded_headers(headers) -> List:
+    return [(name, value) for name, value in headers.raw if name.decode("latin-1").lower() not in HOP_HEADERS]
+
+class _RelayResponse(StreamingResponse):
+    """
+    A worker's response streamed to the client. The upstream response is closed and
+    the worker's counters released once sending ends, also when the body was never
+    iterated (the client went away first) and the relay's own cleanup did not run.
+    """
+    def __init__(self, content, status_code: int, on_close):
+        super().__init__(content, status_code=status_code)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.on_close()
+
+def create_router_app(router: ShardingRouter) -> FastAPI:
+    """
+    Builds the front ASGI app: every request is forwarded to a worker picked by the
+    router, except /ready (ready once all workers are) and /router/workers (load and
+    memory per worker). The X-NLU-Worker request header sends a request to one named
+    worker, e.g. for its /metrics or /admin endpoints; responses name their worker in
+    the same header.
+    """
+    app = FastAPI(title="Ultimate NLU API (sharding router)", docs_url=None, redoc_url=None, openapi_url=None)
+    background_tasks = []
+
+    @app.on_event("startup")
+    async def startup_event():
+        print(f"--- Sharding Router: starting {len(router.all_workers())} worker(s) ---")
+        router.start()
+        await asyncio.gather(*(router.wait_until_ready(worker) for worker in router.all_workers()))
+        background_tasks.append(asyncio.create_task(router.supervise()))
+        print("--- Sharding Router: workers started ---")
+        for worker in router.all_workers():
+            print(f"  {worker.name:<16} pid {worker.process.pid:<8} {'ready' if worker.ready else 'NOT READY'}")
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        for task in background_tasks:
+            task.cancel()
+        print("--- Sharding Router: stopping workers ---")
+        router.stop()
+        for worker in router.all_workers():
+            await worker.client.aclose()
+
+    @app.get("/ready")
+    def api_ready():
+        workers = {worker.name: worker.ready and worker.alive() for worker in router.all_workers()}
+        status_code = 200 if all(workers.values()) else 503
+        return JSONResponse(status_code=status_code, content={"status": "ready" if status_code == 200 else "starting",
+                                                              "workers": workers})
+
+    @app.get("/router/workers")
+    def api_worker_stats():
+        return {"workers": [worker.stats() for worker in router.all_workers()]}
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"])
+    async def api_forward(request: Request, path: str):
+        path = "/" + path
+        target = request.headers.get("x-nlu-worker")
+        key = None
+        if target is not None:
+            candidates = [worker for worker in router.all_workers() if worker.name == target and worker.alive()]
+            if not candidates:
+                raise HTTPException(status_code=404, detail=f"No running worker named '{target}'.")
+            content = request.stream()
+        else:
+            task = task_for_path(path, router.counts)
+            if request.method == "POST" and task != "general":
+                # Analysis requests are hashed by content, so the body is read first.
+                content = await request.body()
+                key = routing_key(content)
+            else:
+                content = request.stream()
+            candidates = router.candidates(task, key, path)
+            if not candidates:
+                raise HTTPException(status_code=503, detail=f"No worker of task '{task}' is running.")
+
+        url = httpx.URL(path=path, query=request.url.query.encode("latin-1"))
+        for worker in candidates:
+            worker_request = worker.client.build_request(
+                request.method, url, headers=_forwarded_headers(request.headers), content=content
+            )
+            start = time.perf_counter()
+            worker.in_flight += 1
+            try:
+                response = await worker.client.send(worker_request, stream=True)
+            except httpx.ConnectError:
+                # Not sent: the worker is restarting; a buffered request can go to the next one.
+                worker.in_flight -= 1
+                worker.errors += 1
+                if isinstance(content, bytes):
+                    continue
+                break
+            except BaseException:
+                worker.in_flight -= 1
+                worker.errors += 1
+                raise
+
+            closed = False
+
+            async def close(worker=worker, response=response, start=start):
+                nonlocal closed
+                if closed:
+                    return
+                closed = True
+                await response.aclose()
+                worker.in_flight -= 1
+                worker.requests += 1
+                worker.total_time += time.perf_counter() - start
+                if response.status_code >= 500:
+                    worker.errors += 1
+
+            async def relay(response=response, close=close):
+                # Passes the worker's (possibly compressed) body through as it arrives.
+                try:
+                    async for chunk in response.aiter_raw():
+                        yield chunk
+                finally:
+                    await close()
+
+            streamed = _RelayResponse(relay(), status_code=response.status_code, on_close=close)
+            streamed.raw_headers = _forwarded_headers(response.headers) + [(b"x-nlu-worker", worker.name.encode())]
+            return streamed
+        raise HTTPException(status_code=503, detail="The worker serving this request is unavailable; try again.")
+
+    return app
+
+def run_sharding_router(host: str = "127.0.0.1", port: int = 8000, worker_counts: Optional[str] = None,
+                        threads_per_worker: Optional[int] = None, log_level: str = "info",
+                        app_path: str = "nlu_app.main:app"):
+    """
+    Serves the API with a front router process and per-task worker processes. The
+    router accepts HTTP and forwards each request over a Unix socket to a worker of
+    the request's task; each worker loads only the models of its task, and all
+    workers run in parallel on separate cores.
+
+    Args:
+        host (str): Address to bind.
+        port (int): Port to bind.
+        worker_counts (Optional[str]): Workers per task, e.g. "sentiment=2,ner=0" (see 'parse_worker_counts').
+        threads_per_worker (Optional[int]): Torch/BLAS threads per worker. Defaults to cores // workers.
+        log_level (str): uvicorn log level of the router and the workers.
+        app_path (str): The ASGI app the workers serve.
+    """
+    import uvicorn
+    from ..job_queue import requeue_interrupted_jobs
+
+    counts = parse_worker_counts(worker_counts)
+    requeue_interrupted_jobs(os.environ.get("NLU_JOB_DB", "jobs.sqlite3"))
+    socket_dir = tempfile.mkdtemp(prefix="nlu-router-")
+    router = ShardingRouter(counts, socket_dir, app_path, threads_per_worker, log_level)
+    try:
+        uvicorn.run(create_router_app(router), host=host, port=port, log_level=log_level)
+    finally:
+        router.stop()
+        shutil.rmtree(socket_dir, ignore_errors=True)
@@ -0,0 +1,18 @@
+from .logic import (
+    TfidfIndex, load_similarity_index, unload_similarity_index, build_similarity_index, add_to_similarity_index,
+    search_similar, search_similar_batch, compact_similarity_index, flush_similarity_index, get_similarity_index_stats
+)
+
+
+__all__ = [
+    "TfidfIndex",
+    "load_similarity_index",
+    "unload_similarity_index",
+    "build_similarity_index",
+    "add_to_similarity_index",
+    "search_similar",
+    "search_similar_batch",
+    "compact_similarity_index",
+    "flush_similarity_index",
+    "get_similarity_index_stats"
+]
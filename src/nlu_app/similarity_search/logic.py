@@ -0,0 +1,695 @@
+from scipy.sparse import csr_matrix
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from itertools import chain
+import numpy as np
+import threading
+import shutil
+import json
+import os
+
+from ..tokenizer.logic import tokenize_texts
+from ..metrics import increment
+from ..tracing import trace_span
+
+# --- Module-Level Constants ---
+# Documents added since the last flush are kept in memory until there are this many.
+DEFAULT_FLUSH_THRESHOLD = 10000
+# Tiered merging: once this many segments of the same tier (size class) follow each
+# other at the end of the index, a flush merges them into one segment of the next
+# tier. Each document is rewritten about log_merge_factor(N / flush_threshold) times.
+DEFAULT_MERGE_FACTOR = 8
+# Queries of a batch are multiplied with a segment this many at a time.
+BATCH_QUERY_CHUNK = 256
+MANIFEST_FILE = "manifest.json"
+VOCABULARY_FILE = "vocabulary.json"
+DOCUMENT_FREQUENCY_FILE = "df.npy"
+SEGMENT_ARRAYS = ("offsets", "doc_ids", "term_freqs", "weights", "max_weights")
+
+# --- Module-Level Variable ---
+# This will hold the loaded index.
+similarity_index = None
+
+def _idf(document_frequencies: np.ndarray, num_documents: int) -> np.ndarray:
+    """
+    Internal helper computing smoothed IDF like the TF-IDF demo in 'tests/How_to_TF_IDF.py'
+    (and scikit-learn): log((1 + N) / (1 + df)) + 1.
+    """
+    return (np.log((1.0 + num_documents) / (1.0 + document_frequencies)) + 1.0).astype(np.float32)
+
+def _document_weights(term_ids: np.ndarray, doc_ids: np.ndarray, term_freqs: np.ndarray,
+                      idf: np.ndarray, num_docs: int) -> np.ndarray:
+    """
+    Internal helper computing unit-length TF-IDF document vectors, posting by posting:
+    (1 + log tf) * idf, divided by the norm of the document's vector.
+    """
+    weights = (1.0 + np.log(term_freqs.astype(np.float32))) * idf[term_ids]
+    norms = np.sqrt(np.bincount(doc_ids, weights=weights * weights, minlength=num_docs)).astype(np.float32)
+    return (weights / norms[doc_ids]).astype(np.float32)
+
+class _Segment:
+    """
+    An immutable part of the index: for each term, the sorted ids of the documents
+    containing it (doc_ids[offsets[t]:offsets[t + 1]]) with their term frequencies and
+    TF-IDF weights, and the largest weight of each term (used for early termination).
+    Document ids are local to the segment; global ids are doc_start + local id.
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray], doc_start: int, num_docs: int, name: Optional[str] = None):
+        self.offsets = arrays["offsets"]
+        self.doc_ids = arrays["doc_ids"]
+        self.term_freqs = arrays["term_freqs"]
+        self.weights = arrays["weights"]
+        self.max_weights = arrays["max_weights"]
+        self.doc_start = doc_start
+        self.num_docs = num_docs
+        self.name = name
+        self._matrix = None
+
+    @property
+    def num_terms(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def num_postings(self) -> int:
+        return len(self.doc_ids)
+
+    @classmethod
+    def build(cls, term_ids: np.ndarray, doc_ids: np.ndarray, term_freqs: np.ndarray, num_terms: int,
+              num_docs: int, idf: np.ndarray, doc_start: int) -> "_Segment":
+        """Builds a segment from (term, local document, frequency) triples in any order."""
+        order = np.lexsort((doc_ids, term_ids))
+        term_ids, doc_ids, term_freqs = term_ids[order], doc_ids[order], term_freqs[order]
+        offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=num_terms), out=offsets[1:])
+        weights = _document_weights(term_ids, doc_ids, term_freqs, idf, num_docs)
+        max_weights = np.zeros(num_terms, dtype=np.float32)
+        non_empty = np.flatnonzero(offsets[1:] > offsets[:-1])
+        if len(non_empty):
+            max_weights[non_empty] = np.maximum.reduceat(weights, offsets[non_empty])
+        arrays = {
+            "offsets": offsets, "doc_ids": doc_ids.astype(np.int32),
+            "term_freqs": np.minimum(term_freqs, np.iinfo(np.uint16).max).astype(np.uint16),
+            "weights": weights, "max_weights": max_weights,
+        }
+        return cls(arrays, doc_start, num_docs)
+
+    @classmethod
+    def load(cls, directory: str, doc_start: int, num_docs: int, name: str) -> "_Segment":
+        """Opens a saved segment; its arrays are memory-mapped, not read into memory."""
+        # Plain ndarray views of the memory maps: slicing np.memmap objects is several times slower.
+        arrays = {key: np.asarray(np.load(os.path.join(directory, f"{key}.npy"), mmap_mode="r")) for key in SEGMENT_ARRAYS}
+        return cls(arrays, doc_start, num_docs, name)
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        for key in SEGMENT_ARRAYS:
+            np.save(os.path.join(directory, f"{key}.npy"), getattr(self, key))
+
+    def term_triples(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the postings as (term, global document, frequency) arrays."""
+        term_ids = np.repeat(np.arange(self.num_terms, dtype=np.int64), np.diff(self.offsets))
+        return term_ids, np.asarray(self.doc_ids, dtype=np.int64) + self.doc_start, np.asarray(self.term_freqs)
+
+    def matrix(self) -> csr_matrix:
+        """The postings as a sparse term x document matrix (sharing the arrays) for batch queries."""
+        if self._matrix is None:
+            offsets = self.offsets
+            if self.num_postings < np.iinfo(np.int32).max:
+                # Matching index dtypes keep scipy from copying the (memory-mapped) doc ids.
+                offsets = np.asarray(offsets, dtype=np.int32)
+            self._matrix = csr_matrix((self.weights, self.doc_ids, offsets), shape=(self.num_terms, self.num_docs), copy=False)
+        return self._matrix
+
+    def search(self, term_ids: np.ndarray, query_weights: np.ndarray, k: int, threshold: float) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Term-at-a-time top-k search with score accumulation and max-score early termination.
+
+        Query terms are processed in decreasing order of their largest possible contribution.
+        Once the possible contribution of all remaining terms is below the k-th best score
+        seen so far (`threshold` also carries the k-th best score of segments searched
+        earlier), no unseen document can enter the top k: the remaining terms are only
+        looked up (binary search in their sorted postings) for the current candidates,
+        instead of being scanned in full.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, int]: Global document ids and scores of the best
+                                                (at most k) documents, and the number of
+                                                postings read.
+        """
+        in_segment = term_ids < self.num_terms
+        term_ids, query_weights = term_ids[in_segment], query_weights[in_segment]
+        upper_bounds = query_weights * self.max_weights[term_ids]
+        order = np.argsort(-upper_bounds, kind="stable")
+        order = order[upper_bounds[order] > 0]
+        if not len(order):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), 0
+        # remaining[i] = largest total contribution of the terms order[i:]
+        remaining = np.append(np.cumsum(upper_bounds[order][::-1])[::-1], 0.0)
+
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        seen = np.zeros(self.num_docs, dtype=bool)
+        candidates = np.empty(0, dtype=np.int32)
+        postings_read = 0
+        for position, index in enumerate(order):
+            start, end = int(self.offsets[term_ids[index]]), int(self.offsets[term_ids[index] + 1])
+            if threshold > 0 and remaining[position] < threshold:
+                # Early termination: only the current candidates can still make the top k.
+                candidates = candidates[scores[candidates] + remaining[position] >= threshold]
+                for late_index in order[position:]:
+                    start, end = int(self.offsets[term_ids[late_index]]), int(self.offsets[term_ids[late_index] + 1])
+                    docs = self.doc_ids[start:end]
+                    positions = np.searchsorted(docs, candidates)
+                    found = positions < len(docs)
+                    found[found] = docs[positions[found]] == candidates[found]
+                    scores[candidates[found]] += query_weights[late_index] * self.weights[start + positions[found]]
+                    postings_read += int(found.sum())
+                break
+
+            docs = np.asarray(self.doc_ids[start:end])
+            scores[docs] += query_weights[index] * self.weights[start:end]
+            postings_read += end - start
+            new_docs = docs[~seen[docs]]
+            seen[new_docs] = True
+            candidates = np.concatenate([candidates, new_docs])
+            if len(candidates) >= k and remaining[position + 1] >= threshold:
+                # The k-th best score so far only matters while it can trigger early termination.
+                threshold = max(threshold, float(np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]))
+
+        candidate_scores = scores[candidates]
+        if len(candidates) > k:
+            best = np.argpartition(-candidate_scores, k - 1)[:k]
+            candidates, candidate_scores = candidates[best], candidate_scores[best]
+        return candidates.astype(np.int64) + self.doc_start, candidate_scores, postings_read
+
+class _IndexSnapshot:
+    """
+    What a query reads from the index, taken under its lock. Indexing never changes the
+    referenced objects in a way visible to the snapshot: the vocabulary and document
+    key list only grow (term and document ids beyond the snapshot's counts are ignored),
+    the document frequency array and the segment list are replaced rather than changed,
+    and 'clear' starts new ones. Segments are immutable, and the memory maps of merged
+    or cleared segments stay readable after their files are deleted.
+    """
+    __slots__ = ("vocabulary", "num_terms", "document_frequencies", "doc_keys", "num_documents", "segments")
+
+    def __init__(self, vocabulary: Dict[str, int], num_terms: int, document_frequencies: np.ndarray,
+                 doc_keys: List[str], num_documents: int, segments: List["_Segment"]):
+        self.vocabulary = vocabulary
+        self.num_terms = num_terms
+        self.document_frequencies = document_frequencies
+        self.doc_keys = doc_keys
+        self.num_documents = num_documents
+        self.segments = segments
+
+def _check_doc_ids(texts: Sequence[str], doc_ids: Sequence[str], existing: set):
+    """
+    Internal helper raising ValueError unless there is one id per text and the ids are
+    unique, both among themselves and against the `existing` ids.
+    """
+    if len(doc_ids) != len(texts):
+        raise ValueError("Got a different number of texts and document ids.")
+    if len(set(doc_ids)) != len(doc_ids) or not existing.isdisjoint(doc_ids):
+        raise ValueError("Document ids must be unique within the index.")
+
+class TfidfIndex:
+    """
+    TF-IDF index for cosine-similarity search over a large document collection.
+
+    Postings are stored as a sparse inverted index split into immutable segments whose
+    arrays (.npy files) are memory-mapped, so an index much larger than memory can be
+    queried. New documents are buffered in memory and written as a new segment every
+    `flush_threshold` documents. Segments belong to tiers by size (tier t holds up to
+    flush_threshold * merge_factor^(t + 1) documents); when `merge_factor` segments of
+    the same tier end the index, a flush merges just those, so a merge only rewrites
+    similar-sized small segments and large segments are rewritten rarely. Weights of a
+    segment use the IDF values at the time it was written; 'compact' merges everything
+    into one segment and recomputes all of them with the current IDF.
+
+    Args:
+        directory (Optional[str]): Where the index is stored (None = in memory only).
+        flush_threshold (int): Buffered documents that trigger a flush.
+        merge_factor (int): Number of same-tier segments merged together.
+    """
+    def __init__(self, directory: Optional[str] = None, flush_threshold: int = DEFAULT_FLUSH_THRESHOLD,
+                 merge_factor: int = DEFAULT_MERGE_FACTOR):
+        if merge_factor < 2:
+            raise ValueError("merge_factor must be at least 2.")
+        self.directory = directory
+        self.flush_threshold = flush_threshold
+        self.merge_factor = merge_factor
+        self._lock = threading.RLock()
+        self._reset()
+        if directory and os.path.exists(os.path.join(directory, MANIFEST_FILE)):
+            self._load()
+
+    def _reset(self):
+        self._vocabulary: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._document_frequencies = np.zeros(0, dtype=np.int64)
+        self._doc_keys: List[str] = []
+        self._doc_key_set = set()
+        self._segments: List[_Segment] = []
+        self._next_segment = 1
+        self._buffer: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._buffer_docs = 0
+        self._buffer_segment: Optional[_Segment] = None
+
+    # --- Persistence ---
+
+    def _load(self):
+        with open(os.path.join(self.directory, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(os.path.join(self.directory, VOCABULARY_FILE), encoding="utf-8") as f:
+            self._terms = json.load(f)
+        self._vocabulary = {term: term_id for term_id, term in enumerate(self._terms)}
+        self._document_frequencies = np.load(os.path.join(self.directory, DOCUMENT_FREQUENCY_FILE))
+        self._next_segment = manifest["next_segment"]
+        for entry in manifest["segments"]:
+            segment_dir = os.path.join(self.directory, entry["name"])
+            self._segments.append(_Segment.load(segment_dir, entry["doc_start"], entry["num_docs"], entry["name"]))
+            with open(os.path.join(segment_dir, "doc_keys.json"), encoding="utf-8") as f:
+                self._doc_keys.extend(json.load(f))
+        self._doc_key_set = set(self._doc_keys)
+
+    def _write_json(self, filename: str, content: Any):
+        path = os.path.join(self.directory, filename)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(content, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def _write_manifest(self):
+        """Writes the vocabulary, document frequencies and segment list; the manifest is replaced last."""
+        self._write_json(VOCABULARY_FILE, self._terms)
+        np.save(os.path.join(self.directory, DOCUMENT_FREQUENCY_FILE + ".tmp.npy"), self._document_frequencies)
+        os.replace(os.path.join(self.directory, DOCUMENT_FREQUENCY_FILE + ".tmp.npy"),
+                   os.path.join(self.directory, DOCUMENT_FREQUENCY_FILE))
+        self._write_json(MANIFEST_FILE, {
+            "version": 1,
+            "num_documents": len(self._doc_keys),
+            "next_segment": self._next_segment,
+            "segments": [
+                {"name": segment.name, "doc_start": segment.doc_start, "num_docs": segment.num_docs}
+                for segment in self._segments
+            ],
+        })
+
+    def _store_segment(self, segment: _Segment) -> _Segment:
+        """Saves a new segment (if the index has a directory) and returns it memory-mapped."""
+        if not self.directory:
+            return segment
+        segment.name = f"segment_{self._next_segment:06d}"
+        self._next_segment += 1
+        segment_dir = os.path.join(self.directory, segment.name)
+        segment.save(segment_dir)
+        self._write_json(os.path.join(segment.name, "doc_keys.json"),
+                         self._doc_keys[segment.doc_start:segment.doc_start + segment.num_docs])
+        return _Segment.load(segment_dir, segment.doc_start, segment.num_docs, segment.name)
+
+    # --- Indexing ---
+
+    def add_documents(self, texts: Sequence[str], doc_ids: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Adds documents to the index. They are searchable at once and written to disk
+        with the next flush.
+
+        Args:
+            texts (Sequence[str]): The document texts.
+            doc_ids (Optional[Sequence[str]]): Unique ids of the documents (default: their
+                                               position in the index, as a string).
+
+        Returns:
+            List[str]: The ids of the added documents.
+        """
+        with self._lock:
+            first = len(self._doc_keys)
+            if doc_ids is None:
+                doc_ids = [str(first + i) for i in range(len(texts))]
+            doc_ids = [str(doc_id) for doc_id in doc_ids]
+            _check_doc_ids(texts, doc_ids, self._doc_key_set)
+
+            with trace_span("similarity.tokenize", num_texts=len(texts)):
+                tokens = tokenize_texts(list(texts))
+                lengths = np.fromiter((len(row) for row in tokens), dtype=np.int64, count=len(tokens))
+                flat_tokens = list(chain.from_iterable(tokens))
+                vocabulary = self._vocabulary
+                token_ids = np.fromiter(
+                    (vocabulary.setdefault(token, len(vocabulary)) for token in flat_tokens),
+                    dtype=np.int64, count=len(flat_tokens)
+                )
+            # Terms seen for the first time, in id order, from the position of their first occurrence.
+            is_new = token_ids >= len(self._terms)
+            _, first_positions = np.unique(token_ids[is_new], return_index=True)
+            self._terms.extend(flat_tokens[position] for position in np.flatnonzero(is_new)[first_positions])
+            num_terms = len(vocabulary)
+
+            with trace_span("similarity.count", num_tokens=len(token_ids)):
+                # One (document, term) key per token; unique keys with counts are the term frequencies.
+                doc_indexes = np.repeat(np.arange(self._buffer_docs, self._buffer_docs + len(texts), dtype=np.int64), lengths)
+                keys, term_freqs = np.unique(doc_indexes * num_terms + token_ids, return_counts=True)
+                term_ids, doc_indexes = keys % num_terms, keys // num_terms
+
+            # A new array rather than an in-place update, because snapshots of running queries hold the old one.
+            capacity = len(self._document_frequencies)
+            if num_terms > capacity:
+                capacity = max(num_terms, 2 * capacity)
+            document_frequencies = np.zeros(capacity, dtype=np.int64)
+            document_frequencies[:len(self._document_frequencies)] = self._document_frequencies
+            document_frequencies[:num_terms] += np.bincount(term_ids, minlength=num_terms)
+            self._document_frequencies = document_frequencies
+
+            self._buffer.append((term_ids, doc_indexes, term_freqs))
+            self._buffer_docs += len(texts)
+            self._buffer_segment = None
+            self._doc_keys.extend(doc_ids)
+            self._doc_key_set.update(doc_ids)
+            increment("similarity.documents_added", len(texts))
+
+            if self._buffer_docs >= self.flush_threshold:
+                self.flush()
+            return doc_ids
+
+    def _idf_now(self) -> np.ndarray:
+        return _idf(self._document_frequencies[:len(self._terms)], len(self._doc_keys))
+
+    def _build_buffer_segment(self) -> Optional[_Segment]:
+        if not self._buffer_docs:
+            return None
+        if self._buffer_segment is None:
+            term_ids, doc_ids, term_freqs = (np.concatenate(parts) for parts in zip(*self._buffer))
+            self._buffer_segment = _Segment.build(
+                term_ids, doc_ids, term_freqs, len(self._terms), self._buffer_docs, self._idf_now(),
+                doc_start=len(self._doc_keys) - self._buffer_docs
+            )
+        return self._buffer_segment
+
+    def flush(self):
+        """Writes the buffered documents as a new segment, then merges same-tier segments (see the class)."""
+        with self._lock:
+            segment = self._build_buffer_segment()
+            if segment is not None:
+                with trace_span("similarity.flush", num_docs=segment.num_docs):
+                    self._segments.append(self._store_segment(segment))
+                self._buffer, self._buffer_docs, self._buffer_segment = [], 0, None
+            if not self._merge_tiers() and self.directory:
+                self._write_manifest()
+
+    def _tier(self, segment: _Segment) -> int:
+        tier, limit = 0, max(1, self.flush_threshold) * self.merge_factor
+        while segment.num_docs >= limit:
+            tier, limit = tier + 1, limit * self.merge_factor
+        return tier
+
+    def _merge_tiers(self) -> bool:
+        """
+        Internal helper merging the last `merge_factor` segments while they share a tier;
+        a merge can complete a run of the next tier, which is then merged too. Only
+        adjacent segments are merged, because a segment holds a contiguous range of
+        document ids. Returns whether anything was merged.
+        """
+        merged = False
+        while len(self._segments) >= self.merge_factor:
+            tail = self._segments[-self.merge_factor:]
+            tier = self._tier(tail[-1])
+            if any(self._tier(segment) != tier for segment in tail):
+                break
+            self._merge(len(self._segments) - self.merge_factor, len(self._segments))
+            merged = True
+        return merged
+
+    def _merge(self, start: int, end: int):
+        """
+        Internal helper replacing the segments [start, end) with one segment, recomputing
+        their weights with the current IDF values. Needs memory for their postings only.
+        """
+        segments = self._segments[start:end]
+        doc_start = segments[0].doc_start
+        num_docs = sum(segment.num_docs for segment in segments)
+        with trace_span("similarity.merge", num_segments=len(segments), num_docs=num_docs):
+            term_ids, doc_ids, term_freqs = (
+                np.concatenate(parts) for parts in zip(*(segment.term_triples() for segment in segments))
+            )
+            merged = _Segment.build(
+                term_ids, doc_ids - doc_start, term_freqs.astype(np.int64), len(self._terms), num_docs,
+                self._idf_now(), doc_start=doc_start
+            )
+            old_names = [segment.name for segment in segments if segment.name]
+            self._segments[start:end] = [self._store_segment(merged)]
+            if self.directory:
+                # The manifest points at the merged segment before the old ones are deleted.
+                self._write_manifest()
+                for name in old_names:
+                    shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+        increment("similarity.merges")
+
+    def compact(self):
+        """
+        Merges all segments (and buffered documents) into one, recomputing every weight
+        with the current IDF values. Needs memory for all postings at once, so it is
+        only run on request (POST /similarity/index/compact), never by a flush.
+        """
+        with self._lock:
+            buffered = self._build_buffer_segment()
+            segments = self._segments + ([buffered] if buffered is not None else [])
+            if len(segments) <= 1 and buffered is None and not self._segments_need_reweighting():
+                return
+            with trace_span("similarity.compact", num_segments=len(segments)):
+                term_ids, doc_ids, term_freqs = (
+                    np.concatenate(parts) for parts in zip(*(segment.term_triples() for segment in segments))
+                )
+                merged = _Segment.build(
+                    term_ids, doc_ids, term_freqs.astype(np.int64), len(self._terms), len(self._doc_keys),
+                    self._idf_now(), doc_start=0
+                )
+                old_names = [segment.name for segment in self._segments if segment.name]
+                self._segments = [self._store_segment(merged)]
+                self._buffer, self._buffer_docs, self._buffer_segment = [], 0, None
+                if self.directory:
+                    self._write_manifest()
+                    for name in old_names:
+                        shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+            increment("similarity.compactions")
+
+    def _segments_need_reweighting(self) -> bool:
+        # A single segment still benefits from compaction if documents were added after it was written.
+        return bool(self._segments) and self._segments[0].num_docs != len(self._doc_keys)
+
+    # --- Queries ---
+
+    def _query_vector(self, snapshot: _IndexSnapshot, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Internal helper returning the known terms of a query and their normalized TF-IDF weights."""
+        vocabulary, num_terms = snapshot.vocabulary, snapshot.num_terms
+        token_ids = [
+            term_id for term_id in (vocabulary.get(token) for token in tokenize_texts([text])[0])
+            if term_id is not None and term_id < num_terms
+        ]
+        if not token_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        term_ids, term_freqs = np.unique(np.array(token_ids, dtype=np.int64), return_counts=True)
+        idf = _idf(snapshot.document_frequencies[term_ids], snapshot.num_documents)
+        weights = (1.0 + np.log(term_freqs)).astype(np.float32) * idf
+        return term_ids, weights / np.linalg.norm(weights)
+
+    def _snapshot(self) -> _IndexSnapshot:
+        with self._lock:
+            buffered = self._build_buffer_segment()
+            return _IndexSnapshot(
+                self._vocabulary, len(self._terms), self._document_frequencies, self._doc_keys, len(self._doc_keys),
+                self._segments + ([buffered] if buffered is not None else [])
+            )
+
+    def _results(self, snapshot: _IndexSnapshot, doc_ids: np.ndarray, scores: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        order = np.lexsort((doc_ids, -scores))[:k]
+        return [{"doc_id": snapshot.doc_keys[doc_ids[i]], "score": round(float(scores[i]), 6)} for i in order if scores[i] > 0]
+
+    def search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Finds the k documents most similar (cosine of TF-IDF vectors) to the query.
+
+        Args:
+            query (str): The query text.
+            k (int): Number of results.
+
+        Returns:
+            List[Dict[str, Any]]: {"doc_id", "score"} per result, best first.
+        """
+        snapshot = self._snapshot()
+        term_ids, query_weights = self._query_vector(snapshot, query)
+        if not len(term_ids):
+            return []
+        found_ids, found_scores = [], []
+        threshold, postings_read, postings_total = 0.0, 0, 0
+        with trace_span("similarity.search", num_terms=len(term_ids), k=k):
+            # Large segments first: they usually set a high threshold that prunes the small ones.
+            for segment in sorted(snapshot.segments, key=lambda segment: -segment.num_docs):
+                doc_ids, scores, read = segment.search(term_ids, query_weights, k, threshold)
+                postings_read += read
+                in_segment = term_ids[term_ids < segment.num_terms]
+                postings_total += int((segment.offsets[in_segment + 1] - segment.offsets[in_segment]).sum())
+                found_ids.append(doc_ids)
+                found_scores.append(scores)
+                all_scores = np.concatenate(found_scores)
+                if len(all_scores) >= k:
+                    threshold = float(np.partition(all_scores, len(all_scores) - k)[len(all_scores) - k])
+        increment("similarity.queries")
+        increment("similarity.postings_read", postings_read)
+        increment("similarity.postings_skipped", postings_total - postings_read)
+        return self._results(snapshot, np.concatenate(found_ids), np.concatenate(found_scores), k)
+
+    def search_batch(self, queries: Sequence[str], k: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Answers many queries at once: for each segment, the query vectors are multiplied
+        with the term x document matrix in one sparse product per chunk of queries, which
+        avoids per-query overhead. Results are the same as calling 'search' for each query.
+
+        Args:
+            queries (Sequence[str]): The query texts.
+            k (int): Number of results per query.
+
+        Returns:
+            List[List[Dict[str, Any]]]: The results of each query, like 'search'.
+        """
+        snapshot = self._snapshot()
+        vectors = [self._query_vector(snapshot, query) for query in queries]
+        with trace_span("similarity.search_batch", num_queries=len(queries), k=k):
+            found = self._search_vectors(snapshot.segments, vectors, k)
+        increment("similarity.queries", len(queries))
+        return [
+            self._results(snapshot, np.concatenate([ids for ids, _ in parts]), np.concatenate([s for _, s in parts]), k)
+            if parts else []
+            for parts in found
+        ]
+
+    def _search_vectors(self, segments: List[_Segment], vectors: List[Tuple[np.ndarray, np.ndarray]],
+                        k: int) -> List[List[Tuple[np.ndarray, np.ndarray]]]:
+        """Internal helper returning, per query, the best documents and scores of every segment."""
+        found: List[List[Tuple[np.ndarray, np.ndarray]]] = [[] for _ in vectors]
+        for chunk_start in range(0, len(vectors), BATCH_QUERY_CHUNK):
+            chunk = vectors[chunk_start:chunk_start + BATCH_QUERY_CHUNK]
+            for segment in segments:
+                rows, columns, values = [], [], []
+                for row, (term_ids, weights) in enumerate(chunk):
+                    in_segment = term_ids < segment.num_terms
+                    rows.append(np.full(int(in_segment.sum()), row, dtype=np.int64))
+                    columns.append(term_ids[in_segment])
+                    values.append(weights[in_segment])
+                query_matrix = csr_matrix(
+                    (np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))),
+                    shape=(len(chunk), segment.num_terms), dtype=np.float32
+                )
+                scores = (query_matrix @ segment.matrix()).tocsr()
+                for row in range(len(chunk)):
+                    start, end = scores.indptr[row], scores.indptr[row + 1]
+                    doc_ids, row_scores = scores.indices[start:end], scores.data[start:end]
+                    if end - start > k:
+                        best = np.argpartition(-row_scores, k - 1)[:k]
+                        doc_ids, row_scores = doc_ids[best], row_scores[best]
+                    found[chunk_start + row].append((doc_ids.astype(np.int64) + segment.doc_start, row_scores))
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "num_documents": len(self._doc_keys),
+                "num_terms": len(self._terms),
+                "buffered_documents": self._buffer_docs,
+                "segments": [
+                    {"name": segment.name, "num_docs": segment.num_docs, "num_postings": segment.num_postings}
+                    for segment in self._segments
+                ],
+            }
+
+    def clear(self):
+        """Removes every document (and the index files) from the index."""
+        with self._lock:
+            if self.directory:
+                for segment in self._segments:
+                    if segment.name:
+                        shutil.rmtree(os.path.join(self.directory, segment.name), ignore_errors=True)
+                for filename in (MANIFEST_FILE, VOCABULARY_FILE, DOCUMENT_FREQUENCY_FILE):
+                    path = os.path.join(self.directory, filename)
+                    if os.path.exists(path):
+                        os.remove(path)
+            self._reset()
+
+# --- Module-level API used by the endpoints ---
+
+def load_similarity_index(index_dir: str = "similarity_index", flush_threshold: int = DEFAULT_FLUSH_THRESHOLD,
+                          merge_factor: int = DEFAULT_MERGE_FACTOR):
+    """
+    Opens the similarity index stored in `index_dir`, creating an empty one if it does not exist.
+    This should be called once when the application starts.
+    """
+    global similarity_index
+    print(f"--- Loading Similarity Index from '{index_dir}' ---")
+    os.makedirs(index_dir, exist_ok=True)
+    similarity_index = TfidfIndex(index_dir, flush_threshold=flush_threshold, merge_factor=merge_factor)
+    stats = similarity_index.stats()
+    print(f"Similarity index loaded: {stats['num_documents']} documents in {len(stats['segments'])} segments.")
+
+def unload_similarity_index():
+    """
+    Writes buffered documents to disk and releases the index. It can be opened again
+    with 'load_similarity_index'.
+    """
+    global similarity_index
+    if similarity_index is not None:
+        similarity_index.flush()
+    similarity_index = None
+    print("Similarity index unloaded.")
+
+def _get_index() -> TfidfIndex:
+    if similarity_index is None:
+        raise RuntimeError("Similarity index is not loaded. Please run 'load_similarity_index' at application startup.")
+    return similarity_index
+
+def build_similarity_index(texts: Sequence[str], doc_ids: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Replaces the whole index with the given documents, written as a single segment.
+
+    Returns:
+        Dict[str, Any]: The index statistics.
+    """
+    index = _get_index()
+    if doc_ids is not None:
+        # Checked before the index is cleared, so that invalid ids leave it untouched.
+        doc_ids = [str(doc_id) for doc_id in doc_ids]
+        _check_doc_ids(texts, doc_ids, set())
+    with index._lock:
+        index.clear()
+        original_threshold, index.flush_threshold = index.flush_threshold, max(index.flush_threshold, len(texts) + 1)
+        try:
+            index.add_documents(texts, doc_ids)
+        finally:
+            index.flush_threshold = original_threshold
+        index.flush()
+    return index.stats()
+
+def add_to_similarity_index(texts: Sequence[str], doc_ids: Optional[Sequence[str]] = None, flush: bool = False) -> List[str]:
+    """Adds documents to the index (see 'TfidfIndex.add_documents'), optionally writing them to disk at once."""
+    index = _get_index()
+    added = index.add_documents(texts, doc_ids)
+    if flush:
+        index.flush()
+    return added
+
+def search_similar(query: str, k: int = 10) -> List[Dict[str, Any]]:
+    """Returns the k documents most similar to the query (see 'TfidfIndex.search')."""
+    return _get_index().search(query, k)
+
+def search_similar_batch(queries: Sequence[str], k: int = 10) -> List[List[Dict[str, Any]]]:
+    """Returns the k documents most similar to each query (see 'TfidfIndex.search_batch')."""
+    return _get_index().search_batch(queries, k)
+
+def compact_similarity_index() -> Dict[str, Any]:
+    """Merges the index into one segment with up-to-date weights and returns its statistics."""
+    index = _get_index()
+    index.compact()
+    return index.stats()
+
+def flush_similarity_index():
+    """Writes buffered documents to disk, if the index is loaded."""
+    if similarity_index is not None:
+        similarity_index.flush()
+
+def get_similarity_index_stats() -> Dict[str, Any]:
+    return _get_index().stats()
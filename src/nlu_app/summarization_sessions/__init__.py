@@ -0,0 +1,10 @@
+from .logic import SummarizationSession, SessionStore, SessionNotFoundError, SessionFullError, SESSION_METHODS
+
+
+__all__ = [
+    "SummarizationSession",
+    "SessionStore",
+    "SessionNotFoundError",
+    "SessionFullError",
+    "SESSION_METHODS"
+]
@@ -0,0 +1,408 @@
+from collections import OrderedDict
+from scipy.sparse import csr_matrix
+from typing import Any, Dict, List, Optional
+import numpy as np
+import threading
+import time
+import uuid
+
+from ..extractive_summarizer import logic as extractive_logic
+from ..textrank_summarizer import logic as textrank_logic
+from ..metrics import increment
+from ..sentence_segmenter import sentence_spans
+from ..tracing import trace_span
+
+# --- Module-Level Constants ---
+SESSION_METHODS = ("extractive", "textrank")
+# The LexRank graph of a session is rebuilt with fresh IDF weights whenever the
+# session has grown by this factor since the last rebuild (see _LexRankState).
+LEXRANK_REBUILD_GROWTH = 1.5
+
+class SessionNotFoundError(Exception):
+    """Raised for an unknown, closed or expired session id."""
+
+class SessionFullError(Exception):
+    """Raised when an append would take a session past its character limit."""
+
+class _GrowableArray:
+    """
+    A NumPy array with amortized O(1) appends (the capacity doubles when full).
+    """
+    def __init__(self, dtype):
+        self._data = np.empty(64, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        end = self.size + len(values)
+        if end > len(self._data):
+            grown = np.empty(max(end, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:end] = values
+        self.size = end
+
+    def view(self) -> np.ndarray:
+        return self._data[:self.size]
+
+class _SparseRows:
+    """
+    Sparse rows stored CSR-style in growable arrays, so appending rows never copies
+    the existing ones and the matrix is a view of the arrays.
+    """
+    def __init__(self, dtype=np.float64):
+        self.indptr = _GrowableArray(np.int64)
+        self.indptr.extend([0])
+        self.indices = _GrowableArray(np.int64)
+        self.data = _GrowableArray(dtype)
+
+    def append(self, indices, data):
+        self.indices.extend(indices)
+        self.data.extend(data)
+        self.indptr.extend([self.indices.size])
+
+    def append_matrix(self, rows: csr_matrix):
+        offset = self.indices.size
+        self.indices.extend(rows.indices)
+        self.data.extend(rows.data)
+        self.indptr.extend(rows.indptr[1:] + offset)
+
+    def matrix(self, num_columns: int) -> csr_matrix:
+        indptr = self.indptr.view()
+        return csr_matrix(
+            (self.data.view(), self.indices.view(), indptr), shape=(len(indptr) - 1, num_columns), copy=False
+        )
+
+class _ExtractiveState:
+    """
+    Incremental state of the frequency-based extractive summarizer: the term counts
+    of every sentence and the running term frequencies of the whole document. A
+    summary is one sparse product of the stored counts with the current word weights,
+    so no sentence is tokenized twice.
+    """
+    def __init__(self, weighting: str):
+        self.weighting = weighting
+        self.vocabulary: Dict[str, int] = {}
+        self.counts = _SparseRows()
+        self.lengths = _GrowableArray(np.int64)
+        self.term_frequencies = _GrowableArray(np.float64)
+        self.idf = _GrowableArray(np.float64)
+
+    def add_sentences(self, sentences: List[str]):
+        new_terms = []
+        for sentence in sentences:
+            words = extractive_logic._preprocess_text(sentence)
+            term_ids = []
+            for word in words:
+                term_id = self.vocabulary.get(word)
+                if term_id is None:
+                    term_id = self.vocabulary[word] = len(self.vocabulary)
+                    new_terms.append(word)
+                term_ids.append(term_id)
+            term_ids, counts = np.unique(np.asarray(term_ids, dtype=np.int64), return_counts=True)
+            self.counts.append(term_ids, counts)
+            self.lengths.extend([len(words)])
+
+        self.term_frequencies.extend(np.zeros(len(new_terms)))
+        if self.weighting == "tfidf":
+            # Corpus IDF of the new terms, looked up once when they are first seen.
+            self.idf.extend(extractive_logic.idf_table.lookup(new_terms) if new_terms else [])
+        added = self.counts.matrix(len(self.vocabulary))[-len(sentences):]
+        self.term_frequencies.view()[:] += np.asarray(added.sum(axis=0)).ravel()
+
+    def summary(self, sentences: List[str], num_sentences: int) -> List[int]:
+        weights = self.term_frequencies.view()
+        if self.weighting == "tfidf":
+            weights = weights * self.idf.view()
+        lengths = self.lengths.view()
+        eligible = lengths > 0
+        scores = np.zeros(len(lengths), dtype=np.float64)
+        scores[eligible] = (self.counts.matrix(len(self.vocabulary)) @ weights)[eligible] / lengths[eligible]
+        return extractive_logic._select_top_indices(scores, eligible, num_sentences)
+
+class _LexRankState:
+    """
+    Incremental LexRank. Sentences are TF-IDF vectors weighted like the 'fast'
+    TextRank engine, and the similarity graph keeps the edges above the similarity
+    threshold. An append only compares the new sentences with the existing ones and
+    adds their edges.
+
+    The IDF weights of LexRank depend on the number of sentences, so they are frozen
+    at the last rebuild and all vectors share them; when the session has grown by
+    LEXRANK_REBUILD_GROWTH since then, the vectors and the graph are rebuilt with
+    fresh weights. Right after a rebuild the scores equal the 'fast' engine's, and
+    the rebuilds cost O(1) amortized per appended sentence.
+
+    The graph is symmetric, so the power iteration multiplies by the adjacency matrix
+    itself. Its edges are merged into a CSR matrix only once the edges added since the
+    last merge reach half of it; newer edges are applied from their edge list.
+    """
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self.counts = _SparseRows()
+        self.max_term_counts = _GrowableArray(np.float64)
+        self.document_frequencies = _GrowableArray(np.float64)
+        self.rebuilt_at = 0
+        self._reset_graph(np.zeros(0), 0)
+
+    def _reset_graph(self, document_frequencies: np.ndarray, num_sentences: int):
+        self.snapshot_document_frequencies = document_frequencies
+        self.snapshot_num_sentences = num_sentences
+        self.vectors = _SparseRows()
+        self.edge_rows = _GrowableArray(np.int64)
+        self.edge_cols = _GrowableArray(np.int64)
+        self.adjacency = csr_matrix((0, 0))
+        self.adjacency_degrees = np.zeros(0)
+
+    def _snapshot_idf(self, term_ids: np.ndarray) -> np.ndarray:
+        # Terms first seen after the snapshot have a document frequency of 0 in it.
+        document_frequencies = np.zeros(len(term_ids))
+        known = term_ids < len(self.snapshot_document_frequencies)
+        document_frequencies[known] = self.snapshot_document_frequencies[term_ids[known]]
+        return np.log(self.snapshot_num_sentences / (1.0 + document_frequencies))
+
+    def _add_vectors(self, first: int, last: int):
+        """
+        Internal helper that weights and normalizes sentences first..last-1 and adds
+        their edges to every sentence up to `last`.
+        """
+        counts = self.counts.matrix(len(self.vocabulary))[first:last]
+        # TF normalized by the sentence's most frequent term, times the snapshot IDF.
+        row_of_entry = np.repeat(np.arange(last - first), np.diff(counts.indptr))
+        max_term_counts = self.max_term_counts.view()[first:last]
+        counts.data = counts.data / max_term_counts[row_of_entry] * self._snapshot_idf(counts.indices)
+        self.vectors.append_matrix(textrank_logic._normalize_rows(counts))
+
+        vectors = self.vectors.matrix(len(self.vocabulary))
+        similarities = (vectors[first:last] @ vectors.T).tocoo()
+        keep = similarities.data > textrank_logic.SIMILARITY_THRESHOLD
+        rows, cols = similarities.row[keep] + first, similarities.col[keep]
+        # Pairs among the new sentences appear in both directions already; pairs with
+        # an older sentence are mirrored.
+        older = cols < first
+        self.edge_rows.extend(np.concatenate([rows, cols[older]]))
+        self.edge_cols.extend(np.concatenate([cols, rows[older]]))
+
+    def add_sentences(self, sentences: List[str]):
+        stop_words = textrank_logic.lexrank_summarizer.stop_words
+        first = len(self.max_term_counts.view())
+        for sentence in sentences:
+            term_ids = []
+            for word in textrank_logic.sumy_tokenizer.to_words(sentence):
+                word = word.lower()
+                if word not in stop_words:
+                    term_id = self.vocabulary.get(word)
+                    if term_id is None:
+                        term_id = self.vocabulary[word] = len(self.vocabulary)
+                        self.document_frequencies.extend([0])
+                    term_ids.append(term_id)
+            term_ids, counts = np.unique(np.asarray(term_ids, dtype=np.int64), return_counts=True)
+            self.counts.append(term_ids, counts)
+            self.max_term_counts.extend([counts.max() if len(counts) else 1])
+            self.document_frequencies.view()[term_ids] += 1
+
+        num_sentences = first + len(sentences)
+        if num_sentences > LEXRANK_REBUILD_GROWTH * self.rebuilt_at:
+            with trace_span("session.lexrank_rebuild", num_sentences=num_sentences):
+                self._reset_graph(self.document_frequencies.view().copy(), num_sentences)
+                self._add_vectors(0, num_sentences)
+            self.rebuilt_at = num_sentences
+            increment("sessions.lexrank_rebuilds")
+        else:
+            self._add_vectors(first, num_sentences)
+
+    def summary(self, sentences: List[str], num_sentences: int) -> List[int]:
+        size = len(sentences)
+        rows, cols = self.edge_rows.view(), self.edge_cols.view()
+        merged = self.adjacency.nnz
+        if len(rows) - merged > merged / 2:
+            self.adjacency = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(size, size))
+            self.adjacency_degrees = np.asarray(self.adjacency.sum(axis=1)).ravel()
+            merged = len(rows)
+        new_rows, new_cols = rows[merged:], cols[merged:]
+        merged_size = self.adjacency.shape[0]
+        degrees = np.bincount(new_rows, minlength=size).astype(np.float64)
+        degrees[:merged_size] += self.adjacency_degrees
+        degrees[degrees == 0] = 1
+
+        def step(scores):
+            weighted = scores / degrees
+            result = np.bincount(new_rows, weights=weighted[new_cols], minlength=size).astype(np.float64, copy=False)
+            result[:merged_size] += self.adjacency @ weighted[:merged_size]
+            return result
+
+        scores = textrank_logic._power_iteration(step, size)
+        ranking = np.argsort(-scores, kind="stable")[:num_sentences]
+        return sorted(ranking.tolist())
+
+class SummarizationSession:
+    """
+    A growing document whose summary can be requested at any time. Appended text is
+    split into sentences; the last sentence of the text so far is held back until
+    more text arrives (or the append is flushed), because it may be incomplete.
+    Every completed sentence is preprocessed once and added to the method's
+    incremental state, so an append costs in proportion to the new text.
+
+    A session holds at most `max_characters` characters of text. Held-back text longer
+    than `max_pending_characters` is added as a sentence, so that text without sentence
+    breaks is not split again in full by every append.
+    """
+    def __init__(self, method: str = "extractive", weighting: str = "auto", max_characters: Optional[int] = None,
+                 max_pending_characters: Optional[int] = None):
+        if method not in SESSION_METHODS:
+            raise ValueError(f"Unknown session method '{method}'. Expected one of: {', '.join(SESSION_METHODS)}.")
+        self.session_id = uuid.uuid4().hex
+        self.method = method
+        if method == "extractive":
+            self.weighting = extractive_logic.resolve_weighting(weighting)
+            self._state = _ExtractiveState(self.weighting)
+        else:
+            if textrank_logic.sumy_tokenizer is None or textrank_logic.lexrank_summarizer is None:
+                raise RuntimeError("TextRank tools are not loaded. Please run 'load_textrank_tools' at startup.")
+            self.weighting = None
+            self._state = _LexRankState()
+        self.max_characters = max_characters
+        self.max_pending_characters = max_pending_characters
+        self.sentences: List[str] = []
+        self.pending = ""
+        self.num_characters = 0
+        self.created_at = self.last_used = time.time()
+        self._summaries: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def append(self, text: str, flush: bool = False) -> Dict[str, Any]:
+        """
+        Appends text to the document.
+
+        Args:
+            text (str): The new text. It is joined to the previous text as is, so include separating whitespace.
+            flush (bool): Treat the text so far as complete, including its last sentence.
+
+        Returns:
+            Dict[str, Any]: The session info, with the number of sentences this append completed.
+
+        Raises:
+            SessionFullError: If the text would take the session past `max_characters`.
+        """
+        with self._lock:
+            if self.max_characters is not None and self.num_characters + len(text) > self.max_characters:
+                raise SessionFullError(
+                    f"Session '{self.session_id}' would exceed its limit of {self.max_characters} characters."
+                )
+            self.last_used = time.time()
+            self.num_characters += len(text)
+            text = self.pending + text
+            with trace_span("session.split", text_length=len(text)):
+                # The pending text changes with every append, so it is not worth caching.
+                spans = sentence_spans(text, cache=False).tolist()
+            self.pending = ""
+            if spans and not flush:
+                # The last sentence may continue in the next chunk.
+                last = spans.pop()
+                if self.max_pending_characters is None or len(text) - last[0] <= self.max_pending_characters:
+                    self.pending = text[last[0]:]
+                else:
+                    spans.append(last)
+                    increment("sessions.forced_splits")
+            sentences = [text[start:end] for start, end in spans]
+            if sentences:
+                with trace_span("session.add_sentences", num_sentences=len(sentences)):
+                    self._state.add_sentences(sentences)
+                self.sentences.extend(sentences)
+                self._summaries.clear()
+            increment("sessions.appended_sentences", len(sentences))
+            return {**self._info(), "added_sentences": len(sentences)}
+
+    def summary(self, num_sentences: int = 3) -> str:
+        """
+        Returns the current summary: the `num_sentences` best sentences in document
+        order, computed from the stored state (and cached until the next append).
+        Held-back text is not part of it.
+        """
+        with self._lock:
+            self.last_used = time.time()
+            if num_sentences not in self._summaries:
+                if len(self.sentences) <= num_sentences:
+                    indices = range(len(self.sentences))
+                else:
+                    with trace_span("session.rank", num_sentences=len(self.sentences)):
+                        indices = self._state.summary(self.sentences, num_sentences)
+                self._summaries[num_sentences] = " ".join(self.sentences[i] for i in indices)
+            return self._summaries[num_sentences]
+
+    def _info(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "method": self.method,
+            "weighting": self.weighting,
+            "num_sentences": len(self.sentences),
+            "num_characters": self.num_characters,
+            "pending_characters": len(self.pending),
+            "created_at": self.created_at,
+            "last_used": self.last_used,
+        }
+
+    def info(self) -> Dict[str, Any]:
+        """Returns the session id, method, sentence and character counts and timestamps."""
+        with self._lock:
+            return self._info()
+
+class SessionStore:
+    """
+    Keeps the open sessions of this process. Sessions unused for `ttl` seconds expire,
+    and the least recently used one is dropped when `max_sessions` are open. New
+    sessions get the `max_characters` and `max_pending_characters` limits.
+    """
+    def __init__(self, ttl: Optional[float] = 3600.0, max_sessions: int = 1000, max_characters: Optional[int] = None,
+                 max_pending_characters: Optional[int] = None):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_characters = max_characters
+        self.max_pending_characters = max_pending_characters
+        self._sessions: "OrderedDict[str, SummarizationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        if self.ttl is None:
+            return
+        cutoff = time.time() - self.ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_used >= cutoff:
+                break
+            del self._sessions[session_id]
+            increment("sessions.expired")
+
+    def create(self, method: str = "extractive", weighting: str = "auto") -> SummarizationSession:
+        """Opens a new session (see SummarizationSession)."""
+        session = SummarizationSession(method, weighting, self.max_characters, self.max_pending_characters)
+        with self._lock:
+            self._expire()
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+                increment("sessions.evicted")
+            self._sessions[session.session_id] = session
+        increment("sessions.created")
+        return session
+
+    def get(self, session_id: str) -> SummarizationSession:
+        """Returns an open session, or raises SessionNotFoundError."""
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise SessionNotFoundError(f"Session '{session_id}' does not exist or has expired.")
+            self._sessions.move_to_end(session_id)
+            # Refreshed here so that a session in use is not expired before its call takes the session lock.
+            session.last_used = time.time()
+            return session
+
+    def close(self, session_id: str):
+        """Closes a session, or raises SessionNotFoundError."""
+        with self._lock:
+            if self._sessions.pop(session_id, None) is None:
+                raise SessionNotFoundError(f"Session '{session_id}' does not exist or has expired.")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
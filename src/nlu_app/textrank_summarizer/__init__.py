@@ -1,6 +1,17 @@
-from .logic import generate_textrank_summary
+from .logic import (
+    load_textrank_tools, unload_textrank_tools, generate_textrank_summary, parse_document, evaluate_approximate_ranking,
+    APPROXIMATE_SENTENCE_THRESHOLD, LSH_NUM_BANDS, LSH_BAND_BITS, LSH_WINDOW
+)
 
 
 __all__ = [
-    "generate_textrank_summary"
+    "load_textrank_tools",
+    "unload_textrank_tools",
+    "generate_textrank_summary",
+    "parse_document",
+    "evaluate_approximate_ranking",
+    "APPROXIMATE_SENTENCE_THRESHOLD",
+    "LSH_NUM_BANDS",
+    "LSH_BAND_BITS",
+    "LSH_WINDOW"
 ]
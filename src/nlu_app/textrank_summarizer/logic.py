@@ -1,29 +1,377 @@
-from sumy.summarizers.lex_rank import LexRankSummarizer
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
+from scipy.sparse import csr_matrix, diags
+from typing import Any, Dict, List, Sequence
+import numpy as np
+import time
+
+from ..sentence_segmenter import load_sentence_segmenter, split_sentences
+from ..tracing import trace_span
+
+# sumy and scipy.stats are slow to import, so they are imported where they are used.
 
 # LexRank, TextRank'e çok benzer bir graf tabanlı özetleme algoritmasıdır.
-# Bu modül için başlangıçta yüklenecek ayrı bir model yoktur.
-# Gerekli nesneler her çağrıda oluşturulur.
+# Tokenizer ve özetleyici nesneleri başlangıçta bir kez oluşturulur ve
+# tüm çağrılarda yeniden kullanılır.
+
+# --- Module-Level Variables ---
+# These will be initialized by the load function.
+sumy_tokenizer = None
+lexrank_summarizer = None
+
+# --- Module-Level Constants ---
+# Similarity threshold above which two sentences are connected (same as sumy).
+SIMILARITY_THRESHOLD = 0.1
+# Power iteration stops once the score vector moves less than this between steps.
+CONVERGENCE_TOLERANCE = 1e-6
+MAX_ITERATIONS = 200
+METHODS = ("auto", "fast", "approximate", "sumy")
+
+# "auto" switches from the exact engine to the approximate one above this many sentences.
+APPROXIMATE_SENTENCE_THRESHOLD = 5000
+# Random-projection LSH knobs for the approximate engine. More bands, fewer bits
+# per band or a wider window find more similar pairs (recall) at a higher cost.
+LSH_NUM_BANDS = 16
+LSH_BAND_BITS = 5
+LSH_WINDOW = 8
+LSH_SEED = 13
+# Candidate pairs are scored in slices of this size to bound memory use.
+LSH_PAIR_BATCH_SIZE = 200_000
 
-def generate_textrank_summary(text: str, num_sentences: int = 3) -> str:
+def load_textrank_tools(language: str = "english"):
+    """
+    Initializes the sentence/word tokenizer and the LexRank summarizer once,
+    so they can be shared by every summarization request.
+    This should be called once at application startup.
+
+    Args:
+        language (str): The language used for sentence and word tokenization.
+    """
+    global sumy_tokenizer, lexrank_summarizer
+
+    print("--- Loading TextRank Summarizer Tools ---")
+    from sumy.summarizers.lex_rank import LexRankSummarizer
+    from sumy.nlp.tokenizers import Tokenizer
+    try:
+        sumy_tokenizer = Tokenizer(language)
+    except LookupError as e:
+        print(f"Error initializing the sumy tokenizer: {e}")
+        raise e
+
+    load_sentence_segmenter()
+    lexrank_summarizer = LexRankSummarizer()
+    print("TextRank tools (tokenizer, LexRank summarizer) initialized.")
+
+def unload_textrank_tools():
+    """
+    Releases the tokenizer and the LexRank summarizer. They can be loaded again with 'load_textrank_tools'.
+    """
+    global sumy_tokenizer, lexrank_summarizer
+    sumy_tokenizer = lexrank_summarizer = None
+    print("TextRank tools unloaded.")
+
+def _build_tfidf_matrix(sentences_words: List[List[str]]) -> csr_matrix:
+    """
+    Internal helper that builds the sentence x term TF-IDF matrix with the same
+    weighting as sumy's LexRank: TF is normalized by the most frequent term of
+    the sentence and IDF is log(N / (1 + n_j)), each sentence being a document.
+    """
+    vocabulary = {}
+    rows, cols = [], []
+    for i, words in enumerate(sentences_words):
+        for word in words:
+            rows.append(i)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    num_sentences = len(sentences_words)
+    counts = csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+        shape=(num_sentences, len(vocabulary))
+    )
+    counts.sum_duplicates()
+
+    max_tf = counts.max(axis=1).toarray().ravel()
+    max_tf[max_tf == 0] = 1
+    document_frequencies = np.bincount(counts.indices, minlength=len(vocabulary))
+    idf = np.log(num_sentences / (1.0 + document_frequencies))
+
+    return (diags(1.0 / max_tf) @ counts @ diags(idf)).tocsr()
+
+def _normalize_rows(tfidf: csr_matrix) -> csr_matrix:
+    """
+    Internal helper that scales every non-empty row of a sparse matrix to unit length.
+    """
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    normalized = (diags(inverse_norms) @ tfidf).tocsr()
+    normalized.eliminate_zeros()
+    return normalized
+
+def _cosine_similarity_matrix(tfidf: csr_matrix) -> csr_matrix:
+    """
+    Internal helper that computes all pairwise cosine similarities between the
+    rows of a TF-IDF matrix with a single sparse matrix product.
+    """
+    normalized = _normalize_rows(tfidf)
+    return (normalized @ normalized.T).tocsr()
+
+def _lsh_candidate_pairs(normalized: csr_matrix, num_bands: int, band_bits: int,
+                         window: int, seed: int) -> np.ndarray:
+    """
+    Internal helper that hashes every sentence with random-projection (SimHash) LSH
+    and returns the unique (i, j) pairs, i < j, that collide in at least one band.
+
+    Within each band the sentences are sorted by bucket key and every sentence is
+    paired only with the next `window` sentences of the same bucket, which caps the
+    cost of very large buckets.
+    """
+    num_sentences, num_terms = normalized.shape
+    rng = np.random.default_rng(seed)
+    projections = rng.standard_normal((num_terms, num_bands * band_bits)).astype(np.float32)
+    signatures = np.asarray(normalized @ projections) > 0
+
+    bit_weights = np.left_shift(1, np.arange(band_bits, dtype=np.int64))
+    band_keys = signatures.reshape(num_sentences, num_bands, band_bits).astype(np.int64) @ bit_weights
+
+    # Sentences without any weighted term can never be similar to anything.
+    non_empty = np.flatnonzero(np.diff(normalized.indptr) > 0)
+    pair_codes = []
+    for band in range(num_bands):
+        keys = band_keys[non_empty, band]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys, sorted_ids = keys[order], non_empty[order]
+        for offset in range(1, min(window, len(sorted_ids) - 1) + 1):
+            same_bucket = sorted_keys[offset:] == sorted_keys[:-offset]
+            left, right = sorted_ids[:-offset][same_bucket], sorted_ids[offset:][same_bucket]
+            pair_codes.append(np.minimum(left, right) * num_sentences + np.maximum(left, right))
+
+    if not pair_codes:
+        return np.empty((0, 2), dtype=np.int64)
+    codes = np.unique(np.concatenate(pair_codes))
+    return np.stack([codes // num_sentences, codes % num_sentences], axis=1)
+
+def _lsh_similarity_matrix(tfidf: csr_matrix, threshold: float, num_bands: int,
+                           band_bits: int, window: int, seed: int) -> csr_matrix:
+    """
+    Internal helper that builds a sparse similarity graph holding exact cosine
+    similarities only for the LSH candidate pairs above `threshold`, plus the
+    self-similarity of every non-empty sentence.
+    """
+    normalized = _normalize_rows(tfidf)
+    pairs = _lsh_candidate_pairs(normalized, num_bands, band_bits, window, seed)
+
+    rows, cols, values = [], [], []
+    for start in range(0, len(pairs), LSH_PAIR_BATCH_SIZE):
+        batch = pairs[start:start + LSH_PAIR_BATCH_SIZE]
+        similarities = np.asarray(
+            normalized[batch[:, 0]].multiply(normalized[batch[:, 1]]).sum(axis=1)
+        ).ravel()
+        keep = similarities > threshold
+        rows.extend([batch[keep, 0], batch[keep, 1]])
+        cols.extend([batch[keep, 1], batch[keep, 0]])
+        values.extend([similarities[keep], similarities[keep]])
+
+    non_empty = np.flatnonzero(np.diff(normalized.indptr) > 0)
+    rows.append(non_empty)
+    cols.append(non_empty)
+    values.append(np.ones(len(non_empty)))
+
+    num_sentences = tfidf.shape[0]
+    return csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(num_sentences, num_sentences)
+    )
+
+def _lexrank_scores(similarity: csr_matrix, threshold: float = SIMILARITY_THRESHOLD,
+                    tolerance: float = CONVERGENCE_TOLERANCE, max_iterations: int = MAX_ITERATIONS) -> np.ndarray:
+    """
+    Internal helper that thresholds a sparse similarity graph, normalizes it by
+    node degree and runs a vectorized power iteration until the score vector
+    changes by less than `tolerance`.
+    """
+    adjacency = (similarity > threshold).astype(np.float64)
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    degrees[degrees == 0] = 1
+    transition_transposed = (diags(1.0 / degrees) @ adjacency).T.tocsr()
+    return _power_iteration(transition_transposed.dot, similarity.shape[0], tolerance, max_iterations)
+
+def _power_iteration(step, num_sentences: int, tolerance: float = CONVERGENCE_TOLERANCE,
+                     max_iterations: int = MAX_ITERATIONS) -> np.ndarray:
+    """
+    Internal helper running the LexRank power iteration from uniform scores. `step`
+    multiplies a score vector by the transposed transition matrix.
+    """
+    scores = np.full(num_sentences, 1.0 / num_sentences)
+    for _ in range(max_iterations):
+        next_scores = step(scores)
+        norm = np.linalg.norm(next_scores)
+        if norm == 0:
+            # No sentence is connected to anything; every sentence is equally central.
+            return np.full(num_sentences, 1.0 / num_sentences)
+        next_scores /= norm
+        delta = np.linalg.norm(next_scores - scores)
+        scores = next_scores
+        if delta < tolerance:
+            break
+    return scores
+
+def _select_best_sentences(sentences: Sequence, scores: np.ndarray, num_sentences: int) -> list:
+    """
+    Internal helper that returns the `num_sentences` best rated sentences in
+    document order. Ties are broken by position, like sumy's stable sort.
+    """
+    ranking = np.argsort(-scores, kind="stable")[:num_sentences]
+    return [sentences[i] for i in sorted(ranking.tolist())]
+
+def _sentence_tfidf(sentences: Sequence) -> csr_matrix:
+    """
+    Internal helper that normalizes the words of each parsed sentence like sumy
+    does and returns their TF-IDF matrix.
+    """
+    stop_words = lexrank_summarizer.stop_words
+    sentences_words = [
+        [word for word in (w.lower() for w in sentence.words) if word not in stop_words]
+        for sentence in sentences
+    ]
+    return _build_tfidf_matrix(sentences_words)
+
+def _fast_lexrank_scores(sentences: Sequence) -> np.ndarray:
+    """
+    Internal helper implementing exact LexRank with sparse TF-IDF vectors,
+    one sparse product for the similarity matrix and NumPy power iteration.
+    """
+    return _lexrank_scores(_cosine_similarity_matrix(_sentence_tfidf(sentences)))
+
+def _approximate_lexrank_scores(sentences: Sequence, num_bands: int = LSH_NUM_BANDS,
+                                band_bits: int = LSH_BAND_BITS, window: int = LSH_WINDOW,
+                                seed: int = LSH_SEED) -> np.ndarray:
+    """
+    Internal helper implementing approximate LexRank: similarities are only
+    computed for sentence pairs that collide in an LSH bucket, and centrality
+    is computed on the resulting sparse graph.
+    """
+    similarity = _lsh_similarity_matrix(
+        _sentence_tfidf(sentences), SIMILARITY_THRESHOLD, num_bands, band_bits, window, seed
+    )
+    return _lexrank_scores(similarity)
+
+def evaluate_approximate_ranking(texts: List[str], num_sentences: int = 3, num_bands: int = LSH_NUM_BANDS,
+                                 band_bits: int = LSH_BAND_BITS, window: int = LSH_WINDOW,
+                                 seed: int = LSH_SEED) -> Dict[str, Any]:
+    """
+    Measures how far the approximate LexRank ranking deviates from exact LexRank
+    over a set of test documents.
+
+    Args:
+        texts (List[str]): The test documents.
+        num_sentences (int): The summary size used for the top-N overlap.
+        num_bands (int): Number of LSH bands.
+        band_bits (int): Number of random-projection bits per band.
+        window (int): Number of same-bucket neighbours paired with each sentence.
+        seed (int): Seed of the random projections.
+
+    Returns:
+        Dict[str, Any]: The number of documents evaluated, the mean top-N overlap, the
+                        mean Spearman rank correlation of the sentence scores and the
+                        total exact/approximate run times.
+    """
+    if sumy_tokenizer is None or lexrank_summarizer is None:
+        raise RuntimeError("TextRank tools are not loaded. Please run 'load_textrank_tools' at startup.")
+    from scipy.stats import spearmanr
+
+    overlaps, correlations = [], []
+    exact_time = approximate_time = 0.0
+    for text in texts:
+        sentences = parse_document(text).sentences
+        if len(sentences) <= num_sentences:
+            continue
+
+        start = time.perf_counter()
+        exact_scores = _fast_lexrank_scores(sentences)
+        exact_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        approximate_scores = _approximate_lexrank_scores(sentences, num_bands, band_bits, window, seed)
+        approximate_time += time.perf_counter() - start
+
+        exact_top = set(np.argsort(-exact_scores, kind="stable")[:num_sentences].tolist())
+        approximate_top = set(np.argsort(-approximate_scores, kind="stable")[:num_sentences].tolist())
+        overlaps.append(len(exact_top & approximate_top) / num_sentences)
+        correlation = spearmanr(exact_scores, approximate_scores).statistic
+        if np.isfinite(correlation):
+            correlations.append(correlation)
+
+    return {
+        "documents": len(overlaps),
+        "mean_top_n_overlap": float(np.mean(overlaps)) if overlaps else 0.0,
+        "mean_spearman_correlation": float(np.mean(correlations)) if correlations else 0.0,
+        "exact_time": exact_time,
+        "approximate_time": approximate_time,
+    }
+
+def parse_document(text: str):
+    """
+    Parses a text into sumy's document model: the sentences of the shared sentence
+    segmenter, split into words by sumy's tokenizer. The result can be passed to
+    'generate_textrank_summary' for later summaries of the same text.
+
+    Args:
+        text (str): The input text.
+
+    Returns:
+        The parsed sumy document.
+    """
+    if sumy_tokenizer is None or lexrank_summarizer is None:
+        raise RuntimeError("TextRank tools are not loaded. Please run 'load_textrank_tools' at startup.")
+    from sumy.models.dom import ObjectDocumentModel, Paragraph, Sentence
+
+    with trace_span("textrank.parse", text_length=len(text)):
+        sentences = [Sentence(sentence, sumy_tokenizer) for sentence in split_sentences(text)]
+        return ObjectDocumentModel([Paragraph(sentences)])
+
+def generate_textrank_summary(text: str, num_sentences: int = 3, method: str = "auto",
+                              approximate_threshold: int = APPROXIMATE_SENTENCE_THRESHOLD, document=None,
+                              num_bands: int = LSH_NUM_BANDS, band_bits: int = LSH_BAND_BITS,
+                              window: int = LSH_WINDOW) -> str:
     """
     Args:
         text (str): The input text to be summarized.
         num_sentences (int): The desired number of sentences in the summary.
+        method (str): "fast" for the vectorized NumPy LexRank engine, "approximate" for
+                      the LSH-sparsified engine, "sumy" for sumy's own LexRankSummarizer,
+                      or "auto" to use "approximate" above `approximate_threshold`
+                      sentences and "fast" otherwise.
+        approximate_threshold (int): Sentence count above which "auto" goes approximate.
+        document: The result of 'parse_document' for this text, if it is already known.
+        num_bands (int): Number of LSH bands of the approximate engine.
+        band_bits (int): Number of random-projection bits per band.
+        window (int): Number of same-bucket neighbours paired with each sentence.
 
     Returns:
         str: The generated summary as a single string.
     """
-    # 1. Create a parser for the input text.
-    # The tokenizer splits the text into sentences and words.
-    parser = PlaintextParser.from_string(text, Tokenizer("english"))
+    if method not in METHODS:
+        raise ValueError(f"Unknown TextRank method '{method}'. Expected one of: {', '.join(METHODS)}.")
+    if sumy_tokenizer is None or lexrank_summarizer is None:
+        raise RuntimeError("TextRank tools are not loaded. Please run 'load_textrank_tools' at startup.")
+
+    # 1. Parse the text into sentences and words with the shared tokenizer.
+    if document is None:
+        document = parse_document(text)
+    if not document.sentences:
+        return ""
 
-    # 2. Initialize the summarizer.
-    summarizer = LexRankSummarizer()
+    # 2. Rank the sentences with the selected engine.
+    if method == "auto":
+        method = "approximate" if len(document.sentences) > approximate_threshold else "fast"
 
-    # 3. Generate the summary with the specified number of sentences.
-    summary_sentences = summarizer(parser.document, num_sentences)
+    with trace_span("textrank.rank", method=method, num_sentences=len(document.sentences)):
+        if method == "sumy":
+            summary_sentences = lexrank_summarizer(document, num_sentences)
+        elif method == "approximate":
+            scores = _approximate_lexrank_scores(document.sentences, num_bands, band_bits, window)
+            summary_sentences = _select_best_sentences(document.sentences, scores, num_sentences)
+        else:
+            scores = _fast_lexrank_scores(document.sentences)
+            summary_sentences = _select_best_sentences(document.sentences, scores, num_sentences)
 
-    # 4. Join the summary sentences back into a single string and return.
+    # 3. Join the summary sentences back into a single string and return.
     return " ".join([str(sentence) for sentence in summary_sentences])
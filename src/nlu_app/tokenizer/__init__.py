@@ -1,6 +1,7 @@
-from .logic import tokenize_text
+from .logic import tokenize_text, tokenize_texts
 
 
 __all__ = [
-    "tokenize_text"
+    "tokenize_text",
+    "tokenize_texts"
 ]
@@ -4,6 +4,8 @@ import string
 # Define punctuation as a constant at the module level for efficiency.
 # string.punctuation provides a standard set of punctuation characters.
 PUNCTUATION_TO_REMOVE = string.punctuation
+# Translation table deleting every punctuation character, shared by the batch tokenizer.
+PUNCTUATION_TRANSLATOR = str.maketrans('', '', PUNCTUATION_TO_REMOVE)
 
 def tokenize_text(text: str) -> List[str]:
     """
@@ -36,3 +38,15 @@ def tokenize_text(text: str) -> List[str]:
     tokens = processed_text.split()
 
     return tokens
+
+def tokenize_texts(texts: List[str]) -> List[List[str]]:
+    """
+    Tokenizes a batch of texts exactly like 'tokenize_text'.
+
+    Args:
+        texts (List[str]): The input texts.
+
+    Returns:
+        List[List[str]]: The tokens of each text.
+    """
+    return [text.lower().translate(PUNCTUATION_TRANSLATOR).split() if text else [] for text in texts]
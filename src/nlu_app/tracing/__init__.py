@@ -0,0 +1,18 @@
+from .logic import (
+    trace_span, trace_function, record_span, current_trace_id, parse_trace_context, to_otlp_json,
+    RotatingFileExporter, TailSampler, TracingMiddleware, TracedRoute
+)
+
+
+__all__ = [
+    "trace_span",
+    "trace_function",
+    "record_span",
+    "current_trace_id",
+    "parse_trace_context",
+    "to_otlp_json",
+    "RotatingFileExporter",
+    "TailSampler",
+    "TracingMiddleware",
+    "TracedRoute"
+]
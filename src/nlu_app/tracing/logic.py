@@ -0,0 +1,371 @@
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+import functools
+import threading
+import inspect
+import random
+import queue
+import json
+import time
+import re
+import os
+
+from ..metrics import increment
+from ..profiler import profile_stage
+
+# --- Module-Level Constants ---
+# Spans beyond this many per trace are dropped (e.g. long map-reduce loops).
+MAX_SPANS_PER_TRACE = 1000
+# Traces waiting to be written; more are dropped rather than slowing requests down.
+EXPORT_QUEUE_SIZE = 10000
+TRACE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+SERVICE_NAME = "nlu_app"
+# OTLP span kinds and status codes.
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+# --- Module-Level Variables ---
+# The trace of the request being handled and the span new spans are children of.
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span_id: ContextVar[Optional[str]] = ContextVar("current_span_id", default=None)
+
+def _new_span_id() -> str:
+    return os.urandom(8).hex()
+
+class Trace:
+    """The spans recorded for one request."""
+    __slots__ = ("trace_id", "root_span_id", "parent_span_id", "upstream_sampled", "spans", "dropped_spans")
+
+    def __init__(self, trace_id: str, parent_span_id: Optional[str] = None, upstream_sampled: bool = False):
+        self.trace_id = trace_id
+        self.root_span_id = _new_span_id()
+        self.parent_span_id = parent_span_id
+        self.upstream_sampled = upstream_sampled
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped_spans = 0
+
+    def add_span(self, span: Dict[str, Any]):
+        if len(self.spans) >= MAX_SPANS_PER_TRACE:
+            self.dropped_spans += 1
+            return
+        self.spans.append(span)
+
+class _Span:
+    __slots__ = ("trace", "name", "attributes", "span_id", "parent_span_id", "start_ns", "token", "stage")
+
+    def __init__(self, trace: Trace, name: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.parent_span_id = _current_span_id.get()
+        self.span_id = _new_span_id()
+        self.token = _current_span_id.set(self.span_id)
+        self.stage = profile_stage(self.name)
+        self.stage.__enter__()
+        self.start_ns = time.time_ns()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end_ns = time.time_ns()
+        self.stage.__exit__(exc_type, exc_value, traceback)
+        _current_span_id.reset(self.token)
+        self.trace.add_span({
+            "span_id": self.span_id, "parent_span_id": self.parent_span_id, "name": self.name,
+            "start_ns": self.start_ns, "end_ns": end_ns, "attributes": self.attributes,
+            "error": None if exc_type is None else f"{exc_type.__name__}: {exc_value}",
+        })
+
+def trace_span(name: str, **attributes):
+    """
+    Context manager recording one stage of the current request as a span, nested under
+    the enclosing span. The stage is also timed for ?profile=1 requests. Outside a
+    traced request it does nothing beyond two context variable lookups.
+
+    Args:
+        name (str): The stage name, e.g. "sentiment.vectorize".
+        **attributes: Span attributes (str, int, float or bool), e.g. text_length=120.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return profile_stage(name)
+    return _Span(trace, name, attributes)
+
+def trace_function(func: Callable, name: str) -> Callable:
+    """Wraps a function so that each call is recorded as the span `name`."""
+    def wrapper(*args, **kwargs):
+        with trace_span(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes):
+    """Records a span that has already ended (e.g. a wait measured from outside)."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span({
+            "span_id": _new_span_id(), "parent_span_id": _current_span_id.get(), "name": name,
+            "start_ns": start_ns, "end_ns": end_ns, "attributes": attributes, "error": None,
+        })
+
+def current_trace_id() -> Optional[str]:
+    """Returns the trace id of the request being handled, or None."""
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
+
+def parse_trace_context(headers: Dict[str, str]) -> Tuple[str, Optional[str], bool]:
+    """
+    Reads the incoming trace context: a W3C 'traceparent' header, else an 'X-Trace-Id'
+    header holding 32 hex digits. A new trace id is created if neither is usable.
+
+    Returns:
+        Tuple[str, Optional[str], bool]: The trace id, the caller's span id and whether
+                                         the caller asked for the trace to be sampled.
+    """
+    match = TRACEPARENT_PATTERN.match(headers.get("traceparent", "").strip().lower())
+    if match and match.group(1) != "0" * 32:
+        return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+    trace_id = headers.get("x-trace-id", "").strip().lower()
+    if TRACE_ID_PATTERN.match(trace_id) and trace_id != "0" * 32:
+        return trace_id, None, False
+    return os.urandom(16).hex(), None, False
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP JSON encodes 64-bit integers as strings.
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_span(trace: Trace, span: Dict[str, Any], kind: int) -> Dict[str, Any]:
+    otlp_span = {
+        "traceId": trace.trace_id,
+        "spanId": span["span_id"],
+        "name": span["name"],
+        "kind": kind,
+        "startTimeUnixNano": str(span["start_ns"]),
+        "endTimeUnixNano": str(span["end_ns"]),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span["attributes"].items()],
+        "status": {"code": STATUS_CODE_ERROR, "message": span["error"]} if span["error"] else {"code": STATUS_CODE_OK},
+    }
+    if span["parent_span_id"]:
+        otlp_span["parentSpanId"] = span["parent_span_id"]
+    return otlp_span
+
+def to_otlp_json(trace: Trace) -> Dict[str, Any]:
+    """
+    Converts a trace to the OTLP/JSON 'ExportTraceServiceRequest' layout, which the
+    OpenTelemetry collector's otlpjsonfile receiver and most tracing backends read.
+    """
+    spans = [
+        _otlp_span(trace, span, SPAN_KIND_SERVER if span["span_id"] == trace.root_span_id else SPAN_KIND_INTERNAL)
+        for span in trace.spans
+    ]
+    return {"resourceSpans": [{
+        "resource": {"attributes": [
+            {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+            {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+        ]},
+        "scopeSpans": [{"scope": {"name": "nlu_app.tracing"}, "spans": spans}],
+    }]}
+
+class RotatingFileExporter:
+    """
+    Writes kept traces as OTLP/JSON, one trace per line, from a background thread.
+    The file is rotated when it exceeds `max_bytes`: traces.jsonl becomes traces.jsonl.1,
+    and so on up to `backup_count` files.
+    """
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024, backup_count: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def export(self, trace: Trace):
+        """Queues a trace for writing; drops it if the writer is too far behind."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            increment("tracing.dropped_traces")
+
+    def _start(self):
+        with self._start_lock:
+            # Started lazily, so that pre-forked workers each get their own writer thread.
+            if self._thread is None:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                self._thread = threading.Thread(target=self._write_loop, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _rotate(self):
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _write_loop(self):
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                return
+            try:
+                line = json.dumps(to_otlp_json(trace), separators=(",", ":")) + "\n"
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+                increment("tracing.exported_traces")
+            except Exception as e:
+                increment("tracing.export_errors")
+                print(f"Could not write trace {trace.trace_id}: {e}")
+
+    def shutdown(self, timeout: float = 5.0):
+        """Writes the queued traces and stops the writer thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+class TailSampler:
+    """
+    Decides after a request has finished whether its trace is kept: always when the
+    request took at least `slow_threshold` seconds, failed (5xx or an error span) or
+    was marked as sampled by the caller, otherwise with probability `sample_rate`.
+    """
+    def __init__(self, slow_threshold: float = 0.5, sample_rate: float = 0.0):
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+
+    def should_keep(self, trace: Trace, duration: float, status_code: int) -> bool:
+        if duration >= self.slow_threshold or status_code >= 500 or trace.upstream_sampled:
+            return True
+        if any(span["error"] for span in trace.spans):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+def _server_timing(trace: Trace, total_seconds: float) -> bytes:
+    """
+    Internal helper building the Server-Timing header from the top-level stages of the
+    request (durations of stages with the same name are added up), plus the total.
+    """
+    durations: Dict[str, float] = {}
+    for span in trace.spans:
+        if span["parent_span_id"] == trace.root_span_id:
+            durations[span["name"]] = durations.get(span["name"], 0.0) + (span["end_ns"] - span["start_ns"]) / 1e6
+    metrics = [f"{name};dur={milliseconds:.3f}" for name, milliseconds in durations.items()]
+    metrics.append(f"total;dur={total_seconds * 1000:.3f}")
+    return ", ".join(metrics).encode("latin-1")
+
+class TracingMiddleware:
+    """
+    ASGI middleware that gives every HTTP request a trace. The trace id is taken from
+    the 'traceparent' or 'X-Trace-Id' request header or created, and is returned in the
+    'X-Trace-Id' response header. Spans recorded with 'trace_span' while the request is
+    handled are nested under a root span for the request. The response carries a
+    'Server-Timing' header with the top-level stage durations, and the finished trace is
+    handed to the exporter if the tail sampler keeps it.
+
+    Args:
+        app: The wrapped ASGI application.
+        exporter (Optional[RotatingFileExporter]): Where kept traces go (None = nowhere).
+        sampler (Optional[TailSampler]): Decides which traces are kept.
+    """
+    def __init__(self, app, exporter: Optional[RotatingFileExporter] = None, sampler: Optional[TailSampler] = None):
+        self.app = app
+        self.exporter = exporter
+        self.sampler = sampler or TailSampler()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        trace_id, parent_span_id, upstream_sampled = parse_trace_context(headers)
+        trace = Trace(trace_id, parent_span_id, upstream_sampled)
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span_id.set(trace.root_span_id)
+        status_code = 500
+        start_ns = time.time_ns()
+        start = time.perf_counter()
+
+        async def send_with_trace(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [
+                    *message.get("headers", []),
+                    (b"x-trace-id", trace_id.encode("latin-1")),
+                    (b"server-timing", _server_timing(trace, time.perf_counter() - start)),
+                ]}
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span_id.reset(span_token)
+            _current_trace.reset(trace_token)
+            duration = time.perf_counter() - start
+            attributes = {"http.method": scope["method"], "http.target": scope["path"], "http.status_code": status_code}
+            route = scope.get("route")
+            if route is not None:
+                attributes["http.route"] = route.path
+            if trace.dropped_spans:
+                attributes["dropped_spans"] = trace.dropped_spans
+            trace.spans.append({
+                "span_id": trace.root_span_id, "parent_span_id": trace.parent_span_id,
+                "name": f"{scope['method']} {attributes.get('http.route', scope['path'])}",
+                "start_ns": start_ns, "end_ns": start_ns + int(duration * 1e9), "attributes": attributes,
+                "error": error or (f"HTTP {status_code}" if status_code >= 500 else None),
+            })
+            if self.exporter is not None and self.sampler.should_keep(trace, duration, status_code):
+                self.exporter.export(trace)
+
+def _traced_endpoint(endpoint: Callable) -> Callable:
+    """
+    Internal helper wrapping an endpoint so that its body is timed as the 'handler' stage
+    of ?profile=1 requests. Synchronous endpoints are sent to the thread pool here rather
+    than by FastAPI, so that the time spent waiting for a free thread is recorded as the
+    'queue_wait' span. The wrapper keeps the endpoint's signature, so FastAPI sees the
+    same parameters.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def traced_endpoint(*args, **kwargs):
+            with profile_stage("handler"):
+                return await endpoint(*args, **kwargs)
+        return traced_endpoint
+
+    def run(submitted_ns, args, kwargs):
+        record_span("queue_wait", submitted_ns, time.time_ns())
+        with profile_stage("handler"):
+            return endpoint(*args, **kwargs)
+
+    @functools.wraps(endpoint)
+    async def traced_endpoint(*args, **kwargs):
+        return await run_in_threadpool(run, time.time_ns(), args, kwargs)
+    return traced_endpoint
+
+class TracedRoute(APIRoute):
+    """Route class recording the thread pool wait and the handler stage of every endpoint call."""
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _traced_endpoint(endpoint), **kwargs)
@@ -0,0 +1,10 @@
+from .logic import run_warmup, start_warmup, mark_ready, is_ready, get_warmup_report
+
+
+__all__ = [
+    "run_warmup",
+    "start_warmup",
+    "mark_ready",
+    "is_ready",
+    "get_warmup_report"
+]
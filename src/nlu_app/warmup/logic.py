@@ -0,0 +1,87 @@
+from typing import Any, Callable, Dict, Optional
+import threading
+import time
+
+from ..metrics import observe
+
+# --- Module-Level Variables ---
+_ready = threading.Event()
+_report: Dict[str, Any] = {"status": "pending", "total_time": None, "tasks": {}}
+
+def run_warmup(tasks: Dict[str, Callable[[], Any]], rounds: int = 2) -> Dict[str, Any]:
+    """
+    Runs every warm-up task `rounds` times, so that lazy initialization (corpus loading,
+    vocabulary setup, first-forward-pass kernel selection) happens before real traffic.
+    A failing task is reported but does not stop the others. Marks the service as ready
+    when done.
+
+    Args:
+        tasks (Dict[str, Callable[[], Any]]): Maps a name to a call with a representative input.
+        rounds (int): How many times each task runs. The first round pays the one-off
+                      costs; later rounds show the warm latency.
+
+    Returns:
+        Dict[str, Any]: The warm-up report (see 'get_warmup_report').
+    """
+    _report["status"] = "running"
+    start_time = time.perf_counter()
+    for name, task in tasks.items():
+        timings = []
+        error = None
+        for _ in range(max(1, rounds)):
+            task_start = time.perf_counter()
+            try:
+                task()
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                print(f"Warm-up task '{name}' failed: {error}")
+                break
+            timings.append(time.perf_counter() - task_start)
+        if timings:
+            observe(f"warmup.{name}", timings[0])
+        _report["tasks"][name] = {
+            "first_call_time": timings[0] if timings else None,
+            "warm_call_time": timings[-1] if len(timings) > 1 else None,
+            "error": error,
+        }
+    _report["total_time"] = time.perf_counter() - start_time
+    _report["status"] = "done"
+    observe("warmup.total", _report["total_time"])
+    print(f"Warm-up finished in {_report['total_time']:.2f}s.")
+    mark_ready()
+    return get_warmup_report()
+
+def start_warmup(tasks: Dict[str, Callable[[], Any]], rounds: int = 2) -> Optional[threading.Thread]:
+    """
+    Runs the warm-up in a background thread, so the server accepts connections (and
+    answers liveness checks) while readiness stays red. With no tasks or zero rounds
+    the service is marked ready at once.
+
+    Returns:
+        Optional[threading.Thread]: The warm-up thread, or None if there is nothing to run.
+    """
+    if not tasks or rounds <= 0:
+        _report["status"] = "skipped"
+        mark_ready()
+        return None
+    print(f"--- Warming up {len(tasks)} model(s), {rounds} round(s) each ---")
+    thread = threading.Thread(target=run_warmup, args=(tasks, rounds), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+def mark_ready():
+    _ready.set()
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+def get_warmup_report() -> Dict[str, Any]:
+    """
+    Returns the warm-up status ("pending", "running", "done" or "skipped"), its total
+    time and the first-call and warm-call time of each task.
+    """
+    return {
+        "status": _report["status"],
+        "total_time": _report["total_time"],
+        "tasks": {name: dict(task) for name, task in _report["tasks"].items()},
+    }
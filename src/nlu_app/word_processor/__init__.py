@@ -1,8 +1,9 @@
-from .logic import load_word_processing_tools, process_word, process_word_list
+from .logic import load_word_processing_tools, unload_word_processing_tools, process_word, process_word_list
 
 
 __all__ = [
     "load_word_processing_tools",
+    "unload_word_processing_tools",
     "process_word",
     "process_word_list"
 ]
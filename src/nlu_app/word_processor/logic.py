@@ -33,6 +33,14 @@ def load_word_processing_tools():
     wordnet_lemmatizer = WordNetLemmatizer()
     print("Porter Stemmer and WordNet Lemmatizer initialized successfully.")
 
+def unload_word_processing_tools():
+    """
+    Releases the stemmer and lemmatizer. They can be loaded again with 'load_word_processing_tools'.
+    """
+    global porter_stemmer, wordnet_lemmatizer
+    porter_stemmer = wordnet_lemmatizer = None
+    print("Word processing tools unloaded.")
+
 def _get_wordnet_pos(word: str) -> str:
     """
     Internal helper function to map NLTK's POS tag to a format WordNetLemmatizer understands.